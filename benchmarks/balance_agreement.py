@@ -0,0 +1,95 @@
+# benchmarks/balance_agreement.py
+"""
+Confere que o modelo vetorizado (benchmarks/balance_model.py) concorda com o simulador completo
+(benchmarks/balance_sim.py, política "coordenada", a que o modelo reproduz).
+
+Uso:
+    python -m benchmarks.balance_agreement [--sizes 5 6 ... 13] [--sim-games 5000] [--model-games 200000] [--sim-report sim.json]
+
+Para cada tamanho de sala, compara a taxa de cada resultado (facção vencedora) nos dois. A tolerância é de
+TOLERANCE (3 pontos percentuais) por resultado: com as 5000 partidas padrão do simulador, o erro amostral
+de uma taxa fica abaixo de 0,8 ponto, então uma diferença maior é regra divergente, não sorteio. Sai com
+código 1 e lista os resultados fora da tolerância.
+
+--sim-report reaproveita um relatório já gerado pelo balance_sim com a política coordenada.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Any
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+import config
+from benchmarks import balance_model
+
+TOLERANCE = 0.03 # Diferença máxima, em fração, entre as taxas de um resultado
+POLICY = "coordenada"
+DEFAULT_SIM_GAMES = 5000
+DEFAULT_MODEL_GAMES = 200_000
+# Salas de 14 ou mais jogadores não são montadas pelo simulador (pool de papéis pequeno demais para a composição)
+DEFAULT_SIZES = list(range(5, 14))
+
+
+def compare(sim_report: Dict[str, Any], sizes: List[int], model_games: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Taxas do simulador e do modelo para cada tamanho e resultado, com a diferença (modelo - simulador)."""
+    sim_results = {result["players"]: result for result in sim_report["results"]}
+    rows = []
+    for size in sizes:
+        if not (sim_result := sim_results.get(size)) or not sim_result["games"]:
+            raise ValueError(f"O relatório do simulador não tem partidas com {size} jogadores.")
+        model_result = balance_model.simulate_composition(config.GAME_COMPOSITIONS[str(size)], model_games, seed)
+        sim_rates = {faction: data["rate"] for faction, data in sim_result["factions"].items()}
+        model_rates = model_result["outcomes"]
+        for outcome in balance_model.OUTCOMES:
+            sim_rate, model_rate = sim_rates.get(outcome, 0.0), model_rates.get(outcome, 0.0)
+            if sim_rate or model_rate:
+                rows.append({"players": size, "outcome": outcome, "sim": sim_rate, "model": model_rate,
+                             "difference": round(model_rate - sim_rate, 4)})
+    return rows
+
+def disagreements(rows: List[Dict[str, Any]], tolerance: float = TOLERANCE) -> List[Dict[str, Any]]:
+    return [row for row in rows if abs(row["difference"]) > tolerance]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara o modelo de balanceamento com o simulador completo.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Tamanhos de sala.")
+    parser.add_argument("--sim-games", type=int, default=DEFAULT_SIM_GAMES, help="Partidas do simulador por tamanho de sala.")
+    parser.add_argument("--model-games", type=int, default=DEFAULT_MODEL_GAMES, help="Partidas do modelo por tamanho de sala.")
+    parser.add_argument("--sim-report", help="Relatório JSON do balance_sim (política coordenada) já gerado.")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    invalid = [size for size in args.sizes if str(size) not in config.GAME_COMPOSITIONS]
+    if invalid:
+        parser.error(f"Sem composição em game_configs.json para: {', '.join(map(str, invalid))}.")
+    if args.sim_report:
+        with open(args.sim_report, encoding="utf-8") as f:
+            sim_report = json.load(f)
+        if sim_report.get("policy") != POLICY:
+            parser.error(f"O modelo reproduz a política {POLICY}; o relatório é da {sim_report.get('policy')!r}.")
+    else:
+        from benchmarks import balance_sim
+        sim_report = balance_sim.simulate(args.sizes, args.sim_games, POLICY, args.processes, args.seed)
+
+    try:
+        rows = compare(sim_report, args.sizes, args.model_games, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    for row in rows:
+        mark = "  <-- fora da tolerância" if abs(row["difference"]) > TOLERANCE else ""
+        print(f"{row['players']:>2} jogadores, {row['outcome']}: simulador {row['sim']:.1%}, modelo {row['model']:.1%} "
+              f"({row['difference'] * 100:+.1f} p.p.){mark}", file=sys.stderr)
+    failed = disagreements(rows)
+    print(f"{len(rows) - len(failed)}/{len(rows)} resultados dentro de ±{TOLERANCE * 100:.0f} p.p.", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,687 @@
+# benchmarks/balance_model.py
+"""
+Modelo vetorizado do balanceamento, para varrer composições e pesos do ROLE_POOL em lote.
+
+Cada partida é uma linha de arrays NumPy (partidas × assentos): facção e papel de cada assento e a máscara
+de vivos. Infectados e Fantasmas são bitmasks por partida (um bit por assento). As noites, os dias e as
+condições de vitória de GameFlowCog.check_game_end são aplicados como operações sobre todas as partidas de
+uma vez (dezenas de milhares de partidas por segundo numa CPU, contra perto de mil por segundo do
+benchmarks/balance_sim.py, que joga as partidas com as cogs).
+
+O modelo reproduz as regras do jogo e a política "coordenada" do balance_sim (decisões sorteadas com as
+mesmas chances, vilões combinando o alvo da noite e o voto do dia). Ficam de fora só as regras que não
+mudam o resultado (Detetive, Vidente, assombração, as vitórias extras de Bruxo, Fofoqueiro e Amantes) e
+alguns casos raros de ordem entre comandos do mesmo turno. benchmarks/balance_agreement.py confere que os
+dois concordam dentro de uma tolerância; rode-o ao mudar regras ou a política do balance_sim.
+
+NumPy não é dependência do bot: só é importado ao usar o modelo.
+
+Uso:
+    python -m benchmarks.balance_model [--games 1000000] [--sizes 8 9 10] [--variants] [--weight Praga=2 ...] [--output resultados.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+import config
+
+DEFAULT_GAMES = 1_000_000
+DEFAULT_CHUNK = 100_000 # Partidas por lote (os arrays são partidas × assentos)
+
+# Facções
+CITY, VILLAINS, SOLO = 0, 1, 2
+FACTION_CODES = {"Cidade": CITY, "Vilões": VILLAINS, "Solo": SOLO}
+
+# Papéis com regras próprias no modelo (chaves do ROLE_POOL); os outros são OTHER. Cada um aparece no máximo uma vez por partida.
+(OTHER, MAYOR, BODYGUARD, ANGEL, SHERIFF, MEDIUM, ALPHA, JUNIOR, ACCOMPLICE,
+ CLOWN, HEADHUNTER, PLAGUE, WITCH, CUPID, CORRUPTOR, GOSSIP) = range(16)
+ROLE_CODES = {
+    "Prefeito": MAYOR, "Guarda-costas": BODYGUARD, "Anjo": ANGEL, "Xerife": SHERIFF, "Médium": MEDIUM,
+    "Assassino Alfa": ALPHA, "Assassino Júnior": JUNIOR, "Cúmplice": ACCOMPLICE,
+    "Palhaço": CLOWN, "Caçador de Cabeças": HEADHUNTER, "Praga": PLAGUE, "Bruxo": WITCH, "Cupido": CUPID,
+    "Corruptor": CORRUPTOR, "Fofoqueiro": GOSSIP,
+}
+SPECIAL_ROLES = tuple(ROLE_CODES.values())
+
+# Resultados (mesmos nomes de facção vencedora usados no fim de jogo)
+RUNNING = -1
+OUTCOMES = ("Cidade", "Vilões", "Solo (Palhaço)", "Solo (Caçador de Cabeças)", "Solo (Praga)", "Solo (Amantes)", "Solo (Corruptor)", "Ninguém")
+CITY_WIN, VILLAINS_WIN, CLOWN_WIN, HEADHUNTER_WIN, PLAGUE_WIN, LOVERS_WIN, CORRUPTOR_WIN, NOBODY = range(len(OUTCOMES))
+
+# Chances das decisões sorteadas (as mesmas da RandomPolicy do balance_sim)
+POSSESS_CHANCE = 0.2
+CONFUSE_CHANCE = 0.25
+WITCH_KILL_CHANCE = 0.3
+WITCH_REVIVE_CHANCE = 0.5
+EXTERMINATE_CHANCE = 0.3
+SHERIFF_SHOT_CHANCE = 0.15
+DECREE_CHANCE = 0.2
+FRAUD_CHANCE = 0.1
+SKIP_VOTE_CHANCE = 0.1
+
+# Regras
+POSSESSION_MIN_PLAYERS = 11 # /possuir só existe a partir de 11 jogadores
+POSSESSION_POINTS = 3 # Pontos de possessão para virar Assassino Simples
+PLAGUE_WIN_INFECTED = 4 # Infectados vivos para o extermínio da Praga vencer
+SHOWDOWN_SHOTS = 2 # Balas do Xerife no total, contando as do dia, para o Confronto Final
+MAX_DEATH_CHAIN = 4 # Mortes encadeadas (maldição do Júnior, coração partido) seguidas a partir de uma morte
+NO_SEAT = -1
+
+
+class BalanceError(ValueError):
+    """Composição que o ROLE_POOL não consegue montar (mesmas regras de _distribute_roles)."""
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise RuntimeError("O modelo de balanceamento precisa do NumPy (pip install numpy).") from e
+    return numpy
+
+
+# --- Distribuição de papéis ---
+
+def _pick_roles(np, rng, fixed: List[str], optional: List[str], count: int, games: int, weights: Dict[str, float], group: str):
+    """Códigos dos papéis de um grupo (games × count): os fixos e um sorteio ponderado, sem repetição, dos opcionais."""
+    names = fixed[:count]
+    codes = np.array([ROLE_CODES.get(name, OTHER) for name in names], dtype=np.int8)
+    columns = np.broadcast_to(codes, (games, len(names)))
+    needed = count - len(names)
+    if needed <= 0:
+        return columns
+    pool_weights = np.array([weights.get(name, 1.0) for name in optional], dtype=np.float64)
+    if (pool_weights > 0).sum() < needed:
+        raise BalanceError(f"{group}: são necessários {needed} papéis opcionais e o pool só tem {(pool_weights > 0).sum()}.")
+    # Gumbel top-k: as k maiores chaves log(peso) + Gumbel são uma amostra ponderada sem reposição
+    with np.errstate(divide="ignore"):
+        keys = np.log(pool_weights) - np.log(-np.log(rng.random((games, len(optional)))))
+    picks = np.argsort(-keys, axis=1)[:, :needed]
+    optional_codes = np.array([ROLE_CODES.get(name, OTHER) for name in optional], dtype=np.int8)
+    return np.concatenate([columns, optional_codes[picks]], axis=1)
+
+def deal_roles(np, rng, composition: Dict[str, int], games: int, pool: Optional[Dict[str, Any]] = None,
+               weights: Optional[Dict[str, float]] = None):
+    """Facções e papéis (games × jogadores) sorteados como em _distribute_roles, com os assentos embaralhados."""
+    pool = pool if pool is not None else config.ROLE_POOL
+    weights = weights or {}
+    factions, roles = [], []
+
+    city_pool = pool.get("Cidade", {})
+    villain_pool = pool.get("Vilões", {})
+    solo_pool = pool.get("Solo", {})
+    groups = [
+        (CITY, "Cidade", city_pool.get("essenciais", []), city_pool.get("investigadores", []), composition.get("Cidade", 0)),
+        (VILLAINS, "Vilões", villain_pool.get("essenciais", []), villain_pool.get("outros", []), composition.get("Vilões", 0)),
+    ]
+    solo_count = composition.get("Solo", 0)
+    exclusives, solo_others = solo_pool.get("exclusivos", []), solo_pool.get("outros", [])
+    if solo_count > 0 and exclusives:
+        # Um exclusivo sempre entra; o resto sai dos outros
+        groups.append((SOLO, "Solo", [], exclusives, 1))
+        groups.append((SOLO, "Solo", [], [role for role in solo_others if role not in exclusives], solo_count - 1))
+    else:
+        groups.append((SOLO, "Solo", [], solo_others, solo_count))
+
+    for faction, group, fixed, optional, count in groups:
+        if count <= 0:
+            continue
+        group_roles = _pick_roles(np, rng, fixed, optional, count, games, weights, group)
+        roles.append(group_roles)
+        factions.append(np.full(group_roles.shape, faction, dtype=np.int8))
+
+    role_matrix = np.concatenate(roles, axis=1)
+    faction_matrix = np.concatenate(factions, axis=1)
+    seats = np.argsort(rng.random(role_matrix.shape), axis=1)
+    return np.take_along_axis(faction_matrix, seats, axis=1), np.take_along_axis(role_matrix, seats, axis=1)
+
+
+# --- Partidas ---
+
+class GameBatch:
+    """Um lote de partidas da mesma composição; cada partida é uma linha dos arrays."""
+    # Arrays com uma linha por partida (as partidas encerradas saem deles entre as noites)
+    PER_GAME = (
+        "faction", "role", "alive", "outcome", "nights", "pending", "infected", "ghosts", "possession", "bodyguard_hits",
+        "sheriff_shots", "angel_used", "witch_used", "medium_used", "exterminate_used", "decree_used", "fraud_used",
+        "mayor_saved", "contract", "patient_zero", "junior_mark", "lover_a", "lover_b", "has_lovers",
+        "last_protected", "last_corrupted", "last_confused",
+    )
+
+    def __init__(self, np, rng, faction, role):
+        self.np, self.rng = np, rng
+        self.faction, self.role = faction.copy(), role.copy()
+        games, seats = faction.shape
+        if seats > 32:
+            raise BalanceError("O modelo usa bitmasks de 32 bits: no máximo 32 jogadores.")
+        self.rows = np.arange(games)
+        self.seat_ids = np.arange(seats)
+        self.bits = np.left_shift(np.uint32(1), self.seat_ids.astype(np.uint32))
+        self.alive = np.ones((games, seats), dtype=bool)
+        self.outcome = np.full(games, RUNNING, dtype=np.int8)
+        self.nights = np.zeros(games, dtype=np.int8)
+        # Resolução pendente: sem vilões e com o Prefeito morto, uma noite extra decide se ele volta
+        self.pending = np.zeros(games, dtype=bool)
+        self.ghosts = np.zeros(games, dtype=np.uint32)
+        self.possession = np.zeros((games, seats), dtype=np.int8)
+        self.bodyguard_hits = np.zeros(games, dtype=np.int8)
+        self.sheriff_shots = np.zeros(games, dtype=np.int8)
+        for flag in ("angel_used", "witch_used", "medium_used", "exterminate_used", "decree_used", "fraud_used", "mayor_saved", "has_lovers"):
+            setattr(self, flag, np.zeros(games, dtype=bool))
+        for last in ("last_protected", "last_corrupted", "last_confused"):
+            setattr(self, last, np.full(games, NO_SEAT))
+
+        # Assento de cada papel especial e se ele está na partida (has deixa de valer quando o papel é trocado)
+        self.seat, self.has = {}, {}
+        for code in SPECIAL_ROLES:
+            mask = self.role == code
+            self.seat[code], self.has[code] = mask.argmax(axis=1), mask.any(axis=1)
+        # Alvos escolhidos na 1ª noite, quando todos estão vivos: contrato do Caçador, paciente zero, marca do Júnior e o casal
+        self.contract, _ = self._choose(self._others(self.seat[HEADHUNTER]))
+        patient_zero, _ = self._choose(self._others(self.seat[PLAGUE]))
+        self.patient_zero = np.where(self.has[PLAGUE], patient_zero, NO_SEAT)
+        self.infected = np.where(self.has[PLAGUE], self.bits[patient_zero], np.uint32(0)).astype(np.uint32)
+        self.junior_mark, _ = self._choose(self._others(self.seat[JUNIOR]))
+        self.lover_a, _ = self._choose(self._others(self.seat[CUPID]))
+        self.lover_b, _ = self._choose(self._others(self.seat[CUPID]) & (self.seat_ids != self.lover_a[:, None]))
+        self.outcome_counts = np.zeros(len(OUTCOMES), dtype=np.int64)
+        self.nights_played = 0
+
+    # --- Auxiliares ---
+
+    def _others(self, seat, alive=None):
+        """Vivos (de alive, por padrão os atuais) tirando o assento seat de cada partida."""
+        return (self.alive if alive is None else alive) & (self.seat_ids != seat[:, None])
+
+    def _alive_role(self, code: int, alive=None):
+        return self.has[code] & (self.alive if alive is None else alive)[self.rows, self.seat[code]]
+
+    def _choose(self, mask):
+        """Um assento sorteado por partida entre os marcados em mask (e se havia algum)."""
+        keys = self.rng.random(mask.shape, dtype=self.np.float32)
+        keys *= mask
+        keys += mask # Marcados ficam em [1, 2), os demais em 0
+        return keys.argmax(axis=1), mask.any(axis=1)
+
+    def _chance(self, probability: float):
+        return self.rng.random(len(self.rows)) < probability
+
+    def _seat_bits(self, mask, seat):
+        return self.np.where(mask, self.bits[seat], self.np.uint32(0)).astype(self.np.uint32)
+
+    def _contacts(self, mask, visitor, target):
+        """Bits de quem se infecta numa visita: o visitante do paciente zero ou o visitado por ele."""
+        return self._seat_bits(mask & (target == self.patient_zero), visitor) | self._seat_bits(mask & (visitor == self.patient_zero), target)
+
+    def _redirect(self, mask, actor, target, confused, candidates):
+        """Alvo de quem foi confundido: outro candidato sorteado, que não seja o próprio nem o alvo original."""
+        new_target, has_new = self._choose(candidates & (self.seat_ids != actor[:, None]) & (self.seat_ids != target[:, None]))
+        return self.np.where(mask & (actor == confused) & has_new, new_target, target)
+
+    def _set_role(self, mask, seat, faction: int, role: int):
+        """Troca o papel (possessão, Caçador sem contrato): o papel antigo sai da partida."""
+        rows = self.rows[mask]
+        self.faction[rows, seat[mask]] = faction
+        self.role[rows, seat[mask]] = role
+        for code in SPECIAL_ROLES:
+            self.has[code] &= ~(mask & (self.seat[code] == seat))
+
+    def _finish(self, mask, outcome: int):
+        self.outcome[mask & (self.outcome == RUNNING)] = outcome
+
+    @property
+    def running(self):
+        return self.outcome == RUNNING
+
+    @property
+    def playing(self):
+        """Partidas que seguem normalmente (sem resolução pendente)."""
+        return self.running & ~self.pending
+
+    def _drop_finished(self):
+        """Contabiliza as partidas encerradas e as tira dos arrays, para as próximas fases só tratarem as que seguem."""
+        running = self.running
+        finished = self.outcome[~running]
+        self.outcome_counts += self.np.bincount(finished, minlength=len(OUTCOMES))
+        self.nights_played += int(self.nights[~running].sum())
+        for name in self.PER_GAME:
+            setattr(self, name, getattr(self, name)[running])
+        for code in SPECIAL_ROLES:
+            self.seat[code], self.has[code] = self.seat[code][running], self.has[code][running]
+        self.rows = self.np.arange(int(running.sum()))
+
+    # --- Mortes e fim de jogo ---
+
+    def _die(self, mask, seat, lynched: bool = False, depth: int = 0):
+        """GameFlowCog.process_death: mata, segue a maldição do Júnior e o coração partido e confere o fim de jogo."""
+        np, rows = self.np, self.rows
+        victims = mask & self.running & self.alive[rows, seat]
+        if not victims.any():
+            return
+        self.alive[rows[victims], seat[victims]] = False
+        cursed = victims & (self.role[rows, seat] == JUNIOR) & self.alive[rows, self.junior_mark]
+        partner = np.where(seat == self.lover_a, self.lover_b, self.lover_a)
+        heartbreak = (victims & ~cursed & self.has_lovers & ((seat == self.lover_a) | (seat == self.lover_b))
+                      & self.alive[rows, partner])
+        if depth < MAX_DEATH_CHAIN:
+            self._die(cursed, self.junior_mark, depth=depth + 1)
+            self._die(heartbreak, partner, depth=depth + 1)
+        rest = victims & ~cursed & ~heartbreak
+
+        hunter = self.seat[HEADHUNTER]
+        contract = rest & self._alive_role(HEADHUNTER) & (seat == self.contract)
+        if lynched:
+            self._finish(contract, HEADHUNTER_WIN)
+        else:
+            # Alvo morto por outros meios: o Caçador vira um membro comum da Cidade
+            self._set_role(contract, hunter, CITY, OTHER)
+        self.check_end(rest, victim_villain=self.faction[rows, seat] == VILLAINS)
+
+    def check_end(self, mask=None, victim_villain=None):
+        """As condições de check_game_end, na mesma ordem (victim_villain: a morte que levou à conferência foi de um vilão)."""
+        checking = self.playing if mask is None else mask & self.playing
+        alive = self.alive
+        alive_count = alive.sum(axis=1)
+        villains = (alive & (self.faction == VILLAINS)).sum(axis=1)
+        mayor_alive = self._alive_role(MAYOR)
+        mayor_dead = self.has[MAYOR] & ~mayor_alive
+        can_revive = (self._alive_role(ANGEL) & ~self.angel_used) | (self._alive_role(WITCH) & ~self.witch_used)
+
+        self._finish(checking & (alive_count == 0), NOBODY)
+        self._finish(checking & mayor_dead & ~can_revive & (villains > 0), VILLAINS_WIN)
+        no_villains = checking & (villains == 0) & self.running
+        self._finish(no_villains & mayor_alive, CITY_WIN)
+        self.pending |= no_villains & mayor_dead
+        self._resolve(no_villains & ~self.has[MAYOR])
+        parity = checking & (villains >= alive_count - villains)
+        if victim_villain is not None:
+            parity &= ~victim_villain
+        self._finish(parity & ~self.pending, VILLAINS_WIN)
+
+    def _resolve(self, mask):
+        """A vitória do Sétimo Dia sem Confronto: casal vivo, Corruptor vivo, Cidade viva ou ninguém."""
+        alive = self.alive
+        lovers_alive = self.has_lovers & alive[self.rows, self.lover_a] & alive[self.rows, self.lover_b]
+        self._finish(mask & lovers_alive, LOVERS_WIN)
+        self._finish(mask & self._alive_role(CORRUPTOR), CORRUPTOR_WIN)
+        self._finish(mask & (alive & (self.faction == CITY)).any(axis=1), CITY_WIN)
+        self._finish(mask, NOBODY)
+
+    # --- Fases ---
+
+    def night(self, number: int):
+        np, rows, seat = self.np, self.rows, self.seat
+        running, pending = self.running, self.pending & self.running
+        games, seats = self.alive.shape
+        self.nights[running] = number
+        alive_before = self.alive.copy()
+        dead_before = ~alive_before
+        any_dead = dead_before.any(axis=1)
+
+        def acts(code):
+            return running & self._alive_role(code, alive_before)
+
+        # --- Comandos (recusados como nos comandos de barra: mesmo alvo da noite passada, alma de Fantasma) ---
+        contacts = np.zeros(games, dtype=np.uint32)
+        non_villains = alive_before & (self.faction != VILLAINS)
+
+        if number == 1:
+            gossip = seat[GOSSIP]
+            gossip_target, _ = self._choose(self._others(gossip, alive_before))
+            contacts |= self._contacts(acts(GOSSIP), gossip, gossip_target)
+            # A escolha do paciente zero também é uma visita, e o jogo nunca preenche plague_player_id: a Praga se infecta
+            contacts |= self._contacts(acts(PLAGUE), seat[PLAGUE], self.patient_zero)
+
+        # Médium: um morto vira Fantasma e não pode mais ser revivido (a não ser o Prefeito)
+        medium = seat[MEDIUM]
+        spirit, has_spirit = self._choose(dead_before & ((self.ghosts[:, None] & self.bits) == 0))
+        new_ghost = self._seat_bits(acts(MEDIUM) & ~self.medium_used & has_spirit, spirit)
+        self.medium_used |= new_ghost != 0
+        self.ghosts |= new_ghost
+
+        junior = seat[JUNIOR]
+        confuse_target, has_targets = self._choose(non_villains)
+        junior_confuses = acts(JUNIOR) & has_targets & self._chance(CONFUSE_CHANCE)
+        confusing = junior_confuses & (confuse_target != self.last_confused)
+        self.last_confused = np.where(confusing, confuse_target, self.last_confused)
+        confused = np.where(confusing, confuse_target, NO_SEAT)
+        contacts |= self._contacts(confusing, junior, confuse_target)
+
+        alpha = seat[ALPHA]
+        possess_target, has_targets = self._choose(non_villains)
+        possessing = acts(ALPHA) & (seats >= POSSESSION_MIN_PLAYERS) & has_targets & self._chance(POSSESS_CHANCE)
+        contacts |= self._contacts(possessing, alpha, possess_target)
+
+        corruptor = seat[CORRUPTOR]
+        corrupt_target, has_targets = self._choose(self._others(corruptor, alive_before))
+        corrupting = acts(CORRUPTOR) & has_targets & (corrupt_target != self.last_corrupted)
+        self.last_corrupted = np.where(corrupting, corrupt_target, self.last_corrupted)
+        corrupt_target = self._redirect(corrupting, corruptor, corrupt_target, confused, alive_before)
+        contacts |= self._contacts(corrupting, corruptor, corrupt_target)
+        corrupted = np.where(corrupting, corrupt_target, NO_SEAT)
+
+        bodyguard = seat[BODYGUARD]
+        protect_target, has_targets = self._choose(self._others(bodyguard, alive_before))
+        protecting = acts(BODYGUARD) & has_targets & (protect_target != self.last_protected)
+        self.last_protected = np.where(protecting, protect_target, self.last_protected)
+        protect_target = self._redirect(protecting, bodyguard, protect_target, confused, alive_before)
+        contacts |= self._contacts(protecting, bodyguard, protect_target)
+        protected = np.where(protecting & (corrupted != bodyguard), protect_target, NO_SEAT)
+
+        # Vilões: todos votam no alvo combinado (menos o Alfa que possui e o Júnior que confunde)
+        plan, has_plan = self._choose(non_villains)
+        voters = alive_before & (self.faction == VILLAINS) & (running & has_plan)[:, None]
+        voters[rows, alpha] &= ~possessing
+        voters[rows, junior] &= ~junior_confuses
+        voter_bits = np.bitwise_or.reduce(np.where(voters, self.bits, np.uint32(0)), axis=1).astype(np.uint32)
+        contacts |= np.where(plan == self.patient_zero, voter_bits, np.uint32(0))
+        contacts |= self._seat_bits(voters[rows, np.maximum(self.patient_zero, 0)] & (self.patient_zero != NO_SEAT), plan)
+
+        # Anjo e Bruxo: quem revive escolhe entre os mortos de antes da noite (o Anjo, o Prefeito primeiro)
+        witch, angel = seat[WITCH], seat[ANGEL]
+        witch_acts = acts(WITCH) & ~self.witch_used
+        roll = self.rng.random(games)
+        witch_kill_target, has_targets = self._choose(self._others(witch, alive_before))
+        witch_kills = witch_acts & (roll < WITCH_KILL_CHANCE) & has_targets
+        witch_kill_target = self._redirect(witch_kills, witch, witch_kill_target, confused, alive_before)
+        contacts |= self._contacts(witch_kills, witch, witch_kill_target)
+
+        dead_pick, _ = self._choose(dead_before)
+        witch_revives = witch_acts & ~(roll < WITCH_KILL_CHANCE) & any_dead & (roll < WITCH_REVIVE_CHANCE)
+        witch_revive_target, _ = self._choose(dead_before)
+        mayor_dead = self.has[MAYOR] & dead_before[rows, seat[MAYOR]]
+        angel_revives = acts(ANGEL) & ~self.angel_used & any_dead
+        angel_target = np.where(mayor_dead, seat[MAYOR], dead_pick)
+        # O Fantasma criado nesta noite só já conta para quem manda o comando depois do Médium
+        def revivable(reviver, target):
+            ghosts = self.ghosts & ~np.where(medium > reviver, new_ghost, np.uint32(0))
+            return ((ghosts & self.bits[target]) == 0) | (self.role[rows, target] == MAYOR)
+        angel_revives &= revivable(angel, angel_target)
+        witch_revives &= revivable(witch, witch_revive_target)
+        # Dois pedidos para o mesmo morto: só vale o de quem mandou o comando primeiro
+        same_target = angel_revives & witch_revives & (angel_target == witch_revive_target)
+        angel_revives &= ~(same_target & (witch < angel))
+        witch_revives &= ~(same_target & (angel < witch))
+        angel_target = self._redirect(angel_revives, angel, angel_target, confused, dead_before)
+        witch_revive_target = self._redirect(witch_revives, witch, witch_revive_target, confused, dead_before)
+        contacts |= self._contacts(angel_revives, angel, angel_target) | self._contacts(witch_revives, witch, witch_revive_target)
+
+        # --- Resolução (etapas de engine/night.py; a corrupção bloqueia possessão, cupido, morte e revivência) ---
+        if number == 1:
+            self.has_lovers = acts(CUPID) & (corrupted != seat[CUPID])
+
+        possessing &= corrupted != alpha
+        points = self.possession[rows, possess_target] + possessing
+        self.possession[rows, possess_target] = points
+        self._set_role(possessing & (points >= POSSESSION_POINTS), possess_target, VILLAINS, OTHER)
+
+        # Tentativas de morte, na ordem de kill_attempts: a do Bruxo (que ignora a proteção) antes da dos vilões
+        witch_kills &= corrupted != witch
+        self.witch_used |= witch_kills
+        voters &= self.seat_ids != corrupted[:, None]
+        # No mesmo alvo, a tentativa do Bruxo vem primeiro e é a que vale
+        villains_kill = voters.any(axis=1) & ~possessing & ~(witch_kills & (plan == witch_kill_target))
+        deaths = []
+        for attacking, target, shieldable in ((witch_kills, witch_kill_target, False), (villains_kill, plan, True)):
+            shielded = attacking & shieldable & (protected == target)
+            direct = attacking & ~shielded & (self.role[rows, target] == BODYGUARD)
+            self.bodyguard_hits += shielded | direct
+            deaths.append((shielded & (self.bodyguard_hits >= 2), bodyguard))
+            deaths.append((attacking & ~shielded & ~(direct & (self.bodyguard_hits == 1)), target))
+
+        revived = np.zeros((games, seats), dtype=bool)
+        for reviving, reviver, target, used in ((angel_revives, angel, angel_target, "angel_used"), (witch_revives, witch, witch_revive_target, "witch_used")):
+            reviving = reviving & (corrupted != reviver) & ~self.alive[rows, target]
+            setattr(self, used, getattr(self, used) | reviving)
+            self.alive[rows[reviving], target[reviving]] = True
+            revived[rows[reviving], target[reviving]] = True
+            revived_role = self.role[rows, target]
+            was_ghost = (self.ghosts & self.bits[target]) != 0
+            self.ghosts &= ~self._seat_bits(reviving, target)
+            self.bodyguard_hits[reviving & (revived_role == BODYGUARD)] = 0
+            self.witch_used[reviving & (revived_role == WITCH)] = False
+            self.exterminate_used[reviving & (revived_role == PLAGUE)] = False
+            self.medium_used[reviving & ((revived_role == MEDIUM) | (was_ghost & (revived_role == MAYOR)))] = False
+
+        # Praga: o extermínio vence com infectados suficientes (contando os revividos), senão os mata; depois o contágio
+        night_alive = alive_before | revived
+        infected_alive = ((self.infected[:, None] & self.bits) != 0) & night_alive
+        exterminating = acts(PLAGUE) & ~self.exterminate_used & (number > 1) & self._chance(EXTERMINATE_CHANCE)
+        self.exterminate_used |= exterminating
+        self._finish(exterminating & (infected_alive.sum(axis=1) >= PLAGUE_WIN_INFECTED), PLAGUE_WIN)
+        spreading = self.running & (self.patient_zero != NO_SEAT) & night_alive[rows, np.maximum(self.patient_zero, 0)]
+        self.infected |= np.where(spreading, contacts, np.uint32(0)).astype(np.uint32)
+
+        # Mortes na ordem de final_deaths, cada uma com sua conferência de fim de jogo; na resolução pendente não há mortes
+        applying = self.running & ~pending
+        for dying, target in deaths:
+            self._die(dying & applying, target)
+        for victim in range(seats):
+            self._die(exterminating & applying & infected_alive[:, victim], np.full(games, victim))
+        self.check_end(applying)
+
+        resolving = pending & self.running
+        self.pending &= ~resolving
+        self._finish(resolving & self._alive_role(MAYOR), CITY_WIN)
+        self._resolve(resolving)
+
+    def day(self):
+        np, rows = self.np, self.rows
+        games, seats = self.alive.shape
+
+        # Habilidades do dia, antes dos votos: disparo do Xerife, Decreto e Fraude
+        sheriff = self.seat[SHERIFF]
+        shot, has_shot = self._choose(self._others(sheriff))
+        max_shots = 1 if seats <= 6 else 2
+        shooting = (self.playing & self._alive_role(SHERIFF) & has_shot & self._chance(SHERIFF_SHOT_CHANCE)
+                    & (self.sheriff_shots < max_shots))
+        self.sheriff_shots += shooting
+        hit = self.role[rows, shot]
+        self._finish(shooting & (hit == ALPHA), CITY_WIN)
+        self._finish(shooting & (hit == MAYOR), VILLAINS_WIN)
+        self._die(shooting, shot)
+        self.check_end(shooting) # /disparar confere de novo, já sem a exceção da vítima vilã
+        playing = self.playing
+        decree = playing & self._alive_role(MAYOR) & ~self.decree_used & self._chance(DECREE_CHANCE)
+        self.decree_used |= decree
+        fraud = playing & self._alive_role(ACCOMPLICE) & ~self.fraud_used & self._chance(FRAUD_CHANCE)
+        self.fraud_used |= fraud
+
+        # Cada jogador vota num outro jogador vivo sorteado: o r-ésimo vivo, pulando a si mesmo
+        alive = self.alive
+        alive_seats = np.argsort(~alive, axis=1, kind="stable") # Assentos vivos primeiro, em ordem
+        rank = np.cumsum(alive, axis=1, dtype=np.int16) - 1
+        alive_count = rank[:, -1] + 1
+        choice = (self.rng.random((games, seats), dtype=np.float32) * np.maximum(alive_count - 1, 0)[:, None]).astype(np.int16)
+        choice += choice >= rank
+        votes = np.take_along_axis(alive_seats, np.minimum(choice, seats - 1), axis=1)
+        # Os vilões votam juntos no alvo combinado e nunca pulam
+        plan, has_plan = self._choose(alive & (self.faction != VILLAINS))
+        coordinated = (self.faction == VILLAINS) & has_plan[:, None]
+        votes = np.where(coordinated, plan[:, None], votes)
+        voted = alive & (alive_count[:, None] > 1) & (coordinated | (self.rng.random((games, seats), dtype=np.float32) >= SKIP_VOTE_CHANCE))
+
+        if fraud.any():
+            # A Fraude embaralha os alvos entre quem votou
+            keys = self.rng.random((games, seats))
+            keys[~voted] = 2
+            shuffled = votes.copy()
+            shuffled[rows[:, None], np.argsort(~voted, axis=1, kind="stable")] = np.take_along_axis(votes, np.argsort(keys, axis=1), axis=1)
+            votes = np.where(fraud[:, None], shuffled, votes)
+        # Com o Decreto, o voto da Cidade vale 2 e o do Prefeito, 3
+        weights = np.where(decree[:, None], np.where(self.role == MAYOR, 3, np.where(self.faction == CITY, 2, 1)), 1)
+
+        ballots = (rows[:, None] * seats + votes)[voted]
+        counts = np.bincount(ballots, weights=weights[voted], minlength=games * seats).reshape(games, seats)
+        majority = alive_count // 2 + 1
+        top = counts.max(axis=1)
+        lynched = counts.argmax(axis=1)
+        lynch = (playing & ((alive & ~voted).sum(axis=1) < majority) & (top >= majority)
+                 & ((counts == top[:, None]).sum(axis=1) == 1))
+        # O Prefeito escapa do primeiro linchamento
+        saved = lynch & (self.role[rows, lynched] == MAYOR) & ~self.mayor_saved
+        self.mayor_saved |= saved
+        lynch &= ~saved
+
+        clown = lynch & (self.role[rows, lynched] == CLOWN)
+        self._die(lynch, lynched, lynched=True)
+        self._finish(clown, CLOWN_WIN)
+        self.check_end(playing)
+
+    def seventh_day(self):
+        """Confronto Final com alvos sorteados, ou a vitória do Sétimo Dia para quem restou."""
+        villains_alive = (self.alive & (self.faction == VILLAINS)).any(axis=1)
+        confront = self.playing & self._alive_role(MAYOR) & villains_alive
+        self._resolve(self.playing & ~confront)
+
+        for _ in range(SHOWDOWN_SHOTS):
+            sheriff = self.seat[SHERIFF]
+            shot, has_shot = self._choose(self._others(sheriff))
+            shooting = confront & self.running & self._alive_role(SHERIFF) & (self.sheriff_shots < SHOWDOWN_SHOTS) & has_shot
+            self.sheriff_shots += shooting
+            hit = self.role[self.rows, shot]
+            self._finish(shooting & (hit == MAYOR), VILLAINS_WIN)
+            self._finish(shooting & (hit == ALPHA), CITY_WIN)
+            self._die(shooting, shot)
+
+        # O ataque final é de um Alfa, Júnior ou Cúmplice vivo; sem nenhum, a partida fica sem desfecho
+        attacker = self._alive_role(ALPHA) | self._alive_role(JUNIOR) | self._alive_role(ACCOMPLICE)
+        attacking = confront & attacker
+        target, has_target = self._choose(self.alive & (self.faction == CITY))
+        self._finish(attacking & (~has_target | (self.role[self.rows, target] == MAYOR)), VILLAINS_WIN)
+        self._finish(attacking, CITY_WIN)
+        self._finish(confront & self.running, NOBODY)
+
+    def play(self):
+        for number in range(1, config.MAX_GAME_NIGHTS + 1):
+            self._drop_finished()
+            if not len(self.rows):
+                break
+            self.night(number)
+            self.day()
+        self.seventh_day()
+        self._drop_finished()
+        # Sobram as partidas com resolução pendente aberta no último dia: elas ainda têm a sua noite
+        if len(self.rows):
+            self.night(config.MAX_GAME_NIGHTS + 1)
+            self._drop_finished()
+
+
+# --- Varredura ---
+
+def simulate_composition(composition: Dict[str, int], games: int, seed: int = 0, pool: Optional[Dict[str, Any]] = None,
+                         weights: Optional[Dict[str, float]] = None, chunk: int = DEFAULT_CHUNK) -> Dict[str, Any]:
+    """Joga `games` partidas de uma composição e retorna a taxa de cada resultado e a média de noites."""
+    np = _import_numpy()
+    rng = np.random.default_rng(seed)
+    outcomes = np.zeros(len(OUTCOMES), dtype=np.int64)
+    nights = 0
+    for first in range(0, games, chunk):
+        faction, role = deal_roles(np, rng, composition, min(chunk, games - first), pool, weights)
+        batch = GameBatch(np, rng, faction, role)
+        batch.play()
+        outcomes += batch.outcome_counts
+        nights += batch.nights_played
+    return {
+        "composition": dict(composition),
+        "games": games,
+        "mean_nights": round(nights / games, 3),
+        "outcomes": {name: round(int(count) / games, 4) for name, count in zip(OUTCOMES, outcomes) if count},
+    }
+
+def composition_variants(num_players: int, pool: Optional[Dict[str, Any]] = None) -> List[Dict[str, int]]:
+    """Divisões Cidade/Vilões/Solo de num_players que o ROLE_POOL consegue montar, com menos vilões que não vilões."""
+    np = _import_numpy()
+    rng = np.random.default_rng(0)
+    variants = []
+    for villains in range(1, (num_players + 1) // 2):
+        for solo in range(0, num_players - villains):
+            composition = {"Cidade": num_players - villains - solo, "Vilões": villains, "Solo": solo}
+            try:
+                deal_roles(np, rng, composition, 1, pool)
+            except BalanceError:
+                continue
+            variants.append(composition)
+    return variants
+
+def sweep(sizes: List[int], games: int, variants: bool = False, weights: Optional[Dict[str, float]] = None,
+          seed: int = 42, chunk: int = DEFAULT_CHUNK) -> Dict[str, Any]:
+    """Simula a composição configurada de cada tamanho (e, com variants, todas as alternativas possíveis)."""
+    np = _import_numpy()
+    start = time.perf_counter()
+    results = []
+    for size in sizes:
+        entry: Dict[str, Any] = {"players": size}
+        if configured := config.GAME_COMPOSITIONS.get(str(size)):
+            try:
+                entry["configured"] = simulate_composition(configured, games, seed, weights=weights, chunk=chunk)
+            except BalanceError as e:
+                entry["configured"] = {"composition": dict(configured), "error": str(e)}
+        if variants:
+            entry["variants"] = [simulate_composition(variant, games, seed, weights=weights, chunk=chunk)
+                                 for variant in composition_variants(size)]
+        results.append(entry)
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "games_per_composition": games,
+        "seed": seed,
+        "weights": weights or {},
+        "elapsed_s": round(time.perf_counter() - start, 3),
+        "results": results,
+    }
+
+def _parse_weight(text: str) -> Tuple[str, float]:
+    name, separator, value = text.rpartition("=")
+    if not separator or not name:
+        raise argparse.ArgumentTypeError(f"Use Papel=peso (recebido: {text!r}).")
+    try:
+        return name, float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Peso inválido para {name}: {value!r}.")
+
+def _format_outcomes(result: Dict[str, Any]) -> str:
+    if "error" in result:
+        return f"não pode ser montada ({result['error']})"
+    return ", ".join(f"{name} {rate:.1%}" for name, rate in result["outcomes"].items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Varredura vetorizada de composições de partida.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=sorted(int(size) for size in config.GAME_COMPOSITIONS), help="Tamanhos de sala.")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="Partidas por composição.")
+    parser.add_argument("--variants", action="store_true", help="Simula também as outras divisões Cidade/Vilões/Solo possíveis.")
+    parser.add_argument("--weight", type=_parse_weight, action="append", default=[], metavar="PAPEL=PESO",
+                        help="Peso de um papel opcional do ROLE_POOL no sorteio (padrão 1; 0 tira o papel).")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help=argparse.SUPPRESS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout).")
+    args = parser.parse_args()
+
+    report = sweep(args.sizes, args.games, args.variants, dict(args.weight), args.seed, args.chunk)
+    for entry in report["results"]:
+        if configured := entry.get("configured"):
+            print(f"{entry['players']:>2} jogadores {configured['composition']}: {_format_outcomes(configured)}", file=sys.stderr)
+        for variant in entry.get("variants", []):
+            print(f"   variante {variant['composition']}: {_format_outcomes(variant)}", file=sys.stderr)
+    print(f"{report['elapsed_s']}s", file=sys.stderr)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
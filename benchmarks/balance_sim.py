@@ -0,0 +1,545 @@
+# benchmarks/balance_sim.py
+"""
+Simulador Monte Carlo de partidas completas, para medir o balanceamento de GAME_COMPOSITIONS e ROLE_POOL.
+
+Uso:
+    python -m benchmarks.balance_sim [--sizes 5 8 16] [--games 2000] [--policy aleatoria] [--processes N] [--output resultados.json]
+
+As partidas rodam com as regras reais dos cogs: a distribuição de papéis (GameSetupCog._distribute_roles),
+os comandos de ação (callbacks dos slash commands do ActionsCog), a resolução da noite, o linchamento
+(process_lynch) e as condições de vitória (GameFlowCog.check_game_end). Só a E/S do Discord é trocada:
+os jogadores são membros simulados e os cogs sem interface (_Headless*) não usam timers, voz, imagens nem
+o Confronto Final interativo. As decisões dos jogadores vêm de uma política (Policy), escolhida pelo nome
+ou por "pacote.modulo:Classe".
+
+As partidas são divididas em lotes entre os processos de um multiprocessing.Pool. Cada partida tem a sua
+semente, então o resultado não depende da quantidade de processos. A saída é um JSON com as taxas de
+vitória por facção e por papel para cada tamanho de sala (stdout ou --output).
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, List, Any, Optional, Tuple, Type, NamedTuple
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+import config
+from cogs.actions import ActionsCog
+from cogs.game_flow import GameFlowCog
+from cogs.game_instance import GameInstance, PlayerState
+from cogs.game_setup import GameSetupCog
+from roles.cidade_roles import GuardaCostas, Detetive, Anjo, Xerife, Prefeito, Medium, VidenteDeAura
+from roles.viloes_roles import AssassinoAlfa, AssassinoJunior, Cumplice
+from roles.solo_roles import Fofoqueiro, Bruxo, Cupido, Praga, Corruptor
+
+DEFAULT_GAMES = 2_000
+DEFAULT_BATCH = 250
+VILLAINS = "Vilões"
+
+Command = Tuple[str, Dict[str, Any]] # (nome do slash command do ActionsCog, opções)
+
+
+# --- Objetos simulados do Discord ---
+
+class _SimMember:
+    def __init__(self, member_id: int, name: str):
+        self.id = member_id
+        self.display_name = name
+        self.mention = f"<@{member_id}>"
+        self.bot = False
+        self.voice = None
+
+    def __str__(self) -> str:
+        return self.display_name
+
+    async def send(self, content=None, **kwargs):
+        return None
+
+class _SimChannel:
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+        self.name = f"simulacao-{channel_id}"
+        self.guild = SimpleNamespace(id=0, name="Simulação", get_member=lambda member_id: None)
+
+    async def send(self, content=None, **kwargs):
+        return None
+
+class _SimContext:
+    """Contexto de um slash command executado por um jogador simulado (as respostas são descartadas)."""
+    def __init__(self, bot: "_SimBot", game: GameInstance, author: _SimMember):
+        self.bot = bot
+        self.game = game
+        self.author = author
+
+    async def respond(self, content=None, **kwargs):
+        return None
+
+class _SimGameManager:
+    def __init__(self):
+        self.games: Dict[int, GameInstance] = {}
+
+    def get_game(self, channel_id: int) -> Optional[GameInstance]:
+        return self.games.get(channel_id)
+
+    def map_player_to_game(self, player_id: int, channel_id: int):
+        pass
+
+    def end_game(self, channel_id: int):
+        self.games.pop(channel_id, None)
+
+class _SimBot:
+    def __init__(self):
+        self.game_manager = _SimGameManager()
+        self.cogs: Dict[str, Any] = {}
+        self.voice_clients: List[Any] = []
+
+    def get_cog(self, name: str):
+        return self.cogs.get(name)
+
+
+# --- Políticas dos jogadores ---
+
+class Policy:
+    """
+    Decide o que cada jogador simulado faz. As decisões são comandos do bot, executados pelos callbacks
+    reais do ActionsCog, então as validações e os efeitos dos comandos valem como numa partida de verdade.
+    Uma instância é criada por partida, com o rng da partida.
+    """
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def night_commands(self, game: GameInstance, player: PlayerState) -> List[Command]:
+        return []
+
+    def day_commands(self, game: GameInstance, player: PlayerState) -> List[Command]:
+        return []
+
+    def vote(self, game: GameInstance, player: PlayerState) -> Optional[int]:
+        """Id do jogador em quem votar, ou None para pular a votação."""
+        return None
+
+    def showdown_target(self, game: GameInstance, actor: PlayerState, targets: List[PlayerState]) -> Optional[int]:
+        """Alvo do Xerife ou do vilão atacante no Confronto Final do Sétimo Dia (None = não agir)."""
+        return None
+
+
+class RandomPolicy(Policy):
+    """Cada jogador usa a habilidade do seu papel em alvos sorteados; os vilões não atacam nem votam em vilões."""
+    POSSESS_CHANCE = 0.2
+    CONFUSE_CHANCE = 0.25
+    WITCH_KILL_CHANCE = 0.3
+    WITCH_REVIVE_CHANCE = 0.5
+    EXTERMINATE_CHANCE = 0.3
+    SHERIFF_SHOT_CHANCE = 0.15
+    DECREE_CHANCE = 0.2
+    FRAUD_CHANCE = 0.1
+    SKIP_VOTE_CHANCE = 0.1
+
+    def _others(self, game: GameInstance, player: PlayerState) -> List[PlayerState]:
+        return [p for p in game.get_alive_players_states() if p is not player]
+
+    def _dead(self, game: GameInstance) -> List[PlayerState]:
+        return [p for p in game.players.values() if not p.is_alive]
+
+    def _pick(self, states: List[PlayerState]) -> Optional[str]:
+        return self.rng.choice(states).member.display_name if states else None
+
+    def villain_target(self, game: GameInstance, player: PlayerState) -> Optional[str]:
+        return self._pick([p for p in self._others(game, player) if p.role.faction != VILLAINS])
+
+    def night_commands(self, game: GameInstance, player: PlayerState) -> List[Command]:
+        rng, role = self.rng, player.role
+        others = self._others(game, player)
+        if not player.is_alive:
+            return [("assombrar", {"jogador": self._pick(others)})] if player.is_ghost and others else []
+        if not others:
+            return []
+
+        commands: List[Command] = []
+        if game.current_night == 1 and isinstance(role, (Cumplice, AssassinoJunior, Fofoqueiro, Praga)):
+            commands.append(("escolher_alvo", {"jogador": self._pick(others)}))
+
+        if role.faction == VILLAINS:
+            targets = [p for p in others if p.role.faction != VILLAINS]
+            if isinstance(role, AssassinoAlfa) and len(game.players) >= 11 and targets and rng.random() < self.POSSESS_CHANCE:
+                commands.append(("possuir", {"jogador": self._pick(targets)}))
+            elif isinstance(role, AssassinoJunior) and targets and rng.random() < self.CONFUSE_CHANCE:
+                commands.append(("confundir", {"jogador": self._pick(targets)}))
+            elif target := self.villain_target(game, player):
+                commands.append(("eliminar", {"jogador": target}))
+        elif isinstance(role, GuardaCostas):
+            commands.append(("proteger", {"jogador": self._pick(others)}))
+        elif isinstance(role, Corruptor):
+            commands.append(("corromper", {"jogador": self._pick(others)}))
+        elif isinstance(role, Detetive):
+            if len(game.players) <= 5:
+                commands.append(("marcar", {"jogador1": self._pick(others)}))
+            elif len(others) >= 2:
+                first, second = rng.sample(others, 2)
+                commands.append(("marcar", {"jogador1": first.member.display_name, "jogador2": second.member.display_name}))
+        elif isinstance(role, VidenteDeAura):
+            commands.append(("investigar_aura", {"jogador": self._pick(others)}))
+        elif isinstance(role, Medium):
+            spirits = [p for p in self._dead(game) if not p.is_ghost]
+            if spirits and not game.medium_talk_used:
+                commands.append(("mediunidade", {"jogador_morto": self._pick(spirits)}))
+        elif isinstance(role, Anjo):
+            dead = self._dead(game)
+            if dead and not game.angel_revive_used:
+                # O Anjo prioriza o Prefeito, de quem depende a vitória da Cidade
+                mayor = [p for p in dead if isinstance(p.role, Prefeito)]
+                commands.append(("reviver", {"jogador": self._pick(mayor or dead)}))
+        elif isinstance(role, Bruxo):
+            dead = self._dead(game)
+            if not game.witch_potion_used:
+                roll = rng.random()
+                if roll < self.WITCH_KILL_CHANCE:
+                    commands.append(("eliminar", {"jogador": self._pick(others)}))
+                elif dead and roll < self.WITCH_REVIVE_CHANCE:
+                    commands.append(("reviver", {"jogador": self._pick(dead)}))
+        elif isinstance(role, Praga):
+            if game.current_night > 1 and not game.plague_exterminate_used and rng.random() < self.EXTERMINATE_CHANCE:
+                commands.append(("exterminar", {}))
+        elif isinstance(role, Cupido):
+            if game.current_night == 1 and len(others) >= 2:
+                first, second = rng.sample(others, 2)
+                commands.append(("apaixonar", {"jogador1": first.member.display_name, "jogador2": second.member.display_name}))
+        return commands
+
+    def day_commands(self, game: GameInstance, player: PlayerState) -> List[Command]:
+        rng, role = self.rng, player.role
+        if isinstance(role, Xerife) and rng.random() < self.SHERIFF_SHOT_CHANCE and (target := self._pick(self._others(game, player))):
+            return [("disparar", {"jogador": target})]
+        if isinstance(role, Prefeito) and not game.decreto_used and rng.random() < self.DECREE_CHANCE:
+            return [("decreto", {})]
+        if isinstance(role, Cumplice) and not game.fraud_used and rng.random() < self.FRAUD_CHANCE:
+            return [("fraudar", {})]
+        return []
+
+    def vote(self, game: GameInstance, player: PlayerState) -> Optional[int]:
+        if self.rng.random() < self.SKIP_VOTE_CHANCE:
+            return None
+        candidates = self._others(game, player)
+        if player.role.faction == VILLAINS:
+            candidates = [p for p in candidates if p.role.faction != VILLAINS]
+        return self.rng.choice(candidates).member.id if candidates else None
+
+    def showdown_target(self, game: GameInstance, actor: PlayerState, targets: List[PlayerState]) -> Optional[int]:
+        return self.rng.choice(targets).member.id if targets else None
+
+
+class CoordinatedPolicy(RandomPolicy):
+    """Como a aleatória, mas os vilões combinam o alvo da noite e o voto do dia (todos no mesmo jogador)."""
+    def __init__(self, rng: random.Random):
+        super().__init__(rng)
+        self._plans: Dict[Tuple[str, int], Optional[PlayerState]] = {}
+
+    def _villain_plan(self, game: GameInstance, phase: str, number: int) -> Optional[PlayerState]:
+        key = (phase, number)
+        if key not in self._plans:
+            targets = [p for p in game.get_alive_players_states() if p.role.faction != VILLAINS]
+            self._plans[key] = self.rng.choice(targets) if targets else None
+        return self._plans[key]
+
+    def villain_target(self, game: GameInstance, player: PlayerState) -> Optional[str]:
+        target = self._villain_plan(game, "night", game.current_night)
+        return target.member.display_name if target and target.is_alive else super().villain_target(game, player)
+
+    def vote(self, game: GameInstance, player: PlayerState) -> Optional[int]:
+        if player.role.faction == VILLAINS and (target := self._villain_plan(game, "day", game.current_day)) and target.is_alive:
+            return target.member.id
+        return super().vote(game, player)
+
+
+POLICIES: Dict[str, Type[Policy]] = {"aleatoria": RandomPolicy, "coordenada": CoordinatedPolicy}
+
+def load_policy(name: str) -> Type[Policy]:
+    """Política pelo nome (ver POLICIES) ou pelo caminho "pacote.modulo:Classe"."""
+    if name in POLICIES:
+        return POLICIES[name]
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise ValueError(f"Política desconhecida '{name}'. Use {', '.join(POLICIES)} ou pacote.modulo:Classe.")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+# --- Cogs sem E/S ---
+
+class _HeadlessGameSetup(GameSetupCog):
+    async def _send_role_dm(self, member, role):
+        pass
+
+class _HeadlessGameFlow(GameFlowCog):
+    """GameFlowCog sem timers, imagens e interface: o fim de jogo só registra o resultado."""
+    def __init__(self, bot: _SimBot):
+        super().__init__(bot)
+        self.policy: Optional[Policy] = None
+        self.outcome: Optional[Tuple[str, List[int]]] = None # (facção vencedora, ids dos vencedores)
+
+    async def start_night(self, game: GameInstance):
+        game.current_phase = "night"
+        game.current_night += 1
+        game.sheriff_shot_this_day = False
+        game.death_reasons.clear()
+        game.killers.clear()
+
+    async def end_game(self, game: GameInstance, title: str, winners: List[Any], faction: str, reason: str, error: bool = False, sound_event_key: Optional[str] = None):
+        if not self.bot.game_manager.get_game(game.text_channel.id) and not error: return
+        final_winners = await self._check_and_award_fofoqueiro_win(game, await self._check_and_award_lovers_win(game, await self._check_and_award_bruxo_win(game, list(winners), faction)), faction)
+        game.current_phase = "finished"
+        game.winning_faction = faction
+        self.outcome = (faction, [member.id for member in final_winners])
+        self.bot.game_manager.end_game(game.text_channel.id)
+
+    async def _seventh_day_confrontation(self, game: GameInstance):
+        """O Confronto Final com as escolhas da política no lugar da ShowdownView (mesmas regras, sem pausas)."""
+        channel_id = game.text_channel.id
+        xerife_state = game.get_role_player_state(Xerife, alive_only=True)
+        while xerife_state and game.sheriff_shots_fired < 2 and self.bot.game_manager.get_game(channel_id):
+            targets = [p for p in game.get_alive_players_states() if p is not xerife_state]
+            if not targets: break
+            target_id = self.policy.showdown_target(game, xerife_state, targets)
+            game.sheriff_shots_fired += 1
+            if target_id is None: continue
+            target_state = game.get_player_state_by_id(target_id)
+            if isinstance(target_state.role, Prefeito):
+                await self.end_game(game, "Vitória dos Vilões!", game.get_faction_members(VILLAINS), VILLAINS, "Erro fatal! O Xerife eliminou o Prefeito!"); return
+            if isinstance(target_state.role, AssassinoAlfa):
+                await self.end_game(game, "Vitória da Cidade!", game.get_faction_members("Cidade"), "Cidade", "Tiro certeiro! O Xerife eliminou o Assassino Alfa!"); return
+            game.killers[target_id] = xerife_state.member.id
+            await self.process_death(game, target_state.member, "shot_by_sheriff_showdown")
+        if not self.bot.game_manager.get_game(channel_id): return
+
+        villains_alive = game.get_faction_players_states(VILLAINS, alive_only=True)
+        attacker_state = next((state for role in (AssassinoAlfa, AssassinoJunior, Cumplice) if (state := game.get_role_player_state(role, alive_only=True))), None)
+        if not attacker_state: return
+        targets = game.get_faction_players_states("Cidade", alive_only=True)
+        if not targets: await self.end_game(game, "Vitória dos Vilões!", [p.member for p in villains_alive], VILLAINS, "Não restaram alvos para o ataque final!"); return
+        target_id = self.policy.showdown_target(game, attacker_state, targets)
+        if target_id is None: await self.end_game(game, "Vitória da Cidade!", game.get_faction_members("Cidade"), "Cidade", "Os Vilões hesitaram e a Cidade venceu!"); return
+        if isinstance(game.get_player_state_by_id(target_id).role, Prefeito):
+            await self.end_game(game, "Vitória dos Vilões!", [p.member for p in villains_alive], VILLAINS, f"O {attacker_state.role.name} eliminou o Prefeito!")
+        else:
+            await self.end_game(game, "Vitória da Cidade!", game.get_faction_members("Cidade"), "Cidade", "O Prefeito sobreviveu ao ataque final!")
+
+
+# --- Simulação ---
+
+class GameResult(NamedTuple):
+    faction: str # Facção vencedora ("Ninguém" em empates)
+    nights: int
+    roles: List[Tuple[str, bool]] # (papel no fim da partida, venceu) de cada jogador
+
+
+class Simulator:
+    """Joga partidas completas com os cogs reais, uma de cada vez, no event loop atual."""
+    def __init__(self, policy_class: Type[Policy]):
+        self.policy_class = policy_class
+        self.bot = _SimBot()
+        self.setup = _HeadlessGameSetup(self.bot)
+        self.actions = ActionsCog(self.bot)
+        self.flow = _HeadlessGameFlow(self.bot)
+        self.bot.cogs = {"GameSetupCog": self.setup, "ActionsCog": self.actions, "GameFlowCog": self.flow}
+        self._channel_id = 0
+
+    def _running(self, game: GameInstance) -> bool:
+        return self.bot.game_manager.get_game(game.text_channel.id) is not None
+
+    async def _command(self, game: GameInstance, player: PlayerState, name: str, options: Dict[str, Any]):
+        await getattr(ActionsCog, name).callback(self.actions, _SimContext(self.bot, game, player.member), **options)
+
+    async def _night(self, game: GameInstance, policy: Policy) -> bool:
+        """Ações e resolução da noite. Retorna True se a partida não segue para o dia."""
+        for player in list(game.players.values()):
+            for name, options in policy.night_commands(game, player):
+                await self._command(game, player, name, options)
+        night_results = await self.actions.resolve_night_actions(game)
+        return await self.flow.apply_night_results(game, night_results)
+
+    async def _day(self, game: GameInstance, policy: Policy) -> bool:
+        """Habilidades do dia, votação e linchamento. Retorna True se a partida não segue para a noite."""
+        game.current_phase = "day_voting"
+        game.current_day += 1
+        game.clear_daily_states()
+        for player in game.get_alive_players_states():
+            for name, options in policy.day_commands(game, player):
+                await self._command(game, player, name, options)
+                if not self._running(game): return True
+        # Os votos são gravados como em /votar e /pular (sem o encerramento antecipado do /pular)
+        for player in game.get_alive_players_states():
+            if (target_id := policy.vote(game, player)) is None:
+                game.day_skip_votes.add(player.member.id)
+            else:
+                game.day_votes[player.member.id] = target_id
+        lynch_result = await self.actions.process_lynch(game)
+        if lynch_result.get("game_over") or not self._running(game): return True
+        return await self.flow.check_game_end(game, "após o linchamento")
+
+    async def play(self, num_players: int, seed: int) -> Optional[GameResult]:
+        """Joga uma partida até o fim. None se _distribute_roles não conseguir montar a sala."""
+        random.seed(seed)
+        self.actions.rng.seed(seed)
+        policy = self.policy_class(random.Random(seed))
+        self.flow.policy, self.flow.outcome = policy, None
+        self._channel_id += 1
+        members = [_SimMember(i, f"Jogador{i}") for i in range(1, num_players + 1)]
+        game = GameInstance(self.bot, _SimChannel(self._channel_id), None, members[0])
+        self.bot.game_manager.games[game.text_channel.id] = game
+        for member in members:
+            game.add_player(member)
+        if not await self.setup._distribute_roles(game, members):
+            self.bot.game_manager.end_game(game.text_channel.id)
+            return None
+
+        await self.flow.start_night(game)
+        # Cada volta é uma noite (e o dia seguinte); a resolução pendente do Prefeito abre uma noite extra
+        for _ in range(config.MAX_GAME_NIGHTS + 2):
+            night = game.current_night
+            if await self._night(game, policy) or await self._day(game, policy):
+                if not self._running(game): break
+                if game.current_night != night: continue
+            if game.current_night >= config.MAX_GAME_NIGHTS:
+                await self.flow.check_seventh_day_win(game)
+                break
+            await self.flow.start_night(game)
+        if self._running(game):
+            await self.flow.end_game(game, "Partida interrompida", [], "Ninguém", "Limite de noites da simulação.")
+
+        faction, winner_ids = self.flow.outcome
+        winners = set(winner_ids)
+        return GameResult(faction, game.current_night, [(p.role.name, p.member.id in winners) for p in game.players.values()])
+
+
+# --- Execução em processos ---
+
+_simulator: Optional[Simulator] = None
+
+def _init_worker(policy_name: str):
+    global _simulator
+    logging.disable(logging.CRITICAL)
+    _simulator = Simulator(load_policy(policy_name))
+
+def _new_totals() -> Dict[str, Any]:
+    return {"games": 0, "setup_failures": 0, "nights": 0, "factions": Counter(), "role_games": Counter(), "role_wins": Counter()}
+
+def _add_result(totals: Dict[str, Any], result: Optional[GameResult]):
+    if result is None:
+        totals["setup_failures"] += 1
+        return
+    totals["games"] += 1
+    totals["nights"] += result.nights
+    totals["factions"][result.faction] += 1
+    for role_name, won in result.roles:
+        totals["role_games"][role_name] += 1
+        totals["role_wins"][role_name] += won
+
+async def _play_batch(num_players: int, seeds: range) -> Dict[str, Any]:
+    totals = _new_totals()
+    for seed in seeds:
+        _add_result(totals, await _simulator.play(num_players, seed))
+    return totals
+
+def _run_batch(task: Tuple[int, int, int]) -> Tuple[int, Dict[str, Any]]:
+    num_players, first_seed, count = task
+    return num_players, asyncio.run(_play_batch(num_players, range(first_seed, first_seed + count)))
+
+def _game_seed(seed: int, num_players: int, index: int) -> int:
+    return (seed << 40) | (num_players << 32) | index
+
+def _report_size(num_players: int, totals: Dict[str, Any]) -> Dict[str, Any]:
+    games = totals["games"]
+    return {
+        "players": num_players,
+        "games": games,
+        # Partidas em que a composição configurada não pôde ser montada (pool de papéis pequeno demais)
+        "setup_failures": totals["setup_failures"],
+        "mean_nights": round(totals["nights"] / games, 3) if games else None,
+        "factions": {faction: {"wins": wins, "rate": round(wins / games, 4)} for faction, wins in totals["factions"].most_common()},
+        "roles": {
+            role_name: {"games": played, "wins": totals["role_wins"][role_name], "rate": round(totals["role_wins"][role_name] / played, 4)}
+            for role_name, played in sorted(totals["role_games"].items())
+        },
+    }
+
+def simulate(sizes: List[int], games: int, policy_name: str, processes: int, seed: int = 42, batch: int = DEFAULT_BATCH) -> Dict[str, Any]:
+    """Simula `games` partidas para cada tamanho de sala e monta o relatório."""
+    load_policy(policy_name) # Falha aqui, e não dentro dos processos, se a política não existir
+    tasks = [(size, _game_seed(seed, size, first), min(batch, games - first)) for size in sizes for first in range(0, games, batch)]
+    totals = {size: _new_totals() for size in sizes}
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(policy_name,)) as pool:
+        for size, partial in pool.imap_unordered(_run_batch, tasks):
+            merged = totals[size]
+            for key in ("games", "setup_failures", "nights"):
+                merged[key] += partial[key]
+            for key in ("factions", "role_games", "role_wins"):
+                merged[key].update(partial[key])
+    elapsed = time.perf_counter() - start
+    total_games = games * len(sizes)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "policy": policy_name,
+        "processes": processes,
+        "seed": seed,
+        "elapsed_s": round(elapsed, 3),
+        "games_per_minute": round(total_games / elapsed * 60),
+        "results": [_report_size(size, totals[size]) for size in sizes],
+    }
+
+def _print_summary(report: Dict[str, Any]):
+    """Resumo legível (stderr): taxa de vitória das facções principais por tamanho de sala."""
+    print(f"{report['games_per_minute']} partidas/min com {report['processes']} processo(s)", file=sys.stderr)
+    for result in report["results"]:
+        if not result["games"]:
+            print(f"{result['players']:>2} jogadores: a composição não pôde ser montada com o ROLE_POOL atual", file=sys.stderr)
+            continue
+        rates = ", ".join(f"{faction} {data['rate']:.1%}" for faction, data in result["factions"].items())
+        print(f"{result['players']:>2} jogadores ({result['games']} partidas, {result['mean_nights']:.1f} noites): {rates}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulação Monte Carlo do balanceamento das partidas.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=sorted(int(size) for size in config.GAME_COMPOSITIONS), help="Tamanhos de sala.")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="Partidas por tamanho de sala.")
+    parser.add_argument("--policy", default="aleatoria", help=f"{', '.join(POLICIES)} ou pacote.modulo:Classe.")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH, help="Partidas por tarefa do pool.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout).")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+
+    invalid = [size for size in args.sizes if str(size) not in config.GAME_COMPOSITIONS]
+    if invalid:
+        parser.error(f"Sem composição em game_configs.json para: {', '.join(map(str, invalid))}.")
+    try:
+        load_policy(args.policy)
+    except (ValueError, ImportError, AttributeError) as e:
+        parser.error(str(e))
+    report = simulate(args.sizes, args.games, args.policy, args.processes, args.seed, args.batch)
+    _print_summary(report)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/night_equivalence.py
+"""
+Verificação de equivalência das regras entre uma revisão de referência e a árvore de trabalho.
+
+Uso:
+    python -m benchmarks.night_equivalence [--ref HEAD~1] [--sizes 6 8 10 12] [--games 2000] [--seed 42]
+
+A revisão de referência é extraída com git archive para um diretório temporário e as duas árvores jogam
+as mesmas partidas semeadas do benchmarks.balance_sim, com cada política. Como toda a aleatoriedade
+vem das sementes, uma refatoração que não muda as regras produz relatórios idênticos (tirando os campos
+de tempo). Sai com código 1 e lista as diferenças se algum relatório divergir.
+
+A referência precisa ter o benchmarks/balance_sim.py, ou seja, ser posterior à sua introdução.
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+from typing import Dict, List, Any
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+POLICIES = ("aleatoria", "coordenada")
+# Campos do relatório que dependem da máquina e do tempo, não das regras
+TIMING_FIELDS = ("python", "platform", "processes", "elapsed_s", "games_per_minute")
+
+
+def extract_revision(ref: str, destination: str):
+    """Extrai os arquivos versionados de ref (sem o histórico) para destination."""
+    archive = subprocess.run(["git", "archive", "--format=tar", ref], cwd=_REPO_ROOT, check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(destination)
+    if not os.path.exists(os.path.join(destination, "benchmarks", "balance_sim.py")):
+        raise ValueError(f"A revisão {ref} não tem benchmarks/balance_sim.py.")
+
+
+def run_balance_sim(tree: str, sizes: List[int], games: int, policy: str, seed: int) -> Dict[str, Any]:
+    """Roda o balance_sim de uma árvore (em um processo, para a mesma ordem de sorteios) e devolve o relatório sem os tempos."""
+    command = [sys.executable, "-m", "benchmarks.balance_sim", "--sizes", *map(str, sizes), "--games", str(games),
+               "--policy", policy, "--processes", "1", "--seed", str(seed)]
+    completed = subprocess.run(command, cwd=tree, check=True, capture_output=True, text=True)
+    report = json.loads(completed.stdout)
+    for field in TIMING_FIELDS:
+        report.pop(field, None)
+    return report
+
+
+def diff_reports(reference: Any, current: Any, path: str = "") -> List[str]:
+    """Caminhos (ex: results[1].factions.Cidade.rate) em que os dois relatórios diferem."""
+    if isinstance(reference, dict) and isinstance(current, dict):
+        return [line for key in sorted(set(reference) | set(current), key=str)
+                for line in diff_reports(reference.get(key), current.get(key), f"{path}.{key}" if path else str(key))]
+    if isinstance(reference, list) and isinstance(current, list) and len(reference) == len(current):
+        return [line for i, (a, b) in enumerate(zip(reference, current)) for line in diff_reports(a, b, f"{path}[{i}]")]
+    return [] if reference == current else [f"{path}: {reference!r} -> {current!r}"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os relatórios do balance_sim entre uma revisão e a árvore de trabalho.")
+    parser.add_argument("--ref", default="HEAD", help="Revisão de referência (padrão: HEAD).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[6, 8, 10, 12], help="Tamanhos de sala.")
+    parser.add_argument("--games", type=int, default=2000, help="Partidas por tamanho de sala e política.")
+    parser.add_argument("--policy", choices=POLICIES, action="append", help="Política (padrão: todas).")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    differences: List[str] = []
+    with tempfile.TemporaryDirectory(prefix="cidade_dorme_ref_") as reference_tree:
+        try:
+            extract_revision(args.ref, reference_tree)
+        except (subprocess.CalledProcessError, ValueError) as e:
+            parser.error(str(e))
+        for policy in args.policy or POLICIES:
+            reference = run_balance_sim(reference_tree, args.sizes, args.games, policy, args.seed)
+            current = run_balance_sim(_REPO_ROOT, args.sizes, args.games, policy, args.seed)
+            policy_differences = diff_reports(reference, current)
+            status = "idênticos" if not policy_differences else f"{len(policy_differences)} diferença(s)"
+            print(f"{policy}: {args.ref} x árvore de trabalho, {len(args.sizes)} tamanhos x {args.games} partidas: {status}", file=sys.stderr)
+            differences += [f"{policy}: {line}" for line in policy_differences]
+
+    for line in differences:
+        print(line, file=sys.stderr)
+    sys.exit(1 if differences else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+# benchmarks/ranking_bench.py
+"""
+Benchmark do subsistema de ranking (cogs/ranking.py + stats/) com populações sintéticas.
+
+Uso:
+    python -m benchmarks.ranking_bench [--sizes 1000 100000 1000000] [--output resultados.json]
+
+Para cada tamanho, um processo gera o banco sintético e outro processo, limpo, mede as operações.
+Assim o pico de memória (RSS) e os bytes gravados (/proc/self/io) de cada população são
+independentes. Os objetos do Discord são simulados. O resultado sai em JSON (stdout ou --output).
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Dict, Any, Optional, List
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+import config
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+GAME_SIZE = 16
+_FIRST_ID = 10 ** 17 # ids no formato de snowflakes do Discord
+
+
+# --- Objetos simulados do Discord ---
+
+class _FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.name = "Servidor de Benchmark"
+
+class _FakeMember:
+    def __init__(self, member_id: int, name: str):
+        self.id = member_id
+        self.display_name = name
+        self.mention = f"<@{member_id}>"
+        self.bot = False
+        self.accent_color = None
+        self.display_avatar = SimpleNamespace(url="https://cdn.discordapp.com/embed/avatars/0.png")
+
+class _FakeChannel:
+    def __init__(self, channel_id: int, guild: _FakeGuild):
+        self.id = channel_id
+        self.name = "benchmark"
+        self.guild = guild
+
+    async def send(self, content=None, **kwargs):
+        return SimpleNamespace(id=0)
+
+class _FakeContext:
+    def __init__(self, author: _FakeMember, guild: _FakeGuild):
+        self.author = author
+        self.guild = guild
+        self.followup = SimpleNamespace(send=self._send)
+
+    async def defer(self, **kwargs):
+        pass
+
+    async def _send(self, content=None, **kwargs):
+        return SimpleNamespace(id=0)
+
+
+# --- Medições ---
+
+def _io_counters() -> Dict[str, int]:
+    """Bytes gravados pelo processo (Linux). Vazio em sistemas sem /proc/self/io."""
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return {"write_bytes": int(fields["write_bytes"]), "wchar": int(fields["wchar"])}
+    except (OSError, KeyError, ValueError):
+        return {}
+
+def _current_rss_kb() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return None
+
+@contextlib.contextmanager
+def _measure(results: Dict[str, Any], name: str):
+    io_before = _io_counters()
+    start = time.perf_counter()
+    yield
+    wall = time.perf_counter() - start
+    io_after = _io_counters()
+    results[name] = {
+        "wall_s": round(wall, 6),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "rss_kb": _current_rss_kb(),
+        **{key: io_after[key] - io_before[key] for key in io_after},
+    }
+
+
+# --- Geração da população sintética ---
+
+def _configure_paths(data_dir: str):
+    """Aponta todos os arquivos do ranking para o diretório temporário (antes de importar o cog)."""
+    config.DATA_PATH = data_dir
+    config.RANKING_FILE = os.path.join(data_dir, "ranking.json")
+    config.RANKING_DB_FILE = os.path.join(data_dir, "ranking.db")
+    config.RANKING_GUILDS_PATH = os.path.join(data_dir, "guilds")
+    config.GAME_LOG_FILE = os.path.join(data_dir, "game_log.jsonl")
+
+def _role_names() -> List[str]:
+    from roles.cidade_roles import cidade_role_classes
+    from roles.viloes_roles import viloes_role_classes
+    from roles.solo_roles import solo_role_classes
+    return [*cidade_role_classes, *viloes_role_classes, *solo_role_classes]
+
+def _synthetic_player(rng: random.Random, index: int, role_names: List[str]) -> Dict[str, Any]:
+    games = int(rng.paretovariate(1.2)) % 500 + 1
+    wins = rng.randint(0, games)
+    roles_won: Dict[str, int] = {}
+    remaining = wins
+    for role_name in rng.sample(role_names, min(len(role_names), rng.randint(1, 5))):
+        if remaining <= 0:
+            break
+        role_wins = rng.randint(1, remaining)
+        roles_won[role_name] = role_wins
+        remaining -= role_wins
+    medals = [medal for threshold, medal in ((50, "Maratonista"), (150, "Lenda da Cidade")) if games >= threshold]
+    return {
+        "nome_jogador": f"Jogador {index}",
+        "partidas_jogadas": games,
+        "vitorias_totais": wins,
+        "vitorias_por_papel": roles_won,
+        "medalhas": medals,
+    }
+
+def generate(data_dir: str, players: int, seed: int = 42, batch: int = 50_000):
+    """Grava um banco de ranking com `players` jogadores sintéticos, em lotes."""
+    _configure_paths(data_dir)
+    from stats.store import RankingStore
+    rng = random.Random(seed)
+    role_names = _role_names()
+    store = RankingStore(config.RANKING_DB_FILE, legacy_json_path=config.RANKING_FILE)
+    for first in range(0, players, batch):
+        rows = {str(_FIRST_ID + i): _synthetic_player(rng, i, role_names) for i in range(first, min(players, first + batch))}
+        store.upsert_players(rows)
+    store.close()
+
+
+# --- Execução das medições ---
+
+async def _run(data_dir: str, players: int, seed: int) -> Dict[str, Any]:
+    _configure_paths(data_dir)
+    from cogs import ranking
+    from cogs.game_instance import GameInstance
+    from roles.cidade_roles import cidade_role_classes
+    from roles.viloes_roles import viloes_role_classes
+    from roles.solo_roles import solo_role_classes
+    from stats.shards import RankingShards
+
+    rng = random.Random(seed)
+    guild = _FakeGuild(1)
+    channel = _FakeChannel(2, guild)
+    bot = SimpleNamespace(get_cog=lambda name: None, game_manager=SimpleNamespace(map_player_to_game=lambda player_id, channel_id: None))
+    cog = ranking.RankingCog(bot)
+    results: Dict[str, Any] = {}
+
+    with _measure(results, "load_ranking"):
+        await ranking.load_ranking()
+    await ranking.ranking_shards.start()
+
+    # Partida de 16 jogadores: metade já está no ranking, metade é nova.
+    role_classes = [*cidade_role_classes.values(), *viloes_role_classes.values(), *solo_role_classes.values()]
+    member_ids = [_FIRST_ID + rng.randrange(players) for _ in range(GAME_SIZE // 2)]
+    member_ids += [_FIRST_ID + players + i for i in range(GAME_SIZE - len(member_ids))]
+    members = [_FakeMember(member_id, f"Jogador {member_id - _FIRST_ID}") for member_id in member_ids]
+    game = GameInstance(bot, channel, None, members[0])
+    for member in members:
+        game.add_player(member)
+        game.set_role(member.id, rng.choice(role_classes)())
+    game.current_night = 3
+    game.winning_faction = "Cidade"
+    winners = game.get_faction_members("Cidade")
+
+    with _measure(results, "update_stats_after_game"):
+        await cog.update_stats_after_game(game, winners)
+
+    batch = {str(member.id): dict(ranking.ranking_cache.get(str(member.id))) for member in members}
+    for stats in batch.values():
+        stats["partidas_jogadas"] += 1
+    with _measure(results, "save_ranking"):
+        await ranking.save_ranking(batch)
+        await ranking.ranking_cache.flush()
+
+    ctx = _FakeContext(members[0], guild)
+    with _measure(results, "show_ranking"):
+        await ranking.RankingCog.show_ranking.callback(cog, ctx, "global", "vitorias")
+    with _measure(results, "show_ranking_cached"):
+        await ranking.RankingCog.show_ranking.callback(cog, ctx, "global", "vitorias")
+    with _measure(results, "show_profile"):
+        await ranking.RankingCog.show_profile.callback(cog, ctx, None)
+    with _measure(results, "show_profile_cached"):
+        await ranking.RankingCog.show_profile.callback(cog, ctx, None)
+
+    with _measure(results, "shutdown_flush_and_snapshot"):
+        cog.cog_unload()
+
+    shards = RankingShards(config.RANKING_DB_FILE, config.RANKING_GUILDS_PATH, use_snapshots=True)
+    with _measure(results, "load_ranking_from_snapshot"):
+        await shards.global_cache.ensure_loaded()
+    shards.close()
+
+    files = {}
+    for name in ("ranking.db", "ranking.snap", "game_log.jsonl"):
+        path = os.path.join(data_dir, name)
+        files[name] = os.path.getsize(path) if os.path.exists(path) else None
+    return {"players": players, "steps": results, "file_bytes": files}
+
+
+def _run_child(args: List[str]) -> str:
+    completed = subprocess.run([sys.executable, "-m", "benchmarks.ranking_bench", *args], cwd=_REPO_ROOT,
+                               stdout=subprocess.PIPE, check=True, text=True)
+    return completed.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do ranking com populações sintéticas.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Quantidades de jogadores.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout).")
+    parser.add_argument("--generate", metavar="DIR", help=argparse.SUPPRESS)
+    parser.add_argument("--measure", metavar="DIR", help=argparse.SUPPRESS)
+    parser.add_argument("--players", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+
+    if args.generate:
+        generate(args.generate, args.players, args.seed)
+        return
+    if args.measure:
+        print(json.dumps(asyncio.run(_run(args.measure, args.players, args.seed))))
+        return
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "game_size": GAME_SIZE,
+        "results": [],
+    }
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory(prefix="ranking_bench_") as data_dir:
+            print(f"Gerando {size} jogadores...", file=sys.stderr)
+            _run_child(["--generate", data_dir, "--players", str(size), "--seed", str(args.seed)])
+            print(f"Medindo {size} jogadores...", file=sys.stderr)
+            output = _run_child(["--measure", data_dir, "--players", str(size), "--seed", str(args.seed)])
+            report["results"].append(json.loads(output.strip().splitlines()[-1]))
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ import logging
 import asyncio
 import random
 import os
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 import config
 from .game_instance import GameInstance, PlayerState
@@ -16,6 +16,8 @@ from roles.base_role import Role
 from roles.cidade_roles import GuardaCostas, Detetive, Anjo, Xerife, Prefeito, Medium, VidenteDeAura, CidadaoComum
 from roles.viloes_roles import AssassinoAlfa, AssassinoJunior, Cumplice, AssassinoSimples
 from roles.solo_roles import Palhaco, Fofoqueiro, Bruxo, Cupido, Praga, Corruptor, CacadorDeCabecas
+from engine.actions import make_night_action
+from engine.night import NightState, resolve_night, Effect, Death, Revival, PlayerChange, GameChange, DirectMessage, SoundEvent, GameOver
 
 logger = logging.getLogger(__name__)
 
@@ -121,19 +123,21 @@ def check_is_ghost():
         return True
     return game_check(check)
 
-def record_night_action(game: GameInstance, player_id: int, role: Role, action_name: str, target_id: Optional[int] = None, priority: int = 50, **kwargs):
-    game.night_actions[player_id] = {"action": action_name, "target_id": target_id, "role": role, "priority": priority, **kwargs}
+def record_night_action(game: GameInstance, player_id: int, role: Role, action_name: str, target_id: Optional[int] = None, extra_ids: Tuple[Optional[int], ...] = ()):
+    """Registra a ação noturna do jogador; a prioridade e a etapa vêm do papel (Role.night_actions)."""
+    game.night_actions[player_id] = make_night_action(player_id, role, action_name, target_id, extra_ids)
     logger.info(f"[Jogo #{game.text_channel.id}] Ação noturna '{action_name}' registrada para {player_id} -> {target_id}")
 
 class ActionsCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.rng = random.Random() # Sorteios da resolução noturna (confusão, pistas do Detetive)
         logger.info("Cog Actions carregado.")
 
     async def distribute_initial_info(self, game: GameInstance):
         logger.info(f"[Jogo #{game.text_channel.id}] Distribuindo informações iniciais da Noite 1.")
         tasks = []
-        villains = [p_state for p_state in game.players.values() if p_state.role and p_state.role.faction == "Vilões"]
+        villains = game.get_faction_players_states("Vilões")
         if len(villains) > 1:
             villain_names = [v.member.display_name for v in villains]
             for villain_state in villains:
@@ -221,7 +225,7 @@ class ActionsCog(commands.Cog):
         if target_state.role.faction == "Vilões":
             await ctx.respond("Você não pode possuir quem já está do seu lado.", ephemeral=True); return
         player_state = game.get_player_state_by_id(ctx.author.id)
-        record_night_action(game, ctx.author.id, player_state.role, "possess", target_member.id, priority=90)
+        record_night_action(game, ctx.author.id, player_state.role, "possess", target_member.id)
         await ctx.respond(f"Sua influência maligna se espalha em direção a **{target_member.display_name}**.", ephemeral=True)
 
     @commands.slash_command(name="comparar", description="(Fofoqueiro) Vê se dois jogadores são do mesmo time (2x por jogo).")
@@ -260,7 +264,7 @@ class ActionsCog(commands.Cog):
         if not target1 or not target2: await ctx.respond(f"Não encontrei um ou ambos: '{jogador1}', '{jogador2}'.", ephemeral=True); return
         if target1 == target2: await ctx.respond("Escolha dois jogadores diferentes!", ephemeral=True); return
         player_state = game.get_player_state_by_id(ctx.author.id)
-        record_night_action(game, ctx.author.id, player_state.role, "cupid_match", priority=10, lover1_id=target1.id, lover2_id=target2.id)
+        record_night_action(game, ctx.author.id, player_state.role, "cupid_match", extra_ids=(target1.id, target2.id))
         await ctx.respond(f"Flecha disparada! 🏹 Você escolheu {target1.display_name} e {target2.display_name}.", ephemeral=True)
 
     @commands.slash_command(name="proteger", description="(Guarda-costas) Escolha um jogador para proteger esta noite.")
@@ -275,7 +279,7 @@ class ActionsCog(commands.Cog):
         if target_member.id == ctx.author.id: await ctx.respond("Você não pode proteger a si mesmo.", ephemeral=True); return
         if game.last_protected_target.get(ctx.author.id) == target_member.id: await ctx.respond("Você já protegeu essa pessoa na noite passada.", ephemeral=True); return
         player_state = game.get_player_state_by_id(ctx.author.id)
-        record_night_action(game, ctx.author.id, player_state.role, "protect", priority=20, target_id=target_member.id)
+        record_night_action(game, ctx.author.id, player_state.role, "protect", target_member.id)
         game.last_protected_target[ctx.author.id] = target_member.id
         await ctx.respond(f"Entendido! Você montará guarda para {target_member.display_name} esta noite.", ephemeral=True)
 
@@ -291,7 +295,7 @@ class ActionsCog(commands.Cog):
         if target_member.id == ctx.author.id: await ctx.respond("Tentar corromper a si mesmo? Ousado...", ephemeral=True); return
         if game.last_corrupted_target.get(ctx.author.id) == target_member.id: await ctx.respond("Você já corrompeu essa pessoa na noite passada.", ephemeral=True); return
         player_state = game.get_player_state_by_id(ctx.author.id)
-        record_night_action(game, ctx.author.id, player_state.role, "corrupt", target_member.id, priority=15)
+        record_night_action(game, ctx.author.id, player_state.role, "corrupt", target_member.id)
         game.last_corrupted_target[ctx.author.id] = target_member.id
         await ctx.respond(f"Você tentará corromper a mente de {target_member.display_name} esta noite.", ephemeral=True)
 
@@ -307,7 +311,7 @@ class ActionsCog(commands.Cog):
         if target_member.id == ctx.author.id: await ctx.respond("Confundir a si mesmo não é uma boa ideia.", ephemeral=True); return
         if game.last_confused_target.get(ctx.author.id) == target_member.id: await ctx.respond("Você já confundiu essa pessoa na noite passada.", ephemeral=True); return
         player_state = game.get_player_state_by_id(ctx.author.id)
-        record_night_action(game, ctx.author.id, player_state.role, "confuse", target_member.id, priority=16)
+        record_night_action(game, ctx.author.id, player_state.role, "confuse", target_member.id)
         game.last_confused_target[ctx.author.id] = target_member.id
         await ctx.respond(f"Você semeia a confusão na mente de **{target_member.display_name}**.", ephemeral=True)
 
@@ -326,8 +330,7 @@ class ActionsCog(commands.Cog):
         if target_member.id == ctx.author.id: await ctx.respond("Se auto-eliminar? Má ideia...", ephemeral=True); return
         if is_witch: game.bruxo_major_action = {"action": "kill", "target_id": target_member.id}
         action_name = "villain_vote" if not is_witch else "witch_kill"
-        priority = 30 if not is_witch else 25
-        record_night_action(game, ctx.author.id, player_state.role, action_name, target_member.id, priority=priority)
+        record_night_action(game, ctx.author.id, player_state.role, action_name, target_member.id)
         await ctx.respond(f"Alvo marcado! {target_member.display_name} está na sua mira.", ephemeral=True)
 
     @commands.slash_command(name="reviver", description="(Anjo/Bruxo) Traga um jogador morto de volta à vida.")
@@ -352,7 +355,7 @@ class ActionsCog(commands.Cog):
         if is_witch: game.bruxo_major_action = {"action": "revive", "target_id": target_member.id}
         game.night_revive_targets.append(target_member.id)
         action_name = "angel_revive" if is_angel else "witch_revive"
-        record_night_action(game, ctx.author.id, player_state.role, action_name, target_member.id, priority=40)
+        record_night_action(game, ctx.author.id, player_state.role, action_name, target_member.id)
         await ctx.respond(f"Você tentará trazer {target_member.display_name} de volta do além.", ephemeral=True)
 
     @commands.slash_command(name="marcar", description="(Detetive) Marque um ou dois jogadores para investigar.")
@@ -369,7 +372,7 @@ class ActionsCog(commands.Cog):
             if jogador2 is not None: await ctx.respond("Em partidas pequenas, só pode investigar uma pessoa.", ephemeral=True); return
             target1 = find_player_by_name(game, jogador1)
             if not target1: await ctx.respond(f"Não encontrei o jogador '{jogador1}'.", ephemeral=True); return
-            record_night_action(game, ctx.author.id, player_state.role, "mark_detective", priority=60, target1_id=target1.id, target2_id=None)
+            record_night_action(game, ctx.author.id, player_state.role, "mark_detective", extra_ids=(target1.id,))
             await ctx.respond(f"Você está de olho em {target1.display_name} esta noite.", ephemeral=True)
         else:
             if jogador2 is None: await ctx.respond("Em partidas com mais de 5 jogadores, marque duas pessoas.", ephemeral=True); return
@@ -377,7 +380,7 @@ class ActionsCog(commands.Cog):
             target2 = find_player_by_name(game, jogador2)
             if not target1 or not target2: await ctx.respond(f"Não encontrei '{jogador1}' ou '{jogador2}'.", ephemeral=True); return
             if target1 == target2: await ctx.respond("Escolha dois jogadores diferentes!", ephemeral=True); return
-            record_night_action(game, ctx.author.id, player_state.role, "mark_detective", priority=60, target1_id=target1.id, target2_id=target2.id)
+            record_night_action(game, ctx.author.id, player_state.role, "mark_detective", extra_ids=(target1.id, target2.id))
             await ctx.respond(f"Você está de olho em {target1.display_name} e {target2.display_name} esta noite.", ephemeral=True)
 
     @commands.slash_command(name="escolher_alvo", description="(Cúmplice/Júnior/Fofoqueiro/Praga) Escolha seu alvo inicial (Noite 1).")
@@ -396,7 +399,7 @@ class ActionsCog(commands.Cog):
             target_state = game.get_player_state_by_id(target_member.id)
             info_message = f"Investigação concluída! O papel de {target_member.display_name} é **{target_state.role.name}**."
             await ctx.respond(info_message, ephemeral=True)
-            all_villains = [p for p in game.players.values() if p.role and p.role.faction == "Vilões" and p.member.id != ctx.author.id]
+            all_villains = [p for p in game.get_faction_players_states("Vilões") if p.member.id != ctx.author.id]
             for villain_state in all_villains:
                 await send_dm_safe(villain_state.member, f"🤫 O Cúmplice descobriu: {target_member.display_name} é **{target_state.role.name}**.")
             game.accomplice_target_info = {'target_id': target_member.id, 'night': game.current_night}
@@ -407,8 +410,7 @@ class ActionsCog(commands.Cog):
             if target_state: target_state.is_infected = True
         elif isinstance(player_state.role, AssassinoJunior): game.junior_marked_target_id = target_member.id
         elif isinstance(player_state.role, Fofoqueiro): game.fofoqueiro_marked_target_id = target_member.id
-        action_name = f"{player_state.role.name.lower().replace(' ', '_')}_target"
-        record_night_action(game, ctx.author.id, player_state.role, action_name, target_member.id, priority=70)
+        record_night_action(game, ctx.author.id, player_state.role, "choose_target", target_member.id)
         await ctx.respond(f"Alvo definido! Você escolheu {target_member.display_name}.", ephemeral=True)
 
     @commands.slash_command(name="investigar_aura", description="(Vidente de Aura) Investiga a facção de um jogador.")
@@ -454,7 +456,7 @@ class ActionsCog(commands.Cog):
         target_member = find_player_by_name(game, jogador)
         if not target_member: await ctx.respond(f"Não achei o jogador '{jogador}'.", ephemeral=True); return
         player_state = game.get_player_state_by_id(ctx.author.id)
-        record_night_action(game, ctx.author.id, player_state.role, "haunt", target_member.id, priority=5)
+        record_night_action(game, ctx.author.id, player_state.role, "haunt", target_member.id)
         await ctx.respond(f"Você focará sua energia espectral em **{target_member.display_name}** esta noite.", ephemeral=True)
         await send_dm_safe(target_member, f"Você sente um arrepio... O fantasma de **{ctx.author.display_name}** está te assombrando. 👻")
 
@@ -466,7 +468,7 @@ class ActionsCog(commands.Cog):
         game = ctx.game
         if game.plague_exterminate_used: await ctx.respond("Você já tentou o extermínio uma vez.", ephemeral=True); return
         player_state = game.get_player_state_by_id(ctx.author.id)
-        record_night_action(game, ctx.author.id, player_state.role, "plague_exterminate", priority=35)
+        record_night_action(game, ctx.author.id, player_state.role, "plague_exterminate")
         await ctx.respond("☣️ Você decidiu que é a hora! Você liberará o poder total da praga!", ephemeral=True)
 
     @commands.slash_command(name="disparar", description="(Xerife) Atira em um jogador durante o dia.")
@@ -500,11 +502,11 @@ class ActionsCog(commands.Cog):
             await send_public_message(self.bot, game.text_channel, f"🚨 {ctx.author.mention} se revelou como o **Xerife**! ⭐")
         target_role = game.get_player_state_by_id(target_member.id).role
         if isinstance(target_role, AssassinoAlfa):
-            winners = [p.member for p in game.players.values() if p.role.faction == "Cidade"]
+            winners = game.get_faction_members("Cidade")
             await game_flow_cog.end_game(game, "Vitória da Cidade!", winners, "Cidade", "O Xerife eliminou o Assassino Alfa!", sound_event_key="SHERIFF_WIN")
             return
         if isinstance(target_role, Prefeito):
-            winners = [p.member for p in game.players.values() if p.role.faction == "Vilões"]
+            winners = game.get_faction_members("Vilões")
             await game_flow_cog.end_game(game, "Vitória dos Vilões!", winners, "Vilões", "O Xerife eliminou o Prefeito!", sound_event_key="VILLAINS_WIN")
             return
         if game_flow_cog:
@@ -592,6 +594,8 @@ class ActionsCog(commands.Cog):
             game.prefeito_saved_once = True
             results["public_messages"].append(f"A votação para linchar **{lynched_member.display_name}** foi esmagadora! No entanto, a cidade reconsiderou."); return results
         results["public_messages"].append(f"Com {max_votes} votos, **{lynched_member.display_name}** foi linchado!")
+        # Quem votou no linchado fica registrado como responsável (grafo de abates do ranking)
+        game.killers[lynched_member.id] = [voter_id for voter_id, target_id in votes.items() if target_id == lynched_member.id]
         if game_flow_cog: await game_flow_cog.process_death(game, lynched_member, "lynched")
         if isinstance(lynched_player_state.role, Palhaco):
             results["sound_event"] = "CLOWN_WIN"
@@ -602,277 +606,53 @@ class ActionsCog(commands.Cog):
             results["sound_event"] = "PLAYER_DEATH"
         return results
 
-    # --- MÉTODOS PRIVADOS DE RESOLUÇÃO NOTURNA (REFATORADOS) ---
+    # --- RESOLUÇÃO NOTURNA ---
+    # As regras ficam em engine/night.py (sem Discord); aqui o estado é copiado, os efeitos aplicados de uma vez
+    # e, no fim de jogo, as mensagens enviadas em paralelo.
 
-    async def _apply_status_effects(self, game: GameInstance, sorted_actions: List[Any], results: Dict):
-        """Aplica efeitos que precisam ser resolvidos primeiro, como confusão e corrupção."""
-        for player_id, action_data in sorted_actions:
-            action_name = action_data["action"]
-            target_id = action_data.get("target_id")
-            
-            # Confusão é aplicada primeiro para afetar outras ações
-            if action_name == "confuse":
-                if target_state := game.get_player_state_by_id(target_id):
-                    target_state.is_confused = True
-
-        # Aplica o efeito da confusão nas ações registradas
-        for player_id, action_data in game.night_actions.items():
-            if (player_state := game.get_player_state_by_id(player_id)) and player_state.is_confused and "target_id" in action_data:
-                original_target_id = action_data["target_id"]
-                is_revive = action_data["action"] in ["angel_revive", "witch_revive"]
-                
-                possible_targets_query = [p.member.id for p in game.players.values() if not p.is_alive] if is_revive else [p.member.id for p in game.get_alive_players_states()]
-                possible_targets = [pid for pid in possible_targets_query if pid not in [player_id, original_target_id]]
-                
-                if possible_targets:
-                    new_target_id = random.choice(possible_targets)
-                    action_data["target_id"] = new_target_id
-                    logger.info(f"Ação de {player_state.member.display_name} confundida! Novo alvo: {game.get_player_by_id(new_target_id).display_name}")
-                    results["dm_messages"].setdefault(player_id, []).append("😵‍💫 **Que tontura!** Sua ação saiu toda errada.")
-
-        # Aplica corrupção e proteção
-        for player_id, action_data in sorted_actions:
-            action_name = action_data["action"]
-            target_id = action_data.get("target_id")
-            
-            if action_name == "corrupt":
-                if target_state := game.get_player_state_by_id(target_id):
-                    target_state.is_corrupted = True
-                    results["dm_messages"].setdefault(target_id, []).append("😵‍💫 Sua mente foi invadida! Você não consegue usar sua habilidade esta noite.")
-            
-            elif action_name == "protect":
-                protector_state = game.get_player_state_by_id(player_id)
-                if protector_state and not protector_state.is_corrupted:
-                    if target_state := game.get_player_state_by_id(target_id):
-                        target_state.protected_by = player_id
-
-    async def _resolve_unique_actions(self, game: GameInstance, sorted_actions: List[Any], results: Dict):
-        """Resolve ações únicas como Possessão, Cupido e outras que alteram o estado do jogo."""
-        for player_id, action_data in sorted_actions:
-            action_name = action_data["action"]
-            target_id = action_data.get("target_id")
-            player_state = game.get_player_state_by_id(player_id)
-            if not player_state or player_state.is_corrupted: continue
-
-            if action_name == "possess":
-                game.skip_villain_kill = True
-                if target_state := game.get_player_state_by_id(target_id):
-                    target_state.possession_points += 1
-                    results["dm_messages"].setdefault(player_id, []).append(f"Você adicionou +1 ponto de possessão a {target_state.member.display_name}. Total: {target_state.possession_points}/3.")
-                    if target_state.possession_points >= 3:
-                        target_state.role = AssassinoSimples()
-                        await send_dm_safe(target_state.member, f"Sua mente foi quebrada! Você agora é um **Assassino Simples**.")
-                        all_villains = [p.member.display_name for p in game.players.values() if p.role.faction == "Vilões" and p.is_alive]
-                        await send_dm_safe(target_state.member, f"Seus novos companheiros são: **{', '.join(all_villains)}**")
-                        for p_state in game.players.values():
-                            if p_state.role.faction == "Vilões" and p_state.is_alive and p_state.member.id != target_id:
-                                await send_dm_safe(p_state.member, f"**{target_state.member.display_name}** foi corrompido e agora é um Assassino Simples.")
-            
-            elif action_name == "cupid_match":
-                lover1_id, lover2_id = action_data["lover1_id"], action_data["lover2_id"]
-                game.lovers = (lover1_id, lover2_id)
-                if (lover1 := game.get_player_by_id(lover1_id)) and (lover2 := game.get_player_by_id(lover2_id)):
-                    dm_msg1 = f"💘 O Cupido acertou você! Seu grande amor é **{lover2.display_name}**. Se um de vocês morrer, o outro morrerá junto."
-                    dm_msg2 = f"💘 O Cupido acertou você! Seu grande amor é **{lover1.display_name}**. Se um de vocês morrer, o outro morrerá junto."
-                    results["dm_messages"].setdefault(lover1_id, []).append(dm_msg1)
-                    results["dm_messages"].setdefault(lover2_id, []).append(dm_msg2)
-
-    def _gather_kill_attempts(self, game: GameInstance, sorted_actions: List[Any]) -> Dict[int, List[tuple]]:
-        """Coleta todos os votos e tentativas de assassinato da noite."""
-        kill_attempts = {}
-        villain_votes = {}
-        for player_id, action_data in sorted_actions:
-            player_state = game.get_player_state_by_id(player_id)
-            if not player_state or player_state.is_corrupted: continue
-            
-            action = action_data["action"]
-            if action == "villain_vote":
-                weight = 2 if isinstance(action_data["role"], AssassinoAlfa) else 1
-                villain_votes[action_data["target_id"]] = villain_votes.get(action_data["target_id"], 0) + weight
-            elif action == "witch_kill":
-                kill_attempts.setdefault(action_data["target_id"], []).append(("witch", player_id))
-                game.witch_potion_used = True
-        
-        if villain_votes and not game.skip_villain_kill:
-            target_id = max(villain_votes, key=villain_votes.get)
-            voters = [p_id for p_id, action in game.night_actions.items() if action.get("action") == "villain_vote" and action.get("target_id") == target_id]
-            kill_attempts.setdefault(target_id, []).append(("villain", voters))
-        
-        return kill_attempts
-
-    def _resolve_deaths(self, game: GameInstance, kill_attempts: Dict, results: Dict) -> List[tuple]:
-        """Processa as tentativas de morte, considerando proteções, e retorna quem morreu."""
-        final_deaths = []
-        for target_id, killers_info in kill_attempts.items():
-            target_state = game.get_player_state_by_id(target_id)
-            if not target_state or not target_state.is_alive: continue
-            
-            attack_source, attacker_id = killers_info[0]
-            
-            # --- LÓGICA DO GUARDA-COSTAS REFINADA COM MENSAGENS SECRETAS ---
-            
-            # Cenário 1: O alvo está sendo protegido por um Guarda-costas
-            if target_state.protected_by and attack_source == 'villain':
-                protector_state = game.get_player_state_by_id(target_state.protected_by)
-                if protector_state:
-                    protector_state.bodyguard_hits_survived += 1
-                    
-                    if protector_state.bodyguard_hits_survived == 1:
-                        # Primeira vez se sacrificando: ele sobrevive
-                        results["sound_events"].append("PROTECTION_SUCCESS")
-                        # Mensagem para o protetor (ele sabe quem protegeu)
-                        results["dm_messages"].setdefault(protector_state.member.id, []).append("🛡️ Você entrou na frente de um ataque para proteger seu alvo e sobreviveu!")
-                        # Mensagem para o protegido (NÃO revela quem o salvou)
-                        results["dm_messages"].setdefault(target_id, []).append("🛡️ Você foi atacado, mas uma força protetora te salvou esta noite.")
-                    else: # bodyguard_hits_survived >= 2
-                        # Segunda vez se sacrificando: ele morre no lugar do alvo
-                        final_deaths.append((protector_state.member.id, "bodyguard_sacrifice", target_id))
-                        results["sound_events"].append("PLAYER_DEATH")
-                        # NENHUMA mensagem pública aqui. A morte do BG será anunciada no início do dia
-                        # junto com as outras, sem revelar a causa.
-                continue # O alvo original sobrevive em ambos os casos
-            
-            # Cenário 2: O alvo do ataque É o Guarda-costas
-            if isinstance(target_state.role, GuardaCostas):
-                target_state.bodyguard_hits_survived += 1
-                
-                if target_state.bodyguard_hits_survived == 1:
-                    # Primeira vez atacado diretamente: ele sobrevive
-                    results["sound_events"].append("PROTECTION_SUCCESS")
-                    results["dm_messages"].setdefault(target_id, []).append("🛡️ Você foi atacado, mas sua resistência o salvou desta vez!")
-                    continue # O BG sobrevive, então pulamos para o próximo alvo
-                # Se for a segunda vez (hits >= 2), a lógica continua e ele será adicionado à lista de mortes abaixo
-            
-            # Adiciona a morte à lista se nenhuma das condições de sobrevivência acima for atendida
-            final_deaths.append((target_id, attack_source, attacker_id))
-            
-        return final_deaths
-
-    async def _resolve_revivals(self, game: GameInstance, sorted_actions: List[Any], final_deaths: List[tuple], results: Dict) -> List[tuple]:
-        """Processa as tentativas de reviver e retorna quem foi revivido."""
-        revived_this_night = []
-        for player_id, action_data in sorted_actions:
-            player_state = game.get_player_state_by_id(player_id)
-            if not player_state or player_state.is_corrupted: continue
-            
-            action = action_data["action"]
-            if action in ["angel_revive", "witch_revive"]:
-                target_id = action_data["target_id"]
-                target_state = game.get_player_state_by_id(target_id)
-                
-                if target_state and not target_state.is_alive and not any(d[0] == target_id for d in final_deaths):
-                    target_state.revive()
-                    revived_this_night.append((target_id, player_id))
-                    results["sound_events"].append("PLAYER_REVIVE")
-                    
-                    if action == "witch_revive": game.witch_potion_used = True
-                    if action == "angel_revive": game.angel_revive_used = True
-                    game.reset_flags_for_player(target_id)
-                    
-                    if isinstance(target_state.role, Prefeito) and target_state.ghost_master_id:
-                        if medium_state := game.get_player_state_by_id(target_state.ghost_master_id):
-                            game.medium_talk_used = False
-                            await send_dm_safe(medium_state.member, "O Prefeito foi revivido! Seu poder foi restaurado.")
-        return revived_this_night
-
-    async def _resolve_information_and_plague(self, game: GameInstance, sorted_actions: List[Any], final_deaths: List[tuple], night_visits: Dict, results: Dict):
-        """Resolve ações de informação (Detetive, Fantasma) e a lógica da Praga."""
-        for player_id, action_data in sorted_actions:
-            p_state = game.get_player_state_by_id(player_id)
-            if not p_state or p_state.is_corrupted: continue
-            
-            if action_data["action"] == "mark_detective":
-                killed_this_night_ids = [d[0] for d in final_deaths]
-                marked_ids = [action_data.get("target1_id"), action_data.get("target2_id")]
-                marked_killed_ids = [tid for tid in marked_ids if tid in killed_this_night_ids and tid is not None]
-                
-                if not marked_killed_ids:
-                    results["dm_messages"].setdefault(player_id, []).append("🕵️ Sua vigília foi tranquila. Nenhum dos seus alvos morreu.")
-                else:
-                    killed_id = marked_killed_ids[0]
-                    death_info = next((d for d in final_deaths if d[0] == killed_id), None)
-                    if (killed_member := game.get_player_by_id(killed_id)) and death_info:
-                        _, _, killer_info = death_info
-                        killer_ids = killer_info if isinstance(killer_info, list) else [killer_info]
-                        if killer_ids and (killer_member := game.get_player_by_id(random.choice(killer_ids))):
-                            innocent_pool = [p.member for p in game.get_alive_players_states() if p.member.id not in [player_id, killed_id, killer_member.id]]
-                            clue_members = [killer_member, random.choice(innocent_pool)] if innocent_pool else [killer_member]
-                            random.shuffle(clue_members)
-                            info_msg = f"🕵️ {killed_member.display_name} foi morto. Um destes está envolvido: **{', '.join([m.display_name for m in clue_members])}**."
-                        else: info_msg = f"🕵️ {killed_member.display_name} foi morto, mas o assassino é um mistério."
-                        results["dm_messages"].setdefault(player_id, []).append(info_msg)
-
-        haunt_action = next((data for _, data in sorted_actions if data["action"] == "haunt"), None)
-        if haunt_action:
-            haunt_target_id, ghost_id = haunt_action["target_id"], haunt_action["player_id"]
-            if (ghost_state := game.get_player_state_by_id(ghost_id)) and ghost_state.ghost_master_id:
-                medium_id = ghost_state.ghost_master_id
-                visits = night_visits.get(haunt_target_id, {'visited_by': set(), 'visited': set()})
-                visited_by_names = [game.get_player_by_id(pid).display_name for pid in visits['visited_by'] if pid != ghost_id]
-                visited_names = [game.get_player_by_id(pid).display_name for pid in visits['visited']]
-                report = (f"Relatório da Assombração sobre **{game.get_player_by_id(haunt_target_id).display_name}**:\n"
-                          f"- Foi visitado por: **{', '.join(visited_by_names) if visited_by_names else 'Ninguém'}**\n"
-                          f"- Visitou: **{', '.join(visited_names) if visited_names else 'Ninguém'}**")
-                results["dm_messages"].setdefault(ghost_id, []).append(report)
-                results["dm_messages"].setdefault(medium_id, []).append(report)
-
-        prague_exterminate_action = next((data for _, data in sorted_actions if data["action"] == "plague_exterminate"), None)
-        if prague_exterminate_action and not game.plague_exterminate_used:
-            game.plague_exterminate_used = True
-            infected_to_die_ids = {pid for pid, pstate in game.players.items() if pstate.is_infected and pstate.is_alive}
-            if len(infected_to_die_ids) >= 4 and (praga_member := game.get_player_by_id(prague_exterminate_action["player_id"])) and (game_flow_cog := self.bot.get_cog("GameFlowCog")):
-                end_args = {"title": "Vitória da Praga!", "winners": [praga_member], "faction": "Solo (Praga)", "reason": f"A Praga eliminou {len(infected_to_die_ids)} jogadores!", "sound_event_key": "PLAGUE_WIN"}
-                await game_flow_cog.end_game(game, **end_args); results["game_over"] = True
-                return
-            if infected_to_die_ids:
-                results["plague_kill_count"] = len(infected_to_die_ids)
-                for infected_id in infected_to_die_ids:
-                    final_deaths.append((infected_id, "killed_by_plague", prague_exterminate_action["player_id"]))
-
-        if game.plague_patient_zero_id and (pz_state := game.get_player_state_by_id(game.plague_patient_zero_id)) and pz_state.is_alive:
-            newly_infected = []
-            def infect_player(player_id):
-                if player_id != game.plague_player_id and (p_state := game.get_player_state_by_id(player_id)) and not p_state.is_infected:
-                    p_state.is_infected = True; newly_infected.append(player_id)
-            for interactor_id, act_data in game.night_actions.items():
-                if act_data.get("target_id") == game.plague_patient_zero_id: infect_player(interactor_id)
-            if (pz_action := game.night_actions.get(game.plague_patient_zero_id)) and (target_id := pz_action.get("target_id")): infect_player(target_id)
-            if newly_infected:
-                for infected_id in newly_infected:
-                    results["dm_messages"].setdefault(infected_id, []).append("🤒 Você se sente febril... Você foi infectado pela Praga!")
-
-    # --- MÉTODO PRINCIPAL DE RESOLUÇÃO (ORQUESTRADOR) ---
+    def apply_night_effects(self, game: GameInstance, effects: List[Effect]) -> Dict[str, Any]:
+        """Aplica os efeitos da noite na partida e monta o resultado usado por end_night."""
+        results = {"killed_players": [], "revived_players": [], "sound_events": [], "plague_kill_count": 0, "dm_messages": {}, "public_messages": [], "game_over": None}
+        for p_state in game.players.values(): results["dm_messages"][p_state.member.id] = []
+        for effect in effects:
+            if isinstance(effect, Death):
+                results["killed_players"].append(tuple(effect))
+                if effect.reason == "killed_by_plague": results["plague_kill_count"] += 1
+            elif isinstance(effect, Revival):
+                game.players[effect.target_id].revive()
+                game.reset_flags_for_player(effect.target_id)
+                results["revived_players"].append((effect.target_id, effect.reviver_id))
+            elif isinstance(effect, PlayerChange):
+                # Troca de papel (possessão) passa por set_role para manter os índices da partida
+                if effect.field == "role": game.set_role(effect.player_id, effect.value)
+                else: setattr(game.players[effect.player_id], effect.field, effect.value)
+            elif isinstance(effect, GameChange):
+                setattr(game, effect.field, effect.value)
+            elif isinstance(effect, DirectMessage):
+                results["dm_messages"].setdefault(effect.player_id, []).append(effect.text)
+            elif isinstance(effect, SoundEvent):
+                results["sound_events"].append(effect.key)
+            elif isinstance(effect, GameOver):
+                results["game_over"] = effect
+        return results
 
     async def resolve_night_actions(self, game: GameInstance) -> Dict[str, Any]:
         logger.info(f"[Jogo #{game.text_channel.id}] --- Resolvendo Ações Noturnas ---")
-        results = {"killed_players": [], "revived_players": [], "sound_events": [], "plague_kill_count": 0, "dm_messages": {}, "public_messages": [], "game_over": False}
-        for p_state in game.players.values(): results["dm_messages"][p_state.member.id] = []
-        
-        sorted_actions = sorted(game.night_actions.items(), key=lambda item: item[1]["priority"])
-        night_visits = {p_id: {'visited_by': set(), 'visited': set()} for p_id in game.players}
-        for player_id, action_data in sorted_actions:
-            if target_id := action_data.get("target_id"):
-                night_visits[target_id]['visited_by'].add(player_id)
-                night_visits[player_id]['visited'].add(target_id)
-
-        await self._apply_status_effects(game, sorted_actions, results)
-        await self._resolve_unique_actions(game, sorted_actions, results)
-        if results.get("game_over"): return results
-        
-        kill_attempts = self._gather_kill_attempts(game, sorted_actions)
-        deaths_before_revive = self._resolve_deaths(game, kill_attempts, results)
-        revived_this_night = await self._resolve_revivals(game, sorted_actions, deaths_before_revive, results)
-        
-        final_deaths = [d for d in deaths_before_revive if d[0] not in [r[0] for r in revived_this_night]]
-        
-        await self._resolve_information_and_plague(game, sorted_actions, final_deaths, night_visits, results)
-        if results.get("game_over"): return results
-        
-        if final_deaths: results["killed_players"] = final_deaths
-        if revived_this_night: results["revived_players"] = revived_this_night
-        
+        effects = resolve_night(NightState.from_game(game), self.rng)
+        results = self.apply_night_effects(game, effects)
+
+        if game_over := results["game_over"]:
+            await asyncio.gather(*(send_dm_safe(member, "\n".join(messages)) for player_id, messages in results["dm_messages"].items()
+                                   if messages and (member := game.get_player_by_id(player_id))))
+            if game_flow_cog := self.bot.get_cog("GameFlowCog"):
+                winners = [member for winner_id in game_over.winner_ids if (member := game.get_player_by_id(winner_id))]
+                await game_flow_cog.end_game(game, title=game_over.title, winners=winners, faction=game_over.faction, reason=game_over.reason, sound_event_key=game_over.sound_event_key)
+            results.update({"game_over": True, "dm_messages": {}})
+            return results
+
+        results["game_over"] = False
         game.clear_nightly_states()
-        
+
         logger.info(f"[Jogo #{game.text_channel.id}] --- Resolução Noturna Concluída ---")
         return results
 
@@ -214,8 +214,8 @@ class GameFlowCog(commands.Cog):
 
     async def _announce_revival_chance(self, game: GameInstance):
         can_revive_roles = []
-        if any(isinstance(p.role, Anjo) for p in game.get_alive_players_states()) and not game.angel_revive_used: can_revive_roles.append("um Anjo")
-        if any(isinstance(p.role, Bruxo) for p in game.get_alive_players_states()) and not game.witch_potion_used: can_revive_roles.append("um Bruxo")
+        if game.get_role_player_state(Anjo, alive_only=True) is not None and not game.angel_revive_used: can_revive_roles.append("um Anjo")
+        if game.get_role_player_state(Bruxo, alive_only=True) is not None and not game.witch_potion_used: can_revive_roles.append("um Bruxo")
         if not can_revive_roles: return
         message = f"🚨 **ALERTA** 🚨\nOs Vilões foram eliminados, mas o Prefeito caiu!\nO destino da cidade está nas mãos de **{' e '.join(can_revive_roles)}**."
         await send_public_message(self.bot, game.text_channel, message=message, game=game)
@@ -223,9 +223,9 @@ class GameFlowCog(commands.Cog):
     async def _resolve_pending_endgame(self, game: GameInstance):
         game.pending_resolution = False
         logger.info(f"[Jogo #{game.text_channel.id}] Resolvendo fim de jogo pendente...")
-        prefeito_state = next((p for p in game.players.values() if isinstance(p.role, Prefeito)), None)
+        prefeito_state = game.get_role_player_state(Prefeito)
         if prefeito_state and prefeito_state.is_alive:
-            winners = [p.member for p in game.players.values() if p.role.faction == "Cidade"]
+            winners = game.get_faction_members("Cidade")
             await self.end_game(game, "Vitória da Cidade!", winners, "Cidade", "O milagre aconteceu! O Prefeito foi revivido!")
         else:
             await self.check_seventh_day_win(game, is_resolution=True)
@@ -238,26 +238,7 @@ class GameFlowCog(commands.Cog):
         
         alive_before_ids = {p.member.id for p in game.get_alive_players_states()}
         night_results = await actions_cog.resolve_night_actions(game)
-        
-        if night_results.get("game_over"): return
-        if game.pending_resolution: await self._resolve_pending_endgame(game); return
-        
-        for victim_id, reason, killer_id in night_results.get("killed_players", []):
-            if member := game.get_player_by_id(victim_id):
-                game.killers[victim_id] = killer_id
-                if reason == 'witch': game.successful_major_actions.append({'actor': killer_id, 'action': 'kill', 'target': victim_id})
-                await self.process_death(game, member, reason)
-                if not self.bot.game_manager.get_game(game.text_channel.id): return
-        
-        for player_id, messages in night_results.get("dm_messages", {}).items():
-            if messages:
-                if player := game.get_player_by_id(player_id):
-                    await send_dm_safe(player, "\n".join(messages))
-        
-        for revived_id, reviver_id in night_results.get("revived_players", []):
-            game.successful_major_actions.append({'actor': reviver_id, 'action': 'revive', 'target': revived_id})
-
-        if await self.check_game_end(game, "após os eventos da noite"): return
+        if await self.apply_night_results(game, night_results): return
         
         alive_after_ids = {p.member.id for p in game.get_alive_players_states()}
         died_this_night_ids = alive_before_ids - alive_after_ids
@@ -289,6 +270,27 @@ class GameFlowCog(commands.Cog):
         
         await self.start_day_discussion(game)
 
+    async def apply_night_results(self, game: GameInstance, night_results: Dict[str, Any]) -> bool:
+        """Processa mortes e revivências da noite e envia as DMs. Retorna True se a noite não segue para o dia."""
+        if night_results.get("game_over"): return True
+        if game.pending_resolution: await self._resolve_pending_endgame(game); return True
+        
+        for victim_id, reason, killer_id in night_results.get("killed_players", []):
+            if member := game.get_player_by_id(victim_id):
+                game.killers[victim_id] = killer_id
+                if reason == 'witch': game.successful_major_actions.append({'actor': killer_id, 'action': 'kill', 'target': victim_id})
+                await self.process_death(game, member, reason)
+                if not self.bot.game_manager.get_game(game.text_channel.id): return True
+        
+        # As mensagens privadas da noite são independentes entre si: enviadas em paralelo
+        await asyncio.gather(*(send_dm_safe(player, "\n".join(messages)) for player_id, messages in night_results.get("dm_messages", {}).items()
+                               if messages and (player := game.get_player_by_id(player_id))))
+        
+        for revived_id, reviver_id in night_results.get("revived_players", []):
+            game.successful_major_actions.append({'actor': reviver_id, 'action': 'revive', 'target': revived_id})
+
+        return await self.check_game_end(game, "após os eventos da noite")
+
     async def start_day_discussion(self, game: GameInstance):
         game.current_phase = "day_discussion"
         game.current_day += 1
@@ -329,6 +331,7 @@ class GameFlowCog(commands.Cog):
 
         logger.info(f"[Jogo #{game.text_channel.id}] Processando morte de {target_member.display_name} por: {reason}.")
         game.death_reasons[target_member.id] = reason
+        game.death_log.append((game.current_night, target_member.id, reason, game.killers.get(target_member.id)))
         target_state.kill()
         await self._set_member_mute(game, target_member, True, "Jogador eliminado")
         if game.first_death_id is None: game.first_death_id = target_member.id
@@ -351,7 +354,7 @@ class GameFlowCog(commands.Cog):
         if game.headhunter_info and game.headhunter_info['target_id'] == target_member.id:
             if hunter_state := game.get_player_state_by_id(game.headhunter_info['hunter_id']):
                 if hunter_state.is_alive and game.death_reasons.get(target_member.id) != "lynched":
-                    hunter_state.role = CidadaoComum()
+                    game.set_role(hunter_state.member.id, CidadaoComum())
                     await send_dm_safe(hunter_state.member, "Seu alvo foi eliminado por outros meios. Você se tornou um **Cidadão Comum**.")
                     game.headhunter_info = None
         
@@ -372,21 +375,21 @@ class GameFlowCog(commands.Cog):
         if not alive_players:
             await self.end_game(game, "Empate catastrófico!", [], "Ninguém", f"Todos morreram {context}."); return True
         
-        villains_alive = [p for p in alive_players if p.role.faction == "Vilões"]
-        prefeito_state = next((p for p in game.players.values() if isinstance(p.role, Prefeito)), None)
+        villains_alive = game.get_faction_players_states("Vilões", alive_only=True)
+        prefeito_state = game.get_role_player_state(Prefeito)
 
         if prefeito_state and not prefeito_state.is_alive:
-            anjo_pode_reviver = any(isinstance(p.role, Anjo) for p in alive_players) and not game.angel_revive_used
-            bruxo_pode_reviver = any(isinstance(p.role, Bruxo) for p in alive_players) and not game.witch_potion_used
+            anjo_pode_reviver = game.get_role_player_state(Anjo, alive_only=True) is not None and not game.angel_revive_used
+            bruxo_pode_reviver = game.get_role_player_state(Bruxo, alive_only=True) is not None and not game.witch_potion_used
             pode_ser_revivido = anjo_pode_reviver or bruxo_pode_reviver
             if not pode_ser_revivido and villains_alive:
-                winners = [p.member for p in game.players.values() if p.role.faction == "Vilões"]
+                winners = game.get_faction_members("Vilões")
                 await self.end_game(game, "Vitória dos Vilões!", winners, "Vilões", "A esperança da cidade morreu! O Prefeito não podia mais ser salvo.")
                 return True
 
         if not villains_alive:
             if prefeito_state and prefeito_state.is_alive:
-                city_winners = [p.member for p in game.players.values() if p.role.faction == "Cidade"]
+                city_winners = game.get_faction_members("Cidade")
                 await self.end_game(game, "Vitória da Cidade!", city_winners, "Cidade", "A Cidade eliminou todos os vilões e seu líder permaneceu de pé!")
                 return True
             elif prefeito_state and not prefeito_state.is_alive:
@@ -404,20 +407,19 @@ class GameFlowCog(commands.Cog):
 
     async def check_seventh_day_win(self, game: GameInstance, is_resolution: bool = False):
         logger.info(f"[Jogo #{game.text_channel.id}] Verificando vitória do Sétimo Dia.")
-        prefeito_state = next((p for p in game.get_alive_players_states() if isinstance(p.role, Prefeito)), None)
-        living_villains = [p for p in game.get_alive_players_states() if p.role.faction == "Vilões"]
+        prefeito_state = game.get_role_player_state(Prefeito, alive_only=True)
+        living_villains = game.get_faction_players_states("Vilões", alive_only=True)
         if prefeito_state and living_villains and not is_resolution: await self._seventh_day_confrontation(game); return
         
-        alive_players = game.get_alive_players_states()
         if game.lovers:
             if (l1 := game.get_player_state_by_id(game.lovers[0])) and (l2 := game.get_player_state_by_id(game.lovers[1])) and l1.is_alive and l2.is_alive:
                 winners = [l1.member, l2.member]
-                if (cupido := next((p for p in game.players.values() if isinstance(p.role, Cupido)), None)) and cupido.member not in winners: winners.append(cupido.member)
+                if (cupido := game.get_role_player_state(Cupido)) and cupido.member not in winners: winners.append(cupido.member)
                 await self.end_game(game, "Vitória dos Amantes!", list(set(winners)), "Solo (Amantes)", "O amor sobreviveu ao teste do tempo.", sound_event_key="LOVERS_WIN"); return
-        if corruptor_state := next((p for p in alive_players if isinstance(p.role, Corruptor)), None):
+        if corruptor_state := game.get_role_player_state(Corruptor, alive_only=True):
             await self.end_game(game, "Vitória do Corruptor!", [corruptor_state.member], "Solo (Corruptor)", "Com a cidade em desordem, o Corruptor sobreviveu!", sound_event_key="CORRUPTOR_WIN"); return
         
-        winners = [p.member for p in game.players.values() if p.role.faction == "Cidade" and p.is_alive]
+        winners = game.get_faction_members("Cidade", alive_only=True)
         if winners: await self.end_game(game, "Vitória da Cidade!", winners, "Cidade", "A Cidade resistiu bravamente até o fim!"); return
         await self.end_game(game, "Empate por Impasse!", [], "Ninguém", "O tempo acabou e a situação ficou indefinida.")
 
@@ -430,7 +432,7 @@ class GameFlowCog(commands.Cog):
         await self._villain_final_attack(game)
 
     async def _sheriff_showdown_loop(self, game: GameInstance) -> bool:
-        xerife_state = next((p for p in game.get_alive_players_states() if isinstance(p.role, Xerife)), None)
+        xerife_state = game.get_role_player_state(Xerife, alive_only=True)
         if not xerife_state or game.sheriff_shots_fired >= 2: return False
         if not game.sheriff_revealed:
             await send_public_message(self.bot, game.text_channel, f"Para o confronto, o Xerife **{xerife_state.member.mention}** se revela!"); game.sheriff_revealed = True; await asyncio.sleep(2)
@@ -445,31 +447,32 @@ class GameFlowCog(commands.Cog):
             target_member = game.guild.get_member(view.result)
             await send_public_message(self.bot, game.text_channel, f"{xerife_state.member.mention} atira em **{target_member.mention}**!"); await self.play_sound_effect(game, "SHERIFF_SHOT"); await asyncio.sleep(1)
             target_state = game.get_player_state_by_id(target_member.id)
-            if isinstance(target_state.role, Prefeito): await self.end_game(game, "Vitória dos Vilões!", [p.member for p in game.players.values() if p.role.faction == "Vilões"], "Vilões", "Erro fatal! O Xerife eliminou o Prefeito!"); return True
-            if isinstance(target_state.role, AssassinoAlfa): await self.end_game(game, "Vitória da Cidade!", [p.member for p in game.players.values() if p.role.faction == "Cidade"], "Cidade", "Tiro certeiro! O Xerife eliminou o Assassino Alfa!"); return True
+            if isinstance(target_state.role, Prefeito): await self.end_game(game, "Vitória dos Vilões!", game.get_faction_members("Vilões"), "Vilões", "Erro fatal! O Xerife eliminou o Prefeito!"); return True
+            if isinstance(target_state.role, AssassinoAlfa): await self.end_game(game, "Vitória da Cidade!", game.get_faction_members("Cidade"), "Cidade", "Tiro certeiro! O Xerife eliminou o Assassino Alfa!"); return True
+            game.killers[target_member.id] = xerife_state.member.id
             await self.process_death(game, target_member, "shot_by_sheriff_showdown"); await asyncio.sleep(2)
         return not self.bot.game_manager.get_game(game.text_channel.id)
 
     async def _villain_final_attack(self, game: GameInstance):
-        vilões_vivos = [p for p in game.get_alive_players_states() if p.role.faction == "Vilões"]
-        attacker_state = next((p for p in vilões_vivos if isinstance(p.role, AssassinoAlfa)), None) or next((p for p in vilões_vivos if isinstance(p.role, AssassinoJunior)), None) or next((p for p in vilões_vivos if isinstance(p.role, Cumplice)), None)
+        vilões_vivos = game.get_faction_players_states("Vilões", alive_only=True)
+        attacker_state = next((state for role in (AssassinoAlfa, AssassinoJunior, Cumplice) if (state := game.get_role_player_state(role, alive_only=True))), None)
         if not attacker_state: return
         await send_public_message(self.bot, game.text_channel, f"A escuridão avança! O **{attacker_state.role.name} {attacker_state.member.mention}** se prepara!"); await asyncio.sleep(2)
-        targets = [p.member for p in game.get_alive_players_states() if p.role.faction == "Cidade"]
+        targets = game.get_faction_members("Cidade", alive_only=True)
         if not targets: await self.end_game(game, "Vitória dos Vilões!", [p.member for p in vilões_vivos], "Vilões", "Não restaram alvos para o ataque final!"); return
         view = ShowdownView(attacker_state.member, targets, timeout=120.0)
         await game.text_channel.send(f"**{attacker_state.member.mention}**, escolha seu alvo para o ataque final:", view=view)
         await view.wait()
-        if not view.result: await self.end_game(game, "Vitória da Cidade!", [p.member for p in game.players.values() if p.role.faction == "Cidade"], "Cidade", "Os Vilões hesitaram e a Cidade venceu!"); return
+        if not view.result: await self.end_game(game, "Vitória da Cidade!", game.get_faction_members("Cidade"), "Cidade", "Os Vilões hesitaram e a Cidade venceu!"); return
         target_member = game.guild.get_member(view.result)
         await send_public_message(self.bot, game.text_channel, f"O {attacker_state.role.name} ataca **{target_member.mention}**!"); await asyncio.sleep(2)
         if isinstance(game.get_player_state_by_id(target_member.id).role, Prefeito):
             await self.end_game(game, "Vitória dos Vilões!", [p.member for p in vilões_vivos], "Vilões", f"O {attacker_state.role.name} eliminou o Prefeito!")
         else:
-            await self.end_game(game, "Vitória da Cidade!", [p.member for p in game.players.values() if p.role.faction == "Cidade"], "Cidade", "O Prefeito sobreviveu ao ataque final!")
+            await self.end_game(game, "Vitória da Cidade!", game.get_faction_members("Cidade"), "Cidade", "O Prefeito sobreviveu ao ataque final!")
 
     async def _check_and_award_bruxo_win(self, game: GameInstance, winners: List[discord.Member], winning_faction: str):
-        if bruxo_state := next((p for p in game.players.values() if isinstance(p.role, Bruxo)), None):
+        if bruxo_state := game.get_role_player_state(Bruxo):
             bruxo_wins = False
             for action in game.successful_major_actions:
                 if action['actor'] == bruxo_state.member.id and (target_state := game.get_player_state_by_id(action['target'])):
@@ -485,12 +488,12 @@ class GameFlowCog(commands.Cog):
             if lover1_id in winner_ids or lover2_id in winner_ids:
                 if (l1_state := game.get_player_state_by_id(lover1_id)) and l1_state.is_alive and l1_state.member not in winners: winners.append(l1_state.member)
                 if (l2_state := game.get_player_state_by_id(lover2_id)) and l2_state.is_alive and l2_state.member not in winners: winners.append(l2_state.member)
-                if (cupido := next((p for p in game.players.values() if isinstance(p.role, Cupido)), None)) and cupido.member not in winners: winners.append(cupido.member)
+                if (cupido := game.get_role_player_state(Cupido)) and cupido.member not in winners: winners.append(cupido.member)
         return list(set(winners))
 
     async def _check_and_award_fofoqueiro_win(self, game: GameInstance, winners: List[discord.Member], winning_faction: str):
         if winning_faction in ["Cidade", "Vilões"]:
-            if (fofoqueiro_state := next((p for p in game.get_alive_players_states() if isinstance(p.role, Fofoqueiro)), None)) and fofoqueiro_state.member not in winners:
+            if (fofoqueiro_state := game.get_role_player_state(Fofoqueiro, alive_only=True)) and fofoqueiro_state.member not in winners:
                 winners.append(fofoqueiro_state.member)
         return winners
 
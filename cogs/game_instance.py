@@ -2,9 +2,11 @@
 
 import discord
 import logging
-from typing import Optional, List, Dict, Tuple, Any
+from typing import Optional, List, Dict, Tuple, Any, Union
 import asyncio
+import bisect
 
+from engine.actions import NightAction
 from roles.base_role import Role
 from roles.cidade_roles import Xerife, Prefeito, Medium
 from roles.viloes_roles import AssassinoAlfa, Cumplice, AssassinoJunior
@@ -67,8 +69,8 @@ class GameInstance:
     __slots__ = (
         'bot', 'text_channel', 'voice_channel', 'guild', 'game_master',
         'current_phase', 'current_night', 'current_day', 'pending_resolution',
-        'current_timer_task', 'players', 'roles_in_game', 'night_actions',
-        'day_votes', 'day_skip_votes', 'killers', 'death_reasons',
+        'current_timer_task', 'players', 'seats', 'roles_in_game', 'role_index', 'faction_index', 'night_actions',
+        'day_votes', 'day_skip_votes', 'killers', 'death_reasons', 'death_log',
         'successful_major_actions', 'lovers', 'headhunter_info', 'sabotage_used',
         'decreto_used', 'fraud_used', 'witch_potion_used', 'angel_revive_used',
         'medium_talk_used', 'plague_exterminate_used', 'last_protected_target',
@@ -100,12 +102,20 @@ class GameInstance:
         
         # --- Dicionários de Estado ---
         self.players: Dict[int, PlayerState] = {}
+        # Posição de cada jogador na ordem de entrada (ordena os índices abaixo sem varrer self.players)
+        self.seats: Dict[int, int] = {}
         self.roles_in_game: List[Role] = []
-        self.night_actions: Dict[int, dict] = {}
+        # Índices mantidos por set_role: classe do papel -> ids e facção -> ids, na ordem de entrada dos jogadores
+        self.role_index: Dict[type, List[int]] = {}
+        self.faction_index: Dict[str, List[int]] = {}
+        self.night_actions: Dict[int, NightAction] = {}
         self.day_votes: Dict[int, int] = {}
         self.day_skip_votes = set()
-        self.killers: Dict[int, int] = {}
+        # Vítima -> responsável; em ataques em grupo (vilões, linchamento), a lista de responsáveis
+        self.killers: Dict[int, Union[int, List[int]]] = {}
         self.death_reasons: Dict[int, str] = {}
+        # Histórico de mortes da partida inteira (noite, vítima, motivo, assassino(s)), usado no log de partidas
+        self.death_log: List[Tuple[int, int, str, Union[int, List[int], None]]] = []
         self.successful_major_actions: List[Dict[str, Any]] = []
 
         # --- Flags de Estado de Papéis e Habilidades ---
@@ -153,6 +163,7 @@ class GameInstance:
         """Adiciona um jogador a esta instância do jogo e mapeia-o no GameManager."""
         if member.id not in self.players:
             self.players[member.id] = PlayerState(member)
+            self.seats[member.id] = len(self.seats)
             logger.debug(f"Jogador {member.display_name} adicionado à partida no canal #{self.text_channel.name}.")
             self.bot.game_manager.map_player_to_game(member.id, self.text_channel.id)
 
@@ -165,6 +176,34 @@ class GameInstance:
     def get_alive_players_states(self) -> List[PlayerState]:
         return [state for state in self.players.values() if state.is_alive]
 
+    def set_role(self, player_id: int, role: Role):
+        """Atribui (ou troca) o papel de um jogador e atualiza os índices por papel e por facção."""
+        player_state = self.players[player_id]
+        if old_role := player_state.role:
+            self.role_index[type(old_role)].remove(player_id)
+            self.faction_index[old_role.faction].remove(player_id)
+        player_state.assign_role(role)
+        self._index_player(self.role_index.setdefault(type(role), []), player_id)
+        self._index_player(self.faction_index.setdefault(role.faction, []), player_id)
+
+    def _index_player(self, player_ids: List[int], player_id: int):
+        bisect.insort(player_ids, player_id, key=self.seats.__getitem__)
+
+    def get_role_player_state(self, role_class: type, alive_only: bool = False) -> Optional[PlayerState]:
+        """O (primeiro) jogador com o papel, ou None."""
+        for player_id in self.role_index.get(role_class, ()):
+            player_state = self.players[player_id]
+            if player_state.is_alive or not alive_only:
+                return player_state
+        return None
+
+    def get_faction_players_states(self, faction: str, alive_only: bool = False) -> List[PlayerState]:
+        states = [self.players[player_id] for player_id in self.faction_index.get(faction, ())]
+        return [state for state in states if state.is_alive] if alive_only else states
+
+    def get_faction_members(self, faction: str, alive_only: bool = False) -> List[discord.Member]:
+        return [state.member for state in self.get_faction_players_states(faction, alive_only)]
+
     def get_player_by_id(self, user_id: int) -> Optional[discord.Member]:
         player_state = self.players.get(user_id)
         # Se não temos cache de membros, o objeto 'member' pode ficar desatualizado.
@@ -106,12 +106,12 @@ class GameSetupCog(commands.Cog):
             if not player_state:
                 logger.error(f"[Jogo #{game.text_channel.id}] Erro crítico: Estado não encontrado para {player_member.display_name}.")
                 continue
-            player_state.assign_role(role_instance)
+            game.set_role(player_member.id, role_instance)
             tasks.append(self._send_role_dm(player_member, role_instance))
         
         await asyncio.gather(*tasks)
         
-        if headhunter_state := next((p for p in game.players.values() if isinstance(p.role, CacadorDeCabecas)), None):
+        if headhunter_state := game.get_role_player_state(CacadorDeCabecas):
             possible_targets = [p for p in game.players.values() if p.member.id != headhunter_state.member.id]
             if possible_targets:
                 target_state = random.choice(possible_targets)
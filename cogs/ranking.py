@@ -4,187 +4,405 @@ import discord
 from discord.ext import commands
 from discord import option, ApplicationContext
 import logging
-import json
-import os
-import asyncio
-from typing import Dict, List, Any
+import atexit
+import tempfile
+import time
+from typing import Dict, List, Tuple, Any, Optional, Mapping
 
 import config
 from .utils import send_public_message
 from .game_instance import GameInstance # Importa GameInstance para type hinting
+from stats.achievements import load_achievements
+from stats.rating import DEFAULT_RATING
+from stats.leaderboard import Leaderboards, LeaderboardPage
+from stats.shards import RankingShards
+from stats.cache import RankingCache
+from stats.backend import LocalRankingBackend, RankingPageData, RankingUnavailableError, create_ranking_shards
+from stats.client import RemoteRankingBackend
+from stats.export import write_export
+from stats.render_cache import RenderCache
+from stats.singleflight import SingleFlight
+from stats.game_log import RECORD_VERSION
+from stats.kill_graph import KillRival
+from stats.history import HistoryEntry, HistoryCursor
+from stats.aggregates import GameAggregates, ROLE, FACTION, FACTION_WITH_ROLE, GAMES, ALL_SIZES
+from roles.cidade_roles import cidade_role_classes
+from roles.viloes_roles import viloes_role_classes
+from roles.solo_roles import solo_role_classes
 
 logger = logging.getLogger(__name__)
 
-# Lock para evitar condições de corrida ao ler/escrever o arquivo JSON
-ranking_lock = asyncio.Lock()
+# Conquistas e títulos (conquistas.json), compiladas uma vez na carga
+achievements = load_achievements()
+
+# Bancos do ranking: no próprio processo (padrão) ou no serviço de ranking, quando vários processos do bot
+# compartilham o mesmo ranking (RANKING_SERVICE_SOCKET). Nos dois casos o log de partidas é a fonte da verdade:
+# os bancos são "compactações" dele e podem ser reconstruídos com `python -m stats.rebuild`.
+if config.RANKING_SERVICE_SOCKET:
+    ranking_shards: Optional[RankingShards] = None
+    ranking_backend = RemoteRankingBackend(config.RANKING_SERVICE_SOCKET, cache_seconds=config.RANKING_SERVICE_CACHE_SECONDS,
+                                           timeout=config.RANKING_SERVICE_TIMEOUT_SECONDS)
+else:
+    ranking_shards = create_ranking_shards(achievements)
+    ranking_backend = LocalRankingBackend(ranking_shards)
+# Shard global em memória (só quando este processo é dono dos bancos)
+ranking_cache = ranking_shards.global_cache if ranking_shards else None
+# Garante que alterações pendentes sejam gravadas mesmo se o bot for desligado entre duas gravações.
+atexit.register(ranking_backend.flush_sync)
+
+# Embeds de /perfil e /ranking já montados, reaproveitados enquanto os dados não mudam
+render_cache = RenderCache(max_entries=config.RENDER_CACHE_MAX_ENTRIES)
+# Pedidos simultâneos do mesmo /perfil ou /ranking compartilham uma única montagem
+read_flights = SingleFlight()
+
+# Resposta dos comandos quando o serviço de ranking não responde
+UNAVAILABLE_MESSAGE = "O ranking está indisponível no momento. Tente novamente em instantes."
+
+def _local_cache() -> RankingCache:
+    if ranking_cache is None:
+        raise RuntimeError("O ranking completo só pode ser lido no processo dono dos bancos (sem RANKING_SERVICE_SOCKET).")
+    return ranking_cache
+
+async def load_ranking() -> Mapping[str, Mapping[str, Any]]:
+    """Retorna o ranking completo como uma visão imutável (somente leitura) do último commit, sem copiá-lo."""
+    cache = _local_cache()
+    await cache.ensure_loaded()
+    return cache.read()
 
-# Estrutura padrão para um novo jogador no ranking
-def get_default_player_stats(player_name: str) -> Dict[str, Any]:
-    """Retorna a estrutura de dados padrão para um novo jogador."""
+async def save_ranking(ranking_data: dict):
+    """Atualiza os jogadores de ranking_data em memória. A gravação no banco acontece em lote."""
+    _local_cache().replace(ranking_data)
+
+def build_game_record(game: GameInstance, winners: List[discord.Member]) -> Dict[str, Any]:
+    """Monta o registro compacto de uma partida concluída para o log de partidas."""
+    winner_ids = {w.id for w in winners}
+    finished_at = int(time.time())
     return {
-        "nome_jogador": player_name,
-        "partidas_jogadas": 0,
-        "vitorias_totais": 0,
-        "vitorias_por_papel": {},
-        "medalhas": []
+        "v": RECORD_VERSION,
+        "id": f"{game.text_channel.id}-{finished_at}",
+        "t": finished_at,
+        "g": game.guild.id if game.guild else None,
+        "n": game.current_night,
+        "f": game.winning_faction,
+        # Campos de cada jogador na ordem de stats.game_log.PLAYER_FIELDS
+        "p": [
+            [p_state.member.id, p_state.member.display_name,
+             p_state.role.name if p_state.role else None, p_state.role.faction if p_state.role else None,
+             int(p_state.member.id in winner_ids), int(p_state.is_alive)]
+            for p_state in game.players.values()
+        ],
+        # Mortes em ordem: [noite, vítima, motivo, assassino]
+        "m": [list(death) for death in game.death_log],
     }
 
-async def load_ranking() -> dict:
-    """Carrega os dados do ranking do arquivo JSON de forma segura."""
-    async with ranking_lock:
-        try:
-            # Garante que a pasta 'data' exista
-            os.makedirs(config.DATA_PATH, exist_ok=True)
-
-            # Se o arquivo não existe, cria ele com um JSON válido e retorna um dict vazio
-            if not os.path.exists(config.RANKING_FILE):
-                with open(config.RANKING_FILE, 'w', encoding='utf-8') as f:
-                    json.dump({}, f)
-                return {}
-            
-            # Se o arquivo existe, tenta carregar
-            with open(config.RANKING_FILE, 'r', encoding='utf-8') as f:
-                # Checa se o arquivo está vazio antes de tentar carregar
-                if os.path.getsize(config.RANKING_FILE) == 0:
-                    # Se estiver vazio, reescreve com um JSON válido
-                    f.close() # Fecha o arquivo de leitura
-                    with open(config.RANKING_FILE, 'w', encoding='utf-8') as wf:
-                        json.dump({}, wf)
-                    return {}
-                
-                # Se não estiver vazio, volta ao início do arquivo e carrega o JSON
-                f.seek(0)
-                return json.load(f)
-
-        except (json.JSONDecodeError, IOError) as e:
-            logger.warning(f"Não foi possível carregar {config.RANKING_FILE}, o arquivo pode estar corrompido ou vazio. Criando um novo. Erro: {e}")
-            # Se qualquer erro ocorrer, cria um novo arquivo limpo
-            with open(config.RANKING_FILE, 'w', encoding='utf-8') as f:
-                json.dump({}, f)
-            return {}
 
-async def save_ranking(ranking_data: dict):
-    """Salva os dados do ranking no arquivo JSON de forma segura."""
-    async with ranking_lock:
+# Papéis do /estatisticas: nome da opção -> nome registrado nas partidas (podem diferir, ex: "Praga" -> "A Praga")
+ROLE_NAMES = {label: role_class().name for label, role_class in {**cidade_role_classes, **viloes_role_classes, **solo_role_classes}.items()}
+FACTION_NAMES = ["Cidade", "Vilões", "Solo"]
+
+
+def _rate_line(label: str, games: int, wins: int) -> str:
+    rate = (wins / games * 100) if games > 0 else 0
+    return f"**{label}**: {rate:.1f}% ({wins}/{games})"
+
+def _sorted_by_rate(rows: List[Tuple[str, int, int]]) -> List[Tuple[str, int, int]]:
+    """Ordena (nome, partidas, vitórias) pela taxa de vitória, da maior para a menor."""
+    return sorted(rows, key=lambda row: (-(row[2] / row[1]) if row[1] else 0, -row[1], row[0]))
+
+# Ícone de cada motivo do grafo de abates (stats.kill_graph.KILL_REASONS) no /perfil
+KILL_REASON_ICONS = {"vilao": "🔪", "bruxa": "🧪", "xerife": "⭐", "praga": "☣️", "linchamento": "⚖️"}
+
+def _kill_reasons_text(rival: KillRival) -> str:
+    return ", ".join(f"{count} {KILL_REASON_ICONS.get(reason, reason)}" for reason, count in sorted(rival.by_reason.items(), key=lambda item: -item[1]))
+
+
+# Título e rodapé de cada placar do /ranking
+RANKING_TITLES = {
+    "vitorias": ("🏆 Ranking dos Melhores Jogadores", "Continue jogando para subir no ranking!"),
+    "taxa": ("📊 Ranking por Taxa de Vitória", f"Mínimo de {config.RANKING_MIN_GAMES_FOR_WIN_RATE} partidas para entrar neste placar."),
+    "partidas": ("🎲 Ranking dos Mais Assíduos", "Continue jogando para subir no ranking!"),
+    "rating": ("⭐ Ranking por Habilidade", f"Rating considera facção, tamanho da partida e adversários. Mínimo de {config.RANKING_MIN_GAMES_FOR_WIN_RATE} partidas."),
+}
+
+def build_ranking_embed(players: Mapping[str, Mapping[str, Any]], sort_key: str, page: LeaderboardPage, highlight: Optional[str] = None) -> discord.Embed:
+    """Monta o embed de uma página do placar (sem o nome do servidor) a partir da visão de leitura do ranking."""
+    title, footer = RANKING_TITLES[sort_key]
+    embed = discord.Embed(title=title, color=discord.Color.gold())
+
+    lines = []
+    for position, player_id in enumerate(page.player_ids, start=page.start):
+        stats = players[player_id]
+        player_name = stats.get('nome_jogador', 'Jogador Desconhecido')
+        wins = stats.get('vitorias_totais', 0)
+        games = stats.get('partidas_jogadas', 0)
+        win_rate = (wins / games * 100) if games > 0 else 0
+        emoji = ["🥇", "🥈", "🥉"][position] if position < 3 else f"**{position+1}.**"
+        if player_id == highlight:
+            emoji = f"➡️ {emoji}"
+        if sort_key == "taxa":
+            lines.append(f"{emoji} **{player_name}** - {win_rate:.1f}% ({wins}/{games} partidas)")
+        elif sort_key == "partidas":
+            lines.append(f"{emoji} **{player_name}** - {games} partidas ({wins} vitórias)")
+        elif sort_key == "rating":
+            lines.append(f"{emoji} **{player_name}** - {stats.get('rating', DEFAULT_RATING):.0f} pontos ({wins}/{games} vitórias)")
+        else:
+            lines.append(f"{emoji} **{player_name}** - {wins} vitórias ({win_rate:.1f}%)")
+
+    embed.description = "\n".join(lines) if lines else "Ainda não há jogadores no ranking."
+    last_position = page.start + len(page.player_ids)
+    embed.set_footer(text=f"{footer}\nPosições {page.start + 1}–{last_position} de {page.total}")
+    return embed
+
+class RankingPaginationView(discord.ui.View):
+    """
+    Navegação do /ranking. Guarda só o cursor da página atual (chaves do primeiro e do último jogador),
+    então cada página custa O(log n + página) no índice, sem reordenar o ranking.
+    """
+    def __init__(self, author_id: int, guild_id: Optional[int], sort_key: str, page: LeaderboardPage, title_suffix: str = ""):
+        super().__init__(timeout=config.RANKING_VIEW_TIMEOUT_SECONDS)
+        self.author_id = author_id
+        self.guild_id = guild_id
+        self.sort_key = sort_key
+        self.title_suffix = title_suffix
+        self.page = page
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page.start == 0
+        self.next_page.disabled = self.page.start + len(self.page.player_ids) >= self.page.total
+
+    async def _go(self, interaction: discord.Interaction, highlight: Optional[str] = None, **cursor):
+        """Mostra a página do cursor (start, after, before ou around), consultada no backend do ranking."""
         try:
-            with open(config.RANKING_FILE, 'w', encoding='utf-8') as f:
-                json.dump(ranking_data, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            logger.exception(f"Erro inesperado ao salvar ranking: {e}")
+            data = await ranking_backend.leaderboard_page(self.guild_id, self.sort_key, config.RANKING_PAGE_SIZE, **cursor)
+        except RankingUnavailableError as e:
+            logger.warning(f"Falha ao navegar pelo /ranking: {e}")
+            await interaction.response.send_message(UNAVAILABLE_MESSAGE, ephemeral=True)
+            return
+        if data is None:
+            await interaction.response.send_message("Você ainda não aparece neste placar. Continue jogando!", ephemeral=True)
+            return
+        self.page = data.page
+        self._update_buttons()
+        embed = build_ranking_embed(data.players, self.sort_key, data.page, highlight)
+        embed.title = f"{embed.title}{self.title_suffix}"
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    async def _check_author(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Use /ranking para navegar pelo seu próprio placar.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Anterior", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, button: discord.ui.Button, interaction: discord.Interaction):
+        if not await self._check_author(interaction): return
+        if self.page.first_key is None:
+            await self._go(interaction, start=0)
+        else:
+            await self._go(interaction, before=self.page.first_key)
 
+    @discord.ui.button(label="Próxima", emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, button: discord.ui.Button, interaction: discord.Interaction):
+        if not await self._check_author(interaction): return
+        if self.page.last_key is None:
+            await self._go(interaction, start=0)
+        else:
+            await self._go(interaction, after=self.page.last_key)
+
+    @discord.ui.button(label="Minha posição", emoji="📍", style=discord.ButtonStyle.primary)
+    async def my_position(self, button: discord.ui.Button, interaction: discord.Interaction):
+        if not await self._check_author(interaction): return
+        player_id = str(interaction.user.id)
+        await self._go(interaction, highlight=player_id, around=player_id)
+
+    async def on_timeout(self):
+        self.disable_all_items()
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+        self.stop()
+
+def build_history_embed(name: str, entries: List[HistoryEntry], page_number: int) -> discord.Embed:
+    """Monta o embed de uma página do /historico (partidas da mais recente para a mais antiga)."""
+    embed = discord.Embed(title=f"📜 Histórico de {name}", color=discord.Color.dark_teal())
+    lines = []
+    for entry in entries:
+        result = "✅ Vitória" if entry.won else "❌ Derrota"
+        nights = f"{entry.nights} noite{'s' if entry.nights != 1 else ''}"
+        lines.append(f"{result} como **{entry.role or 'Desconhecido'}** ({entry.faction or '?'}) — "
+                     f"{nights}, {entry.players} jogadores — <t:{entry.played_at}:d>")
+    embed.description = "\n".join(lines)
+    embed.set_footer(text=f"Página {page_number}")
+    return embed
+
+class HistoryPaginationView(discord.ui.View):
+    """
+    Navegação do /historico. Cada página é buscada pelo cursor (data, partida) da última partida exibida,
+    então mesmo partidas antigas custam O(log n + página). Os cursores das páginas visitadas ficam
+    guardados para voltar sem reconsultar o começo do histórico.
+    """
+    def __init__(self, author_id: int, player_id: str, name: str, limit: int, entries: List[HistoryEntry]):
+        super().__init__(timeout=config.RANKING_VIEW_TIMEOUT_SECONDS)
+        self.author_id = author_id
+        self.player_id = player_id
+        self.name = name
+        self.limit = limit
+        self.entries = entries
+        # Cursor usado para buscar cada página visitada (None = mais recentes)
+        self._cursors: List[Optional[HistoryCursor]] = [None]
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.newer_page.disabled = len(self._cursors) == 1
+        self.older_page.disabled = len(self.entries) < self.limit
+
+    async def _go(self, interaction: discord.Interaction, cursor: Optional[HistoryCursor]) -> Optional[List[HistoryEntry]]:
+        try:
+            return await ranking_backend.history(self.player_id, self.limit, before=cursor)
+        except RankingUnavailableError as e:
+            logger.warning(f"Falha ao navegar pelo /historico: {e}")
+            await interaction.response.send_message(UNAVAILABLE_MESSAGE, ephemeral=True)
+            return None
+
+    async def _show(self, interaction: discord.Interaction, entries: List[HistoryEntry]):
+        self.entries = entries
+        self._update_buttons()
+        await interaction.response.edit_message(embed=build_history_embed(self.name, entries, len(self._cursors)), view=self)
+
+    async def _check_author(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Use /historico para navegar pelo histórico.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Mais recentes", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def newer_page(self, button: discord.ui.Button, interaction: discord.Interaction):
+        if not await self._check_author(interaction): return
+        cursor = self._cursors[-2] if len(self._cursors) > 1 else None
+        if (entries := await self._go(interaction, cursor)) is None:
+            return
+        if len(self._cursors) > 1:
+            self._cursors.pop()
+        await self._show(interaction, entries)
+
+    @discord.ui.button(label="Mais antigas", emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def older_page(self, button: discord.ui.Button, interaction: discord.Interaction):
+        if not await self._check_author(interaction): return
+        cursor = self.entries[-1].cursor
+        if (entries := await self._go(interaction, cursor)) is None:
+            return
+        if not entries:
+            self.older_page.disabled = True
+            await interaction.response.edit_message(view=self)
+            return
+        self._cursors.append(cursor)
+        await self._show(interaction, entries)
+
+    async def on_timeout(self):
+        self.disable_all_items()
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+        self.stop()
 
 class RankingCog(commands.Cog):
     """Cog para gerenciar o sistema de ranking global com estatísticas e medalhas."""
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.medal_definitions = self.load_medal_definitions()
+        self.achievements = achievements
         logger.info("Cog Ranking carregado.")
 
-    def load_medal_definitions(self) -> Dict[str, Dict[str, str]]:
-        """Carrega as definições de títulos e medalhas para fácil acesso."""
-        # Esta estrutura pode ser expandida conforme necessário
-        return {
-            "Assassino Alfa": {"título": "O Pesadelo da Vizinhança", "medalha": "Líder do Mal"},
-            "Anjo": {"título": "O Despachado do Além", "medalha": "O Anjo da Guarda"},
-            "Xerife": {"título": "O Bang-Bang da Cidade", "medalha": "A Lei Sou Eu"},
-            "Palhaço": {"título": "O Rei da Palhaçada", "medalha": "O Rei da Palhaçada"},
-            "Bruxo": {"título": "Harry Potter do Paraguai", "medalha": "Agente do Caos"},
-            # Adicione outras medalhas de maestria aqui
-        }
+    @commands.Cog.listener()
+    async def on_ready(self):
+        await ranking_backend.start()
+
+    def cog_unload(self):
+        ranking_backend.close()
 
     async def update_stats_after_game(self, game: GameInstance, winners: List[discord.Member]):
         """
         Atualiza as estatísticas de todos os jogadores de uma partida concluída.
         Esta função é chamada pelo GameFlowCog no final de um jogo.
+        A partida é acrescentada ao log de partidas (um append, durável) e então aplicada
+        ao ranking, no próprio processo ou pelo serviço de ranking; os bancos são atualizados
+        em segundo plano, em lote.
+        Todas as conquistas da partida são anunciadas em uma única mensagem.
         """
-        ranking_data = await load_ranking()
-        all_player_states = list(game.players.values())
-        winner_ids = {w.id for w in winners}
-
-        for p_state in all_player_states:
-            player = p_state.member
-            player_id_str = str(player.id)
-            
-            # Garante que o jogador exista no ranking
-            if player_id_str not in ranking_data:
-                ranking_data[player_id_str] = get_default_player_stats(player.display_name)
-            
-            stats = ranking_data[player_id_str]
-            stats["partidas_jogadas"] += 1
-            stats["nome_jogador"] = player.display_name # Atualiza o nome caso tenha mudado
-
-            # Verifica medalhas baseadas em partidas jogadas
-            if stats["partidas_jogadas"] == 50:
-                await self.award_medal(player, "Maratonista", game.text_channel)
-            if stats["partidas_jogadas"] == 150:
-                await self.award_medal(player, "Lenda da Cidade", game.text_channel)
-            
-            # Se o jogador for um vencedor, atualiza vitórias
-            if player.id in winner_ids:
-                stats["vitorias_totais"] += 1
-                if p_state.role:
-                    role_name = p_state.role.name
-                    current_wins = stats["vitorias_por_papel"].get(role_name, 0)
-                    stats["vitorias_por_papel"][role_name] = current_wins + 1
-
-                    # Verifica medalhas baseadas em maestria de papel
-                    if stats["vitorias_por_papel"][role_name] == 10:
-                        if medal_info := self.medal_definitions.get(role_name):
-                            if medalha := medal_info.get("medalha"):
-                                await self.award_medal(player, medalha, game.text_channel)
-
-        await save_ranking(ranking_data)
-        logger.info(f"[Jogo #{game.text_channel.id}] Estatísticas atualizadas para {len(all_player_states)} jogadores.")
-
-    async def award_medal(self, player: discord.Member, medal_key: str, announcement_channel: discord.TextChannel):
-        """Concede uma medalha a um jogador se ele ainda não a tiver."""
-        ranking_data = await load_ranking()
-        player_id_str = str(player.id)
-
-        if player_id_str not in ranking_data:
-            ranking_data[player_id_str] = get_default_player_stats(player.display_name)
-        
-        if medal_key not in ranking_data[player_id_str]["medalhas"]:
-            ranking_data[player_id_str]["medalhas"].append(medal_key)
-            await save_ranking(ranking_data)
-            logger.info(f"Medalha '{medal_key}' concedida a {player.display_name}.")
-            # Envia o anúncio no canal onde o jogo que concedeu a medalha terminou
-            await send_public_message(
-                self.bot, 
-                announcement_channel,
-                message=f"🎉 **CONQUISTA DESBLOQUEADA!** {player.mention} ganhou a medalha: **{medal_key}**!"
-            )
+        record = build_game_record(game, winners)
+        awarded_medals = await ranking_backend.record_game(record)
+        # As versões já impedem conteúdo desatualizado; descartar libera a memória das entradas antigas.
+        render_cache.invalidate([("perfil", str(p[0])) for p in record["p"]] + [("ranking", None), ("ranking", record["g"])])
+        logger.info(f"[Jogo #{game.text_channel.id}] Estatísticas atualizadas para {len(record['p'])} jogadores.")
+
+        if awarded_medals:
+            await self.announce_medals(game, awarded_medals)
+
+    async def announce_medals(self, game: GameInstance, awarded_medals: List[Tuple[str, str]]):
+        """Anuncia, em uma única mensagem no canal da partida, todas as medalhas conquistadas."""
+        lines = []
+        for player_id_str, medal_key in awarded_medals:
+            player_state = game.get_player_state_by_id(int(player_id_str))
+            mention = player_state.member.mention if player_state else f"<@{player_id_str}>"
+            lines.append(f"{mention} ganhou a medalha: **{medal_key}**!")
+            logger.info(f"Medalha '{medal_key}' concedida ao jogador {player_id_str}.")
+
+        title = "🎉 **CONQUISTA DESBLOQUEADA!**" if len(lines) == 1 else "🎉 **CONQUISTAS DESBLOQUEADAS!**"
+        await send_public_message(self.bot, game.text_channel, message=f"{title}\n" + "\n".join(lines))
 
     @commands.slash_command(name="ranking", description="Mostra o ranking dos melhores jogadores.")
-    async def show_ranking(self, ctx: ApplicationContext):
-        """Exibe um placar com os 10 melhores jogadores, classificados por vitórias."""
+    @option("escopo", description="Ranking global ou apenas deste servidor (padrão: global).", required=False, choices=[
+        discord.OptionChoice(name="Global (apenas o dono do bot)", value="global"),
+        discord.OptionChoice(name="Este servidor", value="servidor"),
+    ])
+    @option("ordenar", description="Critério de ordenação do placar (padrão: vitórias).", required=False, choices=[
+        discord.OptionChoice(name="Vitórias", value="vitorias"),
+        discord.OptionChoice(name="Taxa de vitória", value="taxa"),
+        discord.OptionChoice(name="Partidas jogadas", value="partidas"),
+        discord.OptionChoice(name="Rating de habilidade", value="rating"),
+    ])
+    async def show_ranking(self, ctx: ApplicationContext, escopo: str = "global", ordenar: str = "vitorias"):
+        """Exibe o placar paginado, lido direto do índice do critério escolhido."""
         await ctx.defer()
-        ranking_data = await load_ranking()
-        if not ranking_data:
-            await ctx.followup.send("O placar ainda está vazio! Nenhuma partida foi jogada.")
+        guild_id = ctx.guild.id if escopo == "servidor" and ctx.guild is not None else None
+        sort_key = ordenar if ordenar in Leaderboards.KEYS else "vitorias"
+        try:
+            data, payload = await read_flights.do(("ranking", guild_id, sort_key), lambda: self._ranking_payload(guild_id, sort_key))
+        except RankingUnavailableError as e:
+            logger.warning(f"Falha ao consultar o /ranking: {e}")
+            await ctx.followup.send(UNAVAILABLE_MESSAGE)
             return
 
-        sorted_players = sorted(ranking_data.values(), key=lambda p: p.get('vitorias_totais', 0), reverse=True)
-
-        embed = discord.Embed(
-            title="🏆 Ranking dos Melhores Jogadores",
-            description="Os jogadores mais vitoriosos da Cidade Dorme!",
-            color=discord.Color.gold()
-        )
-        
-        lines = []
-        for i, stats in enumerate(sorted_players[:10]):
-            player_name = stats.get('nome_jogador', 'Jogador Desconhecido')
-            wins = stats.get('vitorias_totais', 0)
-            games = stats.get('partidas_jogadas', 0)
-            win_rate = (wins / games * 100) if games > 0 else 0
-            emoji = ["🥇", "🥈", "🥉"][i] if i < 3 else f"**{i+1}.**"
-            lines.append(f"{emoji} **{player_name}** - {wins} vitórias ({win_rate:.1f}%)")
-        
-        embed.description = "\n".join(lines) if lines else "Ainda não há jogadores no ranking."
-        embed.set_footer(text="Continue jogando para subir no ranking!")
+        if payload is None:
+            if sort_key in ("taxa", "rating") and data.population:
+                await ctx.followup.send(f"Ninguém jogou as {config.RANKING_MIN_GAMES_FOR_WIN_RATE} partidas necessárias para entrar neste placar.")
+            else:
+                await ctx.followup.send("O placar ainda está vazio! Nenhuma partida foi jogada.")
+            return
 
-        await ctx.followup.send(embed=embed)
+        embed = discord.Embed.from_dict(payload)
+        title_suffix = f" — {ctx.guild.name}" if guild_id is not None else ""
+        embed.title = f"{embed.title}{title_suffix}"
+        view = RankingPaginationView(ctx.author.id, guild_id, sort_key, data.page, title_suffix)
+        await ctx.followup.send(embed=embed, view=view)
+
+    async def _ranking_payload(self, guild_id: Optional[int], sort_key: str) -> Tuple[RankingPageData, Optional[Dict[str, Any]]]:
+        """Primeira página do placar: (página com os jogadores, embed em dicionário ou None se o placar estiver vazio)."""
+        data = await ranking_backend.leaderboard_page(guild_id, sort_key, config.RANKING_PAGE_SIZE)
+        if not data.page.player_ids:
+            return data, None
+
+        # A primeira página renderizada só muda quando alguma posição do índice ou algum jogador exibido nela muda.
+        render_key = ("ranking", guild_id, sort_key)
+        payload = render_cache.get(render_key, data.version)
+        if payload is None:
+            payload = build_ranking_embed(data.players, sort_key, data.page).to_dict()
+            render_cache.put(render_key, data.version, payload, tags=[("ranking", guild_id)])
+        return data, payload
 
     @commands.slash_command(name="perfil", description="Mostra suas estatísticas, títulos e medalhas.")
     @option("usuario", description="Veja o perfil de outro jogador (opcional).", required=False)
@@ -194,38 +412,61 @@ class RankingCog(commands.Cog):
         await ctx.defer()
 
         target_user = usuario or ctx.author
-        ranking_data = await load_ranking()
         player_id_str = str(target_user.id)
+        guild_id = ctx.guild.id if ctx.guild else None
+        try:
+            payload = await read_flights.do(("perfil", player_id_str, guild_id), lambda: self._profile_payload(player_id_str, guild_id))
+        except RankingUnavailableError as e:
+            logger.warning(f"Falha ao consultar o /perfil: {e}")
+            await ctx.followup.send(UNAVAILABLE_MESSAGE)
+            return
 
-        if player_id_str not in ranking_data:
+        if payload is None:
             # >>> CORREÇÃO: Usar followup.send pois a interação foi adiada <<<
             await ctx.followup.send(f"**{target_user.display_name}** ainda não tem um perfil. É hora de jogar!")
             return
 
-        stats = ranking_data[player_id_str]
-        
-        main_title = "Novato na Cidade"
-        if stats["vitorias_por_papel"]:
-            # Encontra o papel com mais vitórias que tem um título definido
-            for role_name, wins in sorted(stats["vitorias_por_papel"].items(), key=lambda item: item[1], reverse=True):
-                if wins >= 5 and (title_info := self.medal_definitions.get(role_name)) and (title := title_info.get("título")):
-                    main_title = title
-                    break
+        # Cor e avatar dependem do membro do Discord, não das estatísticas: aplicados a cada exibição.
+        embed = discord.Embed.from_dict(payload)
+        embed.color = target_user.accent_color or discord.Color.purple()
+        embed.set_thumbnail(url=target_user.display_avatar.url)
+        # >>> CORREÇÃO: Usar followup.send pois a interação foi adiada <<<
+        await ctx.followup.send(embed=embed)
+
+    async def _profile_payload(self, player_id: str, guild_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Embed do perfil em dicionário (None se o jogador não tiver perfil)."""
+        profile = await ranking_backend.profile(player_id, guild_id)
+        if profile is None:
+            return None
+
+        # O perfil renderizado só muda quando as estatísticas (globais ou do servidor) do jogador mudam.
+        render_key = ("perfil", player_id, guild_id)
+        payload = render_cache.get(render_key, profile.version)
+        if payload is None:
+            victim, nemesis = await ranking_backend.kill_rivals(player_id)
+            payload = self.build_profile_embed(profile.stats, profile.guild_stats, victim, nemesis).to_dict()
+            render_cache.put(render_key, profile.version, payload, tags=[("perfil", player_id)])
+        return payload
+
+    def build_profile_embed(self, stats: Mapping[str, Any], guild_stats: Optional[Mapping[str, Any]],
+                            victim: Optional[KillRival] = None, nemesis: Optional[KillRival] = None) -> discord.Embed:
+        """Monta o embed do perfil a partir das estatísticas (sem cor e avatar do membro)."""
+        # Título do papel com mais vitórias que tem um título definido
+        main_title = self.achievements.title(stats["vitorias_por_papel"]) or "Novato na Cidade"
 
         win_rate = (stats["vitorias_totais"] / stats["partidas_jogadas"] * 100) if stats["partidas_jogadas"] > 0 else 0
 
         embed = discord.Embed(
             title=f"Perfil de {stats['nome_jogador']}",
-            description=f"**Título:** {main_title}",
-            color=target_user.accent_color or discord.Color.purple()
+            description=f"**Título:** {main_title}"
         )
-        embed.set_thumbnail(url=target_user.display_avatar.url)
 
         embed.add_field(
             name="Estatísticas Gerais",
             value=f"🏆 **Vitórias:** {stats['vitorias_totais']}\n"
                   f"🎲 **Partidas:** {stats['partidas_jogadas']}\n"
-                  f"📊 **Taxa de Vitória:** {win_rate:.1f}%",
+                  f"📊 **Taxa de Vitória:** {win_rate:.1f}%\n"
+                  f"⭐ **Rating:** {stats.get('rating', DEFAULT_RATING):.0f}",
             inline=True
         )
 
@@ -236,12 +477,156 @@ class RankingCog(commands.Cog):
         else:
             embed.add_field(name="Melhores Papéis", value="Nenhuma vitória ainda.", inline=True)
 
+        if guild_stats:
+            guild_games = guild_stats["partidas_jogadas"]
+            guild_win_rate = (guild_stats["vitorias_totais"] / guild_games * 100) if guild_games > 0 else 0
+            embed.add_field(
+                name="Neste Servidor",
+                value=f"🏆 {guild_stats['vitorias_totais']} vitórias em {guild_games} partidas ({guild_win_rate:.1f}%)",
+                inline=False
+            )
+
+        rivalries = []
+        if victim:
+            rivalries.append(f"🎯 **Vítima preferida:** {victim.name} — eliminado {victim.total}x ({_kill_reasons_text(victim)})")
+        if nemesis:
+            rivalries.append(f"💀 **Nêmesis:** {nemesis.name} — te eliminou {nemesis.total}x ({_kill_reasons_text(nemesis)})")
+        if rivalries:
+            embed.add_field(name="Rivalidades", value="\n".join(rivalries), inline=False)
+
         if medals := stats["medalhas"]:
             medals_text = "🎖️ " + "\n🎖️ ".join(medals)
             embed.add_field(name=f"Conquistas ({len(medals)})", value=medals_text, inline=False)
-        
-        # >>> CORREÇÃO: Usar followup.send pois a interação foi adiada <<<
+        return embed
+
+    @commands.slash_command(name="historico", description="Mostra as últimas partidas de um jogador.")
+    @option("usuario", description="Veja o histórico de outro jogador (opcional).", required=False)
+    @option("quantidade", int, description=f"Partidas por página (padrão: {config.RANKING_HISTORY_PAGE_SIZE}).", required=False,
+            min_value=1, max_value=config.RANKING_HISTORY_RING_SIZE)
+    async def show_history(self, ctx: ApplicationContext, usuario: discord.Member = None, quantidade: int = None):
+        """Exibe as últimas partidas do jogador, com navegação para as mais antigas."""
+        await ctx.defer()
+        target_user = usuario or ctx.author
+        limit = quantidade or config.RANKING_HISTORY_PAGE_SIZE
+        try:
+            entries = await ranking_backend.history(str(target_user.id), limit)
+        except RankingUnavailableError as e:
+            logger.warning(f"Falha ao consultar o /historico: {e}")
+            await ctx.followup.send(UNAVAILABLE_MESSAGE)
+            return
+
+        if not entries:
+            await ctx.followup.send(f"**{target_user.display_name}** ainda não tem partidas registradas. É hora de jogar!")
+            return
+
+        view = HistoryPaginationView(ctx.author.id, str(target_user.id), target_user.display_name, limit, entries)
+        await ctx.followup.send(embed=build_history_embed(target_user.display_name, entries, 1), view=view)
+
+    @commands.slash_command(name="estatisticas", description="Taxa de vitória por papel, facção e quantidade de jogadores.")
+    @option("papel", description="Detalha um papel (opcional).", required=False,
+            choices=[discord.OptionChoice(name=label, value=role_name) for label, role_name in ROLE_NAMES.items()])
+    @option("jogadores", int, description="Considera só partidas com essa quantidade de jogadores (opcional).", required=False,
+            min_value=config.MIN_PLAYERS, max_value=config.MAX_PLAYERS)
+    async def show_statistics(self, ctx: ApplicationContext, papel: str = None, jogadores: int = None):
+        """Exibe as estatísticas lidas dos contadores agregados (custo independente do número de jogadores)."""
+        await ctx.defer()
+        try:
+            aggregates = await ranking_backend.aggregates()
+        except RankingUnavailableError as e:
+            logger.warning(f"Falha ao consultar o /estatisticas: {e}")
+            await ctx.followup.send(UNAVAILABLE_MESSAGE)
+            return
+        size = str(jogadores) if jogadores else ALL_SIZES
+
+        if aggregates is None or aggregates.get(GAMES, "", size)[0] == 0:
+            suffix = f" com {jogadores} jogadores" if jogadores else ""
+            await ctx.followup.send(f"Ainda não há partidas{suffix} registradas para gerar estatísticas.")
+            return
+
+        if papel:
+            embed = self.build_role_statistics_embed(aggregates, papel, jogadores)
+        else:
+            embed = self.build_statistics_embed(aggregates, jogadores)
         await ctx.followup.send(embed=embed)
 
+    def build_statistics_embed(self, aggregates: GameAggregates, players: Optional[int]) -> discord.Embed:
+        size = str(players) if players else ALL_SIZES
+        title = "📈 Estatísticas das Partidas" + (f" ({players} jogadores)" if players else "")
+        embed = discord.Embed(title=title, color=discord.Color.teal())
+
+        factions = [(faction, *aggregates.get(FACTION, faction, size)) for faction in FACTION_NAMES]
+        factions_text = "\n".join(_rate_line(name, games, wins) for name, games, wins in factions if games)
+        embed.add_field(name="Vitórias por Facção", value=factions_text or "Sem dados.", inline=False)
+
+        roles = [(role_name, *aggregates.get(ROLE, role_name, size)) for role_name in aggregates.names(ROLE)]
+        roles_text = "\n".join(_rate_line(name, games, wins) for name, games, wins in _sorted_by_rate(roles) if games)
+        embed.add_field(name="Vitórias por Papel", value=roles_text or "Sem dados.", inline=False)
+
+        embed.set_footer(text=f"{aggregates.get(GAMES, '', size)[0]} partidas registradas. Use a opção 'papel' para ver os detalhes de um papel.")
+        return embed
+
+    def build_role_statistics_embed(self, aggregates: GameAggregates, role_name: str, players: Optional[int]) -> discord.Embed:
+        size = str(players) if players else ALL_SIZES
+        title = f"📈 Estatísticas: {role_name}" + (f" ({players} jogadores)" if players else "")
+        embed = discord.Embed(title=title, color=discord.Color.teal())
+
+        games, wins = aggregates.get(ROLE, role_name, size)
+        embed.description = _rate_line("Taxa de vitória", games, wins) if games else "Este papel ainda não apareceu nessas partidas."
+
+        if not players:
+            by_size = sorted((int(detail), *counts) for detail, counts in aggregates.details(ROLE, role_name).items() if detail != ALL_SIZES)
+            if by_size:
+                embed.add_field(name="Por Quantidade de Jogadores",
+                                value="\n".join(_rate_line(f"{count} jogadores", size_games, size_wins) for count, size_games, size_wins in by_size),
+                                inline=True)
+
+        # Contado em todas as partidas com o papel, independente da quantidade de jogadores
+        factions = [(faction, *aggregates.get(FACTION_WITH_ROLE, role_name, faction)) for faction in FACTION_NAMES]
+        if factions_text := "\n".join(_rate_line(name, f_games, f_wins) for name, f_games, f_wins in factions if f_games):
+            embed.add_field(name=f"Facções com {role_name} em Jogo", value=factions_text, inline=True)
+        return embed
+
+    @commands.slash_command(name="exportar_ranking", description="Exporta o ranking completo como arquivo compactado (apenas administradores).")
+    @discord.default_permissions(manage_guild=True)
+    @discord.guild_only()
+    @option("formato", description="Formato do arquivo (padrão: CSV).", required=False, choices=[
+        discord.OptionChoice(name="CSV (planilhas)", value="csv"),
+        discord.OptionChoice(name="JSON Lines", value="jsonl"),
+    ])
+    @option("escopo", description="Ranking deste servidor ou global (padrão: este servidor).", required=False, choices=[
+        discord.OptionChoice(name="Este servidor", value="servidor"),
+        discord.OptionChoice(name="Global (apenas o dono do bot)", value="global"),
+    ])
+    async def export_ranking(self, ctx: ApplicationContext, formato: str = "csv", escopo: str = "servidor"):
+        """
+        Envia o ranking como anexo .gz. Os jogadores vêm do banco em blocos e cada bloco é compactado
+        direto em um arquivo temporário em disco: a memória usada não cresce com o tamanho do ranking.
+        O ranking global traz os jogadores de todos os servidores: só o dono do bot pode exportá-lo por aqui
+        (ou com `python -m stats.export` no servidor do bot). default_permissions é só um padrão do Discord.
+        """
+        if escopo == "global" and not await self.bot.is_owner(ctx.author):
+            await ctx.respond("Só o dono do bot pode exportar o ranking global. Escolha o escopo 'Este servidor'.", ephemeral=True)
+            return
+        await ctx.defer(ephemeral=True)
+        guild_id = ctx.guild.id if escopo == "servidor" else None
+        filename = f"ranking_{'global' if guild_id is None else guild_id}.{formato}.gz"
+
+        with tempfile.TemporaryFile() as export_file:
+            try:
+                exported = await write_export(ranking_backend.iter_players(guild_id, config.RANKING_EXPORT_CHUNK_SIZE), export_file, formato)
+            except RankingUnavailableError as e:
+                logger.warning(f"Falha ao exportar o ranking: {e}")
+                await ctx.followup.send(UNAVAILABLE_MESSAGE, ephemeral=True)
+                return
+
+            size = export_file.tell()
+            if size > ctx.guild.filesize_limit:
+                await ctx.followup.send(f"O arquivo exportado ({size / 1024 / 1024:.1f} MB) passa do limite de anexos deste servidor. "
+                                        f"Use `python -m stats.export` no servidor do bot.", ephemeral=True)
+                return
+            export_file.seek(0)
+            logger.info(f"Ranking exportado por {ctx.author.id}: {exported} jogadores em {filename} ({size} bytes).")
+            await ctx.followup.send(f"📦 Ranking exportado: {exported} jogadores.", file=discord.File(export_file, filename=filename), ephemeral=True)
+
 def setup(bot: commands.Bot):
     bot.add_cog(RankingCog(bot))
\ No newline at end of file
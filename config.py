@@ -40,7 +40,27 @@ ASSETS_PATH = os.path.join(_BASE_DIR, "assets")
 IMAGES_PATH = os.path.join(ASSETS_PATH, "images")
 AUDIO_PATH = os.path.join(ASSETS_PATH, "audio")
 DATA_PATH = os.path.join(_BASE_DIR, "data")
-RANKING_FILE = os.path.join(DATA_PATH, "ranking.json")
+ACHIEVEMENTS_FILE = os.path.join(_BASE_DIR, "conquistas.json") # Medalhas e títulos (stats.achievements)
+RANKING_FILE = os.path.join(DATA_PATH, "ranking.json") # Formato antigo, migrado automaticamente para o banco
+RANKING_DB_FILE = os.path.join(DATA_PATH, "ranking.db")
+RANKING_GUILDS_PATH = os.path.join(DATA_PATH, "guilds") # Um banco de ranking por servidor
+RANKING_FLUSH_INTERVAL_SECONDS = 30 # Intervalo máximo entre gravações do ranking em memória
+RANKING_FLUSH_MAX_PENDING = 20 # Quantidade de atualizações que força uma gravação antecipada
+RANKING_MIN_GAMES_FOR_WIN_RATE = 10 # Partidas mínimas para aparecer no placar por taxa de vitória
+RANKING_PAGE_SIZE = 10 # Jogadores por página do /ranking
+RANKING_VIEW_TIMEOUT_SECONDS = 300 # Tempo até os botões de navegação do /ranking serem desativados
+RANKING_EXPORT_CHUNK_SIZE = 1000 # Jogadores lidos do banco por vez no /exportar_ranking
+RANKING_HISTORY_RING_SIZE = 25 # Últimas partidas de cada jogador consultado mantidas em memória para o /historico
+RANKING_HISTORY_PAGE_SIZE = 10 # Partidas por página do /historico
+RANKING_USE_SNAPSHOTS = True # Salva um snapshot binário (.snap) ao desligar para acelerar a próxima carga
+RENDER_CACHE_MAX_ENTRIES = 2048 # Embeds de /perfil e /ranking mantidos prontos em memória
+GAME_LOG_FILE = os.path.join(DATA_PATH, "game_log.jsonl") # Log (somente acréscimo) com o resultado de cada partida
+# Socket do serviço de ranking (python -m stats.service). Vazio = este processo é dono dos bancos do ranking.
+# Defina o mesmo caminho em todos os processos do bot que devem compartilhar o ranking.
+RANKING_SERVICE_SOCKET = os.getenv("RANKING_SERVICE_SOCKET") or None
+RANKING_SERVICE_CACHE_SECONDS = 5 # Tempo que cada processo do bot reaproveita uma consulta ao serviço de ranking
+RANKING_SERVICE_TIMEOUT_SECONDS = 10 # Tempo máximo de espera por uma resposta do serviço de ranking
+LOOP_STALL_THRESHOLD_SECONDS = 0.25 # Atrasos do event loop acima disto são registrados como travamentos
 
 
 # === Configuração de Imagens de Evento ===
@@ -0,0 +1,64 @@
+# engine/actions.py
+"""
+Ações noturnas registradas e as etapas em que a noite é resolvida.
+
+Cada papel declara em Role.night_actions as ações que pode registrar (nome -> NightActionSpec, com a
+prioridade e a etapa) e as resolve em Role.perform_night_action. O NightResolver agrupa as ações da noite
+por etapa uma única vez e, em cada etapa, entrega cada ação ao papel de quem agiu: um papel novo só
+precisa declarar as suas ações e o seu handler, sem mexer em cogs/actions.py nem no motor.
+"""
+
+from typing import Optional, Tuple, NamedTuple
+
+# Etapas da noite, na ordem de resolução
+CONFUSION = 0 # Marca os confusos (os alvos deles são trocados logo depois)
+STATUS = 1 # Corrupção e proteção
+UNIQUE = 2 # Ações que mudam o estado do jogo (possessão, Cupido)
+KILL = 3 # Tentativas de morte
+REVIVAL = 4 # Revivências (depois de as mortes da noite serem conhecidas)
+INFORMATION = 5 # Relatórios sobre as mortes (Detetive)
+HAUNT = 6 # Assombração do Fantasma, resolvida pelo próprio motor
+PLAGUE = 7 # Extermínio da Praga
+STAGES = (CONFUSION, STATUS, UNIQUE, KILL, REVIVAL, INFORMATION, HAUNT, PLAGUE)
+
+# Nas etapas a partir daqui, quem foi corrompido não age
+CORRUPTIBLE_STAGES = (UNIQUE, KILL, REVIVAL, INFORMATION)
+
+
+class NightActionSpec(NamedTuple):
+    priority: int
+    stage: Optional[int] = None # None: a ação só conta como visita (ex: a escolha de alvo da primeira noite)
+
+# Ações que não dependem do papel de quem age
+GHOST_ACTIONS = {"haunt": NightActionSpec(5, HAUNT)}
+
+
+class NightAction:
+    """Uma ação noturna registrada. extra_ids guarda os alvos de ações com dois alvos (Cupido, Detetive)."""
+    __slots__ = ('player_id', 'kind', 'target_id', 'extra_ids', 'priority', 'stage')
+
+    def __init__(self, player_id: int, kind: str, target_id: Optional[int] = None, extra_ids: Tuple[Optional[int], ...] = (),
+                 priority: int = 50, stage: Optional[int] = None):
+        self.player_id = player_id
+        self.kind = kind
+        self.target_id = target_id
+        self.extra_ids = extra_ids
+        self.priority = priority
+        self.stage = stage
+
+    def copy(self) -> "NightAction":
+        return NightAction(self.player_id, self.kind, self.target_id, self.extra_ids, self.priority, self.stage)
+
+    def __repr__(self) -> str:
+        return f"NightAction({self.player_id}, {self.kind!r}, target_id={self.target_id}, extra_ids={self.extra_ids})"
+
+
+def action_spec(role, kind: str) -> NightActionSpec:
+    """Prioridade e etapa de uma ação: as declaradas pelo papel ou as de Fantasma (sem registro: prioridade 50, sem etapa)."""
+    spec = role.night_actions.get(kind) if role is not None else None
+    return spec or GHOST_ACTIONS.get(kind) or NightActionSpec(50)
+
+def make_night_action(player_id: int, role, kind: str, target_id: Optional[int] = None,
+                      extra_ids: Tuple[Optional[int], ...] = ()) -> NightAction:
+    spec = action_spec(role, kind)
+    return NightAction(player_id, kind, target_id, extra_ids, spec.priority, spec.stage)
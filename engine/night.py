@@ -0,0 +1,406 @@
+# engine/night.py
+"""
+Motor de resolução da noite: regras puras, sem Discord, sem E/S e sem awaits.
+
+resolve_night recebe uma cópia do estado da partida (NightState) e as ações registradas na noite
+e devolve a lista de efeitos, em ordem: mortes, revivências, alterações de estado dos jogadores e da
+partida, mensagens privadas, sons e fim de jogo. Quem chama (ActionsCog) aplica os efeitos de uma vez
+e envia as mensagens em paralelo depois. Toda a aleatoriedade vem do rng recebido: com o mesmo estado,
+as mesmas ações e a mesma semente, o resultado é sempre o mesmo.
+
+As regras de cada ação ficam no papel que a registra (Role.perform_night_action, ver engine/actions.py);
+aqui ficam as etapas e as mecânicas comuns: confusão, contagem dos votos dos Vilões, proteção,
+revivência, assombração e contágio da Praga.
+"""
+
+import random
+from typing import Dict, List, Any, Optional, Tuple, Union, Set, NamedTuple
+
+from engine.actions import NightAction, CONFUSION, STATUS, UNIQUE, KILL, REVIVAL, INFORMATION, HAUNT, PLAGUE, CORRUPTIBLE_STAGES
+from roles.base_role import Role
+from roles.cidade_roles import GuardaCostas, Prefeito, Medium
+from roles.solo_roles import Bruxo, Praga
+
+Killer = Union[int, List[int], None] # Responsável pela morte; em ataques em grupo, a lista de responsáveis
+
+# --- Efeitos ---
+
+class Death(NamedTuple):
+    victim_id: int
+    reason: str
+    killer: Killer
+
+class Revival(NamedTuple):
+    """O jogador volta à vida (as flags do papel dele são reiniciadas ao aplicar)."""
+    target_id: int
+    reviver_id: int
+
+class PlayerChange(NamedTuple):
+    """Novo valor de um atributo persistente de um jogador (ex: possession_points, role)."""
+    player_id: int
+    field: str
+    value: Any
+
+class GameChange(NamedTuple):
+    """Novo valor de uma flag da partida (ex: witch_potion_used, lovers)."""
+    field: str
+    value: Any
+
+class DirectMessage(NamedTuple):
+    player_id: int
+    text: str
+
+class SoundEvent(NamedTuple):
+    key: str
+
+class GameOver(NamedTuple):
+    title: str
+    winner_ids: List[int]
+    faction: str
+    reason: str
+    sound_event_key: Optional[str] = None
+
+Effect = Union[Death, Revival, PlayerChange, GameChange, DirectMessage, SoundEvent, GameOver]
+
+# Flags da partida lidas (e possivelmente alteradas) pela resolução
+GAME_FLAGS = ("lovers", "skip_villain_kill", "witch_potion_used", "angel_revive_used", "medium_talk_used",
+              "plague_exterminate_used", "plague_patient_zero_id", "plague_player_id")
+
+REVIVE_ACTIONS = ("angel_revive", "witch_revive")
+VILLAIN_VOTE = "villain_vote"
+
+
+# --- Estado ---
+
+class NightPlayer:
+    """Cópia do estado de um jogador usada durante a resolução."""
+    __slots__ = (
+        'player_id', 'name', 'role', 'is_alive', 'is_ghost', 'ghost_master_id', 'is_infected',
+        'possession_points', 'bodyguard_hits_survived',
+        # Estados que só valem durante a noite
+        'is_confused', 'is_corrupted', 'protected_by'
+    )
+
+    def __init__(self, player_id: int, name: str, role: Optional[Role], is_alive: bool = True, is_ghost: bool = False,
+                 ghost_master_id: Optional[int] = None, is_infected: bool = False, possession_points: int = 0,
+                 bodyguard_hits_survived: int = 0):
+        self.player_id = player_id
+        self.name = name
+        self.role = role
+        self.is_alive = is_alive
+        self.is_ghost = is_ghost
+        self.ghost_master_id = ghost_master_id
+        self.is_infected = is_infected
+        self.possession_points = possession_points
+        self.bodyguard_hits_survived = bodyguard_hits_survived
+        self.is_confused = False
+        self.is_corrupted = False
+        self.protected_by: Optional[int] = None
+
+    @property
+    def faction(self) -> Optional[str]:
+        return self.role.faction if self.role else None
+
+
+class NightState:
+    """Estado da partida lido pela resolução da noite: jogadores, ações registradas e flags."""
+    __slots__ = ('players', 'actions') + GAME_FLAGS
+
+    def __init__(self, players: Dict[int, NightPlayer], actions: Dict[int, NightAction], **flags):
+        self.players = players
+        self.actions = actions
+        self.lovers: Optional[Tuple[int, int]] = None
+        self.skip_villain_kill = False
+        self.witch_potion_used = False
+        self.angel_revive_used = False
+        self.medium_talk_used = False
+        self.plague_exterminate_used = False
+        self.plague_patient_zero_id: Optional[int] = None
+        self.plague_player_id: Optional[int] = None
+        for name, value in flags.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def from_game(cls, game) -> "NightState":
+        """Copia o estado de uma GameInstance (ou de qualquer objeto com os mesmos atributos). A partida não é alterada."""
+        players = {
+            player_id: NightPlayer(player_id, p_state.member.display_name, p_state.role, p_state.is_alive, p_state.is_ghost,
+                                   p_state.ghost_master_id, p_state.is_infected, p_state.possession_points,
+                                   p_state.bodyguard_hits_survived)
+            for player_id, p_state in game.players.items()
+        }
+        # As ações são copiadas porque a confusão troca os alvos
+        actions = {player_id: action.copy() for player_id, action in game.night_actions.items()}
+        return cls(players, actions, **{name: getattr(game, name) for name in GAME_FLAGS})
+
+
+class NightContext:
+    """
+    Fatos da noite calculados uma vez no início da resolução e mantidos em dia por ela: vivos e mortos
+    (em conjunto e na ordem dos jogadores, para os sorteios), membros de cada facção, mortes e
+    revivências da noite e o grafo de visitas, com os alvos já trocados pela confusão.
+    """
+    __slots__ = ('order', 'alive_ids', 'alive', 'dead', 'faction_ids', 'dying_ids', 'revived_ids', 'deaths_by_victim',
+                 'visited_by', 'visited')
+
+    def __init__(self, players: Dict[int, NightPlayer]):
+        self.order = tuple(players)
+        self.alive_ids = {player_id for player_id, player in players.items() if player.is_alive}
+        self._order_alive()
+        self.faction_ids: Dict[Optional[str], Set[int]] = {}
+        for player_id, player in players.items():
+            self.faction_ids.setdefault(player.faction, set()).add(player_id)
+        self.dying_ids: Set[int] = set() # Mortos da noite antes das revivências
+        self.revived_ids: Set[int] = set()
+        self.deaths_by_victim: Dict[int, Death] = {} # Mortes da noite que ficaram (depois das revivências)
+        self.visited_by: Dict[int, Set[int]] = {player_id: set() for player_id in players}
+        self.visited: Dict[int, Set[int]] = {player_id: set() for player_id in players}
+
+    def _order_alive(self):
+        self.alive = tuple(player_id for player_id in self.order if player_id in self.alive_ids)
+        self.dead = tuple(player_id for player_id in self.order if player_id not in self.alive_ids)
+
+    def revive(self, player_id: int):
+        self.alive_ids.add(player_id)
+        self.revived_ids.add(player_id)
+        self._order_alive()
+
+    def change_faction(self, player_id: int, old: Optional[str], new: Optional[str]):
+        self.faction_ids.get(old, set()).discard(player_id)
+        self.faction_ids.setdefault(new, set()).add(player_id)
+
+    def members(self, faction: str) -> List[int]:
+        """Vivos da facção, na ordem dos jogadores."""
+        faction_ids = self.faction_ids.get(faction, ())
+        return [player_id for player_id in self.alive if player_id in faction_ids]
+
+    def add_visit(self, visitor_id: int, target_id: Optional[int]):
+        if target_id:
+            self.visited_by[target_id].add(visitor_id)
+            self.visited[visitor_id].add(target_id)
+
+    def move_visit(self, visitor_id: int, old_target_id: Optional[int], new_target_id: int):
+        if old_target_id:
+            self.visited_by[old_target_id].discard(visitor_id)
+            self.visited[visitor_id].discard(old_target_id)
+        self.add_visit(visitor_id, new_target_id)
+
+
+# --- Resolução ---
+
+class NightResolver:
+    """
+    Executa as etapas da noite sobre um NightState, acumulando os efeitos. Os papéis recebem o resolver
+    em perform_night_action e alteram o estado pelos métodos públicos daqui.
+    """
+    def __init__(self, state: NightState, rng: random.Random):
+        self.state = state
+        self.rng = rng
+        self.effects: List[Effect] = []
+        self.context = NightContext(state.players)
+        self.by_kind: Dict[str, List[NightAction]] = {}
+        self.by_stage: Dict[int, List[Tuple[Role, NightAction]]] = {}
+        self.villain_votes: Dict[int, int] = {}
+        self.kill_attempts: Dict[int, List[Tuple[str, Killer]]] = {}
+        self.final_deaths: List[Death] = []
+        self.game_over = False
+
+    # --- Usados pelos papéis ---
+
+    def dm(self, player_id: int, text: str):
+        self.effects.append(DirectMessage(player_id, text))
+
+    def sound(self, key: str):
+        self.effects.append(SoundEvent(key))
+
+    def set_game(self, field: str, value: Any):
+        setattr(self.state, field, value)
+        self.effects.append(GameChange(field, value))
+
+    def set_player(self, player: NightPlayer, field: str, value: Any):
+        if field == "role":
+            self.context.change_faction(player.player_id, player.faction, value.faction if value else None)
+        setattr(player, field, value)
+        self.effects.append(PlayerChange(player.player_id, field, value))
+
+    def add_villain_vote(self, target_id: int, weight: int = 1):
+        self.villain_votes[target_id] = self.villain_votes.get(target_id, 0) + weight
+
+    def add_kill_attempt(self, target_id: int, source: str, killer: Killer):
+        self.kill_attempts.setdefault(target_id, []).append((source, killer))
+
+    def kill(self, victim_id: int, reason: str, killer: Killer):
+        """Morte que não passa por proteção nem revivência (ex: extermínio da Praga)."""
+        self.final_deaths.append(Death(victim_id, reason, killer))
+
+    def end_game(self, title: str, winner_ids: List[int], faction: str, reason: str, sound_event_key: Optional[str] = None):
+        self.effects.append(GameOver(title, winner_ids, faction, reason, sound_event_key))
+        self.game_over = True
+
+    def revive(self, action: NightAction, used_flag: str):
+        """Revive o alvo da ação se ele já estava morto antes desta noite, gastando o poder (used_flag) de quem reviveu."""
+        players = self.state.players
+        target = players.get(action.target_id)
+        if not target or target.is_alive or target.player_id in self.context.dying_ids: return
+
+        ghost_master_id = target.ghost_master_id
+        self.set_game(used_flag, True)
+        self._restore(target)
+        self.effects.append(Revival(target.player_id, action.player_id))
+        self.sound("PLAYER_REVIVE")
+        self.context.revive(target.player_id)
+
+        # O Prefeito que era Fantasma de um Médium devolve o poder a ele
+        if isinstance(target.role, Prefeito) and ghost_master_id and ghost_master_id in players:
+            self.set_game("medium_talk_used", False)
+            self.dm(ghost_master_id, "O Prefeito foi revivido! Seu poder foi restaurado.")
+
+    # --- Etapas ---
+
+    def resolve(self) -> List[Effect]:
+        context = self.context
+        self._bucket_actions()
+
+        self._run_stage(CONFUSION)
+        self._redirect_confused()
+        self._run_stage(STATUS)
+        self._run_stage(UNIQUE)
+
+        self._run_stage(KILL)
+        self._add_villain_kill()
+        deaths_before_revive = self._resolve_deaths()
+        context.dying_ids = {death.victim_id for death in deaths_before_revive}
+        self._run_stage(REVIVAL)
+        self.final_deaths = [death for death in deaths_before_revive if death.victim_id not in context.revived_ids]
+        context.deaths_by_victim = {death.victim_id: death for death in self.final_deaths}
+
+        self._run_stage(INFORMATION)
+        self._resolve_haunt()
+        self._run_stage(PLAGUE)
+        if self.game_over:
+            return self.effects
+        self._spread_plague()
+        self.effects.extend(self.final_deaths)
+        return self.effects
+
+    def _bucket_actions(self):
+        """
+        Ordena as ações uma única vez, registra as visitas e agrupa as ações por tipo e por etapa, já com o
+        papel que vai resolvê-las (o de quem agiu no início da noite, mesmo que ele mude durante a resolução).
+        """
+        players = self.state.players
+        for action in sorted(self.state.actions.values(), key=lambda action: action.priority):
+            self.context.add_visit(action.player_id, action.target_id)
+            self.by_kind.setdefault(action.kind, []).append(action)
+            if action.stage is not None and (player := players.get(action.player_id)) and player.role:
+                self.by_stage.setdefault(action.stage, []).append((player.role, action))
+
+    def _run_stage(self, stage: int):
+        """Entrega cada ação da etapa, em ordem de prioridade, ao papel de quem agiu."""
+        players = self.state.players
+        for role, action in self.by_stage.get(stage, ()):
+            if stage in CORRUPTIBLE_STAGES and players[action.player_id].is_corrupted: continue
+            role.perform_night_action(self, action)
+
+    def _redirect_confused(self):
+        """Troca o alvo das ações de quem ficou confuso por um alvo aleatório."""
+        players = self.state.players
+        context = self.context
+        for player_id, action in self.state.actions.items():
+            if (player := players.get(player_id)) and player.is_confused:
+                candidates = context.dead if action.kind in REVIVE_ACTIONS else context.alive
+                possible_targets = [pid for pid in candidates if pid != player_id and pid != action.target_id]
+                if possible_targets:
+                    new_target_id = self.rng.choice(possible_targets)
+                    context.move_visit(player_id, action.target_id, new_target_id)
+                    action.target_id = new_target_id
+                    self.dm(player_id, "😵‍💫 **Que tontura!** Sua ação saiu toda errada.")
+
+    def _add_villain_kill(self):
+        """O alvo mais votado pelos Vilões vira uma tentativa de morte (a menos que a noite seja de possessão)."""
+        if not self.villain_votes or self.state.skip_villain_kill: return
+        target_id = max(self.villain_votes, key=self.villain_votes.get)
+        voters = [action.player_id for action in self.by_kind.get(VILLAIN_VOTE, ()) if action.target_id == target_id]
+        self.add_kill_attempt(target_id, "villain", voters)
+
+    def _resolve_deaths(self) -> List[Death]:
+        """Processa as tentativas de morte, considerando proteções, e retorna quem morreu."""
+        players = self.state.players
+        deaths: List[Death] = []
+        for target_id, killers_info in self.kill_attempts.items():
+            target = players.get(target_id)
+            if not target or not target.is_alive: continue
+            attack_source, attacker_id = killers_info[0]
+
+            # O alvo está sendo protegido por um Guarda-costas: ele sobrevive, e o protetor também na primeira vez
+            if target.protected_by and attack_source == "villain":
+                if protector := players.get(target.protected_by):
+                    self.set_player(protector, "bodyguard_hits_survived", protector.bodyguard_hits_survived + 1)
+                    if protector.bodyguard_hits_survived == 1:
+                        self.sound("PROTECTION_SUCCESS")
+                        # O protetor sabe quem protegeu; o protegido não sabe quem o salvou
+                        self.dm(protector.player_id, "🛡️ Você entrou na frente de um ataque para proteger seu alvo e sobreviveu!")
+                        self.dm(target_id, "🛡️ Você foi atacado, mas uma força protetora te salvou esta noite.")
+                    else:
+                        # Na segunda vez ele morre no lugar do alvo (anunciado com as outras mortes, sem a causa)
+                        deaths.append(Death(protector.player_id, "bodyguard_sacrifice", target_id))
+                        self.sound("PLAYER_DEATH")
+                continue
+
+            # O alvo do ataque é o Guarda-costas: sobrevive ao primeiro ataque direto
+            if isinstance(target.role, GuardaCostas):
+                self.set_player(target, "bodyguard_hits_survived", target.bodyguard_hits_survived + 1)
+                if target.bodyguard_hits_survived == 1:
+                    self.sound("PROTECTION_SUCCESS")
+                    self.dm(target_id, "🛡️ Você foi atacado, mas sua resistência o salvou desta vez!")
+                    continue
+
+            deaths.append(Death(target_id, attack_source, attacker_id))
+        return deaths
+
+    def _restore(self, player: NightPlayer):
+        """Espelha PlayerState.revive e as flags de GameInstance.reset_flags_for_player que a noite ainda lê."""
+        player.is_alive = True
+        player.bodyguard_hits_survived = 0
+        player.is_ghost = False
+        player.ghost_master_id = None
+        player.is_confused = False
+        if isinstance(player.role, Bruxo): self.state.witch_potion_used = False
+        if isinstance(player.role, Medium): self.state.medium_talk_used = False
+        if isinstance(player.role, Praga): self.state.plague_exterminate_used = False
+
+    def _resolve_haunt(self):
+        """O Fantasma (e o Médium dele) recebem quem visitou o alvo assombrado e quem o alvo visitou."""
+        players = self.state.players
+        haunts = self.by_stage.get(HAUNT)
+        if not haunts: return
+        _, haunt = haunts[0]
+        ghost_id, haunt_target_id = haunt.player_id, haunt.target_id
+        if (ghost := players.get(ghost_id)) and ghost.ghost_master_id and haunt_target_id in players:
+            visited_by_names = [players[pid].name for pid in self.context.visited_by[haunt_target_id] if pid != ghost_id]
+            visited_names = [players[pid].name for pid in self.context.visited[haunt_target_id]]
+            report = (f"Relatório da Assombração sobre **{players[haunt_target_id].name}**:\n"
+                      f"- Foi visitado por: **{', '.join(visited_by_names) if visited_by_names else 'Ninguém'}**\n"
+                      f"- Visitou: **{', '.join(visited_names) if visited_names else 'Ninguém'}**")
+            self.dm(ghost_id, report)
+            self.dm(ghost.ghost_master_id, report)
+
+    def _spread_plague(self):
+        """Quem visitou o paciente zero, ou foi visitado por ele, é infectado."""
+        state = self.state
+        players = state.players
+        patient_zero_id = state.plague_patient_zero_id
+        if not patient_zero_id or patient_zero_id not in self.context.alive_ids: return
+        contacts = self.context.visited_by[patient_zero_id] | self.context.visited[patient_zero_id]
+        for player_id in sorted(contacts):
+            if player_id != state.plague_player_id and (player := players.get(player_id)) and not player.is_infected:
+                self.set_player(player, "is_infected", True)
+                self.dm(player_id, "🤒 Você se sente febril... Você foi infectado pela Praga!")
+
+
+def resolve_night(state: NightState, rng: Optional[random.Random] = None) -> List[Effect]:
+    """
+    Resolve a noite sobre state (que é alterado: use uma cópia, como NightState.from_game) e retorna
+    os efeitos em ordem. As mortes vêm no fim da lista, na ordem em que devem ser processadas.
+    """
+    return NightResolver(state, rng or random.Random()).resolve()
@@ -26,6 +26,8 @@ except ImportError:
     print("Erro: Arquivo config.py não encontrado.")
     exit()
 
+from stats.loop_monitor import LoopStallMonitor
+
 # Configuração básica de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s: %(message)s')
 logger = logging.getLogger('discord')
@@ -92,6 +94,8 @@ bot = discord.Bot(
     member_cache_flags=cache_flags
 )
 bot.game_manager = GameManager(bot)
+# Mede travamentos do event loop (ex: E/S síncrona) para acompanhar a saúde do bot
+bot.loop_monitor = LoopStallMonitor(threshold=config.LOOP_STALL_THRESHOLD_SECONDS)
 
 
 # --- Carregamento dos Cogs ---
@@ -116,6 +120,7 @@ async def on_ready():
     logger.info(f'Bot conectado como {bot.user.name} (ID: {bot.user.id})')
     logger.info(f'Usando discord.py versão {discord.__version__}')
     logger.info(config.MSG_BOT_STARTING)
+    bot.loop_monitor.start()
     try:
         await bot.sync_commands()
         logger.info('Comandos sincronizados globalmente com sucesso.')
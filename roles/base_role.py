@@ -1,9 +1,15 @@
 # roles/base_role.py
 
 import discord
+from typing import Dict
+
+from engine.actions import NightAction, NightActionSpec
 
 class Role:
     """Classe base para todos os papéis do jogo."""
+    # Ações noturnas que o papel pode registrar: nome da ação -> prioridade e etapa (ver engine/actions.py)
+    night_actions: Dict[str, NightActionSpec] = {}
+
     def __init__(self, name: str, faction: str, description: str, abilities: str, image_file: str):
         self.name = name
         self.faction = faction # "Cidade", "Vilões", "Solo"
@@ -35,9 +41,11 @@ class Role:
         else:
             return discord.Color.default()
 
-    async def perform_night_action(self, game_state, player_state, target_member: discord.Member):
-        """Método para ser sobrescrito por papéis com ações noturnas."""
-        # Lógica específica da ação noturna do papel
+    def perform_night_action(self, night, action: NightAction):
+        """
+        Resolve uma ação do papel na etapa dela. night é o NightResolver da noite (engine/night.py).
+        Sobrescrito pelos papéis com ações noturnas.
+        """
         pass
 
     async def perform_day_action(self, game_state, player_state, target_member: discord.Member):
@@ -2,6 +2,7 @@
 
 from .base_role import Role
 import discord
+from engine.actions import NightActionSpec, STATUS, REVIVAL, INFORMATION
 
 # --- Papéis da Facção Cidade ---
 
@@ -29,6 +30,11 @@ class Anjo(Role):
             ),
             image_file="anjo.png"
         )
+
+    night_actions = {"angel_revive": NightActionSpec(40, REVIVAL)}
+
+    def perform_night_action(self, night, action):
+        night.revive(action, "angel_revive_used")
         
 class Xerife(Role):
     def __init__(self):
@@ -55,6 +61,13 @@ class GuardaCostas(Role):
             ),
             image_file="guarda_costas.png"
         )
+
+    night_actions = {"protect": NightActionSpec(20, STATUS)}
+
+    def perform_night_action(self, night, action):
+        # Corrompido, o Guarda-costas não protege ninguém
+        if (target := night.state.players.get(action.target_id)) and not night.state.players[action.player_id].is_corrupted:
+            target.protected_by = action.player_id
         
 class Detetive(Role):
     def __init__(self):
@@ -68,6 +81,28 @@ class Detetive(Role):
             image_file="detetive.png"
         )
 
+    night_actions = {"mark_detective": NightActionSpec(60, INFORMATION)}
+
+    def perform_night_action(self, night, action):
+        players = night.state.players
+        deaths_by_victim = night.context.deaths_by_victim
+        marked_killed_ids = [tid for tid in action.extra_ids if tid is not None and tid in deaths_by_victim]
+        if not marked_killed_ids:
+            night.dm(action.player_id, "🕵️ Sua vigília foi tranquila. Nenhum dos seus alvos morreu.")
+            return
+        killed_id = marked_killed_ids[0]
+        killed = players[killed_id]
+        killer_info = deaths_by_victim[killed_id].killer
+        killer_ids = killer_info if isinstance(killer_info, list) else [killer_info]
+        if killer_ids and (killer := players.get(night.rng.choice(killer_ids))):
+            innocent_pool = [players[pid] for pid in night.context.alive if pid not in (action.player_id, killed_id, killer.player_id)]
+            clues = [killer, night.rng.choice(innocent_pool)] if innocent_pool else [killer]
+            night.rng.shuffle(clues)
+            info_msg = f"🕵️ {killed.name} foi morto. Um destes está envolvido: **{', '.join(p.name for p in clues)}**."
+        else:
+            info_msg = f"🕵️ {killed.name} foi morto, mas o assassino é um mistério."
+        night.dm(action.player_id, info_msg)
+
 class VidenteDeAura(Role):
     def __init__(self):
         super().__init__(
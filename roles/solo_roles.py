@@ -2,6 +2,10 @@
 
 from .base_role import Role
 import discord
+from engine.actions import NightActionSpec, STATUS, UNIQUE, KILL, REVIVAL, PLAGUE
+
+# Escolha de alvo da primeira noite: não é resolvida, só conta como visita
+CHOOSE_TARGET = {"choose_target": NightActionSpec(70)}
 
 # --- Papéis da Facção Solo ---
 
@@ -32,6 +36,8 @@ class Fofoqueiro(Role):
             image_file="fofoqueiro.png"
         )
 
+    night_actions = CHOOSE_TARGET
+
 class Bruxo(Role):
     def __init__(self):
         super().__init__(
@@ -45,6 +51,15 @@ class Bruxo(Role):
             image_file="bruxo.png"
         )
 
+    night_actions = {"witch_kill": NightActionSpec(25, KILL), "witch_revive": NightActionSpec(40, REVIVAL)}
+
+    def perform_night_action(self, night, action):
+        if action.kind == "witch_kill":
+            night.add_kill_attempt(action.target_id, "witch", action.player_id)
+            night.set_game("witch_potion_used", True)
+        elif action.kind == "witch_revive":
+            night.revive(action, "witch_potion_used")
+
 class Cupido(Role):
     def __init__(self):
         super().__init__(
@@ -59,6 +74,16 @@ class Cupido(Role):
             image_file="cupido.png"
         )
 
+    night_actions = {"cupid_match": NightActionSpec(10, UNIQUE)}
+
+    def perform_night_action(self, night, action):
+        lover1_id, lover2_id = action.extra_ids
+        night.set_game("lovers", (lover1_id, lover2_id))
+        players = night.state.players
+        if (lover1 := players.get(lover1_id)) and (lover2 := players.get(lover2_id)):
+            night.dm(lover1_id, f"💘 O Cupido acertou você! Seu grande amor é **{lover2.name}**. Se um de vocês morrer, o outro morrerá junto.")
+            night.dm(lover2_id, f"💘 O Cupido acertou você! Seu grande amor é **{lover1.name}**. Se um de vocês morrer, o outro morrerá junto.")
+
 class Praga(Role):
     def __init__(self):
         super().__init__(
@@ -73,6 +98,20 @@ class Praga(Role):
             image_file="praga.png"
         )
 
+    night_actions = {**CHOOSE_TARGET, "plague_exterminate": NightActionSpec(35, PLAGUE)}
+
+    def perform_night_action(self, night, action):
+        if action.kind != "plague_exterminate" or night.state.plague_exterminate_used: return
+        night.set_game("plague_exterminate_used", True)
+        players = night.state.players
+        infected_ids = [pid for pid in night.context.alive if players[pid].is_infected]
+        if len(infected_ids) >= 4:
+            night.end_game("Vitória da Praga!", [action.player_id], "Solo (Praga)",
+                           f"A Praga eliminou {len(infected_ids)} jogadores!", "PLAGUE_WIN")
+            return
+        for infected_id in infected_ids:
+            night.kill(infected_id, "killed_by_plague", action.player_id)
+
 class Corruptor(Role):
     def __init__(self):
         super().__init__(
@@ -86,6 +125,13 @@ class Corruptor(Role):
             image_file="corruptor.png"
         )
 
+    night_actions = {"corrupt": NightActionSpec(15, STATUS)}
+
+    def perform_night_action(self, night, action):
+        if target := night.state.players.get(action.target_id):
+            target.is_corrupted = True
+            night.dm(target.player_id, "😵‍💫 Sua mente foi invadida! Você não consegue usar sua habilidade esta noite.")
+
 class CacadorDeCabecas(Role):
     def __init__(self):
         super().__init__(
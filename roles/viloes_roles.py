@@ -2,6 +2,10 @@
 
 from .base_role import Role
 import discord
+from engine.actions import NightActionSpec, CONFUSION, UNIQUE, KILL
+
+# Voto na eliminação noturna, comum a todos os Vilões
+VILLAIN_VOTE = {"villain_vote": NightActionSpec(30, KILL)}
 
 # --- Papéis da Facção Vilões ---
 
@@ -19,6 +23,30 @@ class AssassinoAlfa(Role):
             image_file="assassino_alfa.png"
         )
 
+    night_actions = {**VILLAIN_VOTE, "possess": NightActionSpec(90, UNIQUE)}
+
+    def perform_night_action(self, night, action):
+        if action.kind == "villain_vote":
+            night.add_villain_vote(action.target_id, weight=2) # Voto de Liderança
+        elif action.kind == "possess":
+            self._possess(night, action)
+
+    def _possess(self, night, action):
+        """Possessão substitui a eliminação da noite; com 3 pontos o alvo vira Assassino Simples."""
+        players = night.state.players
+        night.state.skip_villain_kill = True
+        if not (target := players.get(action.target_id)): return
+        night.set_player(target, "possession_points", target.possession_points + 1)
+        night.dm(action.player_id, f"Você adicionou +1 ponto de possessão a {target.name}. Total: {target.possession_points}/3.")
+        if target.possession_points >= 3:
+            night.set_player(target, "role", AssassinoSimples())
+            night.dm(target.player_id, "Sua mente foi quebrada! Você agora é um **Assassino Simples**.")
+            villains = [players[pid] for pid in night.context.members("Vilões")]
+            night.dm(target.player_id, f"Seus novos companheiros são: **{', '.join(p.name for p in villains)}**")
+            for villain in villains:
+                if villain.player_id != target.player_id:
+                    night.dm(villain.player_id, f"**{target.name}** foi corrompido e agora é um Assassino Simples.")
+
 class AssassinoJunior(Role):
     def __init__(self):
         super().__init__(
@@ -32,6 +60,14 @@ class AssassinoJunior(Role):
             ),
             image_file="assassino_junior.png"
         )
+
+    night_actions = {**VILLAIN_VOTE, "confuse": NightActionSpec(16, CONFUSION), "choose_target": NightActionSpec(70)}
+
+    def perform_night_action(self, night, action):
+        if action.kind == "villain_vote":
+            night.add_villain_vote(action.target_id)
+        elif action.kind == "confuse" and (target := night.state.players.get(action.target_id)):
+            target.is_confused = True
         
 class Cumplice(Role):
     def __init__(self):
@@ -46,6 +82,11 @@ class Cumplice(Role):
             image_file="cumplice.png"
         )
 
+    night_actions = {**VILLAIN_VOTE, "choose_target": NightActionSpec(70)}
+
+    def perform_night_action(self, night, action):
+        night.add_villain_vote(action.target_id)
+
 class AssassinoSimples(Role):
     def __init__(self):
         super().__init__(
@@ -59,6 +100,11 @@ class AssassinoSimples(Role):
             image_file="assassino_simples.png"
         )
 
+    night_actions = {**VILLAIN_VOTE, "choose_target": NightActionSpec(70)}
+
+    def perform_night_action(self, night, action):
+        night.add_villain_vote(action.target_id)
+
 # Dicionário para fácil acesso
 viloes_role_classes = {
     "Assassino Alfa": AssassinoAlfa,
@@ -0,0 +1,146 @@
+# stats/achievements.py
+"""
+Conquistas (medalhas) e títulos definidos em conquistas.json, sem regras fixas no código.
+
+Cada conquista é de um de dois tipos:
+    contador: {"medalha": ..., "contador": "partidas" | "vitorias" | "vitorias_papel" | "sequencia_vitorias",
+               "papel": ... (só em vitorias_papel), "minimo": N}
+    evento:   {"medalha": ..., "evento": {"papel": ..., "faccao": ..., "venceu": true/false, "sobreviveu": true/false}}
+              (todas as condições informadas precisam valer na partida)
+
+Na carga, as regras são compiladas em tabelas de gatilhos: uma lista ordenada de limites por contador
+(ex: ("vitorias_papel", "Xerife")) e uma lista de eventos por papel. Ao aplicar uma partida, só as
+regras dos contadores que mudaram e dos eventos do papel jogado são avaliadas. Uma medalha é concedida
+quando o contador alcança o mínimo e o jogador ainda não a tem, então regras novas também valem para
+quem já tinha passado do limite (na próxima vez que o contador mudar).
+"""
+
+import json
+import logging
+from bisect import bisect_right
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Iterator, NamedTuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Contadores que podem disparar conquistas
+GAMES = "partidas"
+WINS = "vitorias"
+ROLE_WINS = "vitorias_papel"
+WIN_STREAK = "sequencia_vitorias"
+COUNTERS = (GAMES, WINS, ROLE_WINS, WIN_STREAK)
+
+CounterKey = Tuple[str, Optional[str]] # (contador, papel ou None)
+
+
+class AchievementError(ValueError):
+    """conquistas.json com uma regra inválida."""
+
+
+class EventRule(NamedTuple):
+    """Conquista concedida por um acontecimento da partida (None = condição não verificada)."""
+    medal: str
+    faction: Optional[str] = None
+    won: Optional[bool] = None
+    survived: Optional[bool] = None
+
+    def matches(self, faction: Optional[str], won: bool, survived: bool) -> bool:
+        return ((self.faction is None or self.faction == faction) and (self.won is None or self.won == won)
+                and (self.survived is None or self.survived == survived))
+
+
+class Achievements:
+    """Regras de conquistas compiladas em tabelas de gatilhos, e os títulos por papel exibidos no /perfil."""
+    def __init__(self, rules: Iterable[Dict[str, Any]] = (), titles: Optional[Dict[str, str]] = None, title_min_wins: int = 5):
+        thresholds: Dict[CounterKey, List[Tuple[int, str]]] = {}
+        self._events: Dict[Optional[str], List[EventRule]] = {}
+        self.medals: List[str] = []
+        for position, rule in enumerate(rules, start=1):
+            medal = rule.get("medalha")
+            if not isinstance(medal, str) or not medal:
+                raise AchievementError(f"Conquista #{position} sem 'medalha'.")
+            if medal in self.medals:
+                raise AchievementError(f"Medalha '{medal}' definida mais de uma vez.")
+            if "evento" in rule:
+                self._compile_event(medal, rule["evento"])
+            else:
+                key, minimum = self._parse_counter(medal, rule)
+                thresholds.setdefault(key, []).append((minimum, medal))
+            self.medals.append(medal)
+        # Limites em ordem crescente: as regras alcançadas por um valor são um prefixo da lista
+        self._thresholds = {key: sorted(entries) for key, entries in thresholds.items()}
+        self._minimums = {key: [minimum for minimum, _ in entries] for key, entries in self._thresholds.items()}
+        self.titles = titles or {}
+        self.title_min_wins = title_min_wins
+
+    @staticmethod
+    def _parse_counter(medal: str, rule: Dict[str, Any]) -> Tuple[CounterKey, int]:
+        counter = rule.get("contador")
+        if counter not in COUNTERS:
+            raise AchievementError(f"Medalha '{medal}': contador desconhecido {counter!r} (use {', '.join(COUNTERS)}).")
+        role = rule.get("papel")
+        if (counter == ROLE_WINS) != (role is not None):
+            raise AchievementError(f"Medalha '{medal}': 'papel' é obrigatório em {ROLE_WINS} e só vale nele.")
+        minimum = rule.get("minimo")
+        if not isinstance(minimum, int) or isinstance(minimum, bool) or minimum < 1:
+            raise AchievementError(f"Medalha '{medal}': 'minimo' precisa ser um inteiro positivo.")
+        return (counter, role), minimum
+
+    def _compile_event(self, medal: str, event: Any):
+        if not isinstance(event, dict) or not event:
+            raise AchievementError(f"Medalha '{medal}': 'evento' precisa ter ao menos uma condição.")
+        unknown = set(event) - {"papel", "faccao", "venceu", "sobreviveu"}
+        if unknown:
+            raise AchievementError(f"Medalha '{medal}': condições desconhecidas no evento: {', '.join(sorted(unknown))}.")
+        rule = EventRule(medal, event.get("faccao"), event.get("venceu"), event.get("sobreviveu"))
+        # Eventos de um papel só são avaliados para quem jogou com ele; os demais (None), para todos
+        self._events.setdefault(event.get("papel"), []).append(rule)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Achievements":
+        titles = data.get("titulos", {})
+        return cls(data.get("conquistas", []), titles.get("por_papel", {}), titles.get("vitorias_minimas", 5))
+
+    @classmethod
+    def load(cls, path: str) -> "Achievements":
+        """Lê e compila o arquivo de conquistas. Arquivo inválido gera AchievementError."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise AchievementError(f"Não foi possível ler {path}: {e}") from e
+        achievements = cls.from_dict(data)
+        logger.info(f"{len(achievements.medals)} conquistas carregadas de {path}.")
+        return achievements
+
+    # --- Gatilhos ---
+
+    def reached(self, changes: Iterable[Tuple[CounterKey, int]]) -> Iterator[str]:
+        """Medalhas cujo mínimo foi alcançado pelos contadores alterados (chave, novo valor)."""
+        for key, value in changes:
+            if (minimums := self._minimums.get(key)) is None:
+                continue
+            for _, medal in self._thresholds[key][:bisect_right(minimums, value)]:
+                yield medal
+
+    def events(self, role: Optional[str], faction: Optional[str], won: bool, survived: bool) -> Iterator[str]:
+        """Medalhas de evento conquistadas em uma partida (avalia só as regras do papel jogado e as gerais)."""
+        for key in (role, None) if role is not None else (None,):
+            for rule in self._events.get(key, ()):
+                if rule.matches(faction, won, survived):
+                    yield rule.medal
+
+    # --- Títulos ---
+
+    def title(self, role_wins: Dict[str, int]) -> Optional[str]:
+        """Título do papel com mais vitórias que tenha um título e o mínimo de vitórias."""
+        for role_name, wins in sorted(role_wins.items(), key=lambda item: item[1], reverse=True):
+            if wins >= self.title_min_wins and (title := self.titles.get(role_name)):
+                return title
+        return None
+
+
+def load_achievements(path: Optional[str] = None) -> Achievements:
+    """Conquistas do arquivo configurado (config.ACHIEVEMENTS_FILE)."""
+    return Achievements.load(path or config.ACHIEVEMENTS_FILE)
@@ -0,0 +1,101 @@
+# stats/aggregates.py
+"""
+Estatísticas agregadas das partidas: taxa de vitória por papel, por facção e por quantidade
+de jogadores, e de cada facção quando um papel está em jogo.
+
+Os contadores são atualizados a cada partida (a partir do registro do log de partidas),
+então consultar qualquer taxa custa O(1), independente de quantos jogadores existem no ranking.
+"""
+
+from typing import Dict, List, Any, Optional, Set, Tuple, Iterable
+
+# Tipos de contador. Para cada um: chave -> detalhe -> [partidas, vitórias]
+ROLE = "papel" # chave = papel, detalhe = jogadores na partida (ou ALL_SIZES)
+FACTION = "faccao" # chave = facção, detalhe = jogadores na partida (ou ALL_SIZES)
+FACTION_WITH_ROLE = "faccao_com_papel" # chave = papel presente, detalhe = facção
+GAMES = "partidas" # chave = "", detalhe = jogadores na partida (ou ALL_SIZES); vitórias não se aplica
+ALL_SIZES = ""
+
+AggregateKey = Tuple[str, str, str]
+
+
+def game_aggregate_updates(record: Dict[str, Any]) -> List[Tuple[AggregateKey, bool]]:
+    """Lista os contadores que uma partida incrementa, cada um com o resultado (venceu ou não)."""
+    players = record["p"]
+    size = str(len(players))
+    updates: List[Tuple[AggregateKey, bool]] = [((GAMES, "", ALL_SIZES), False), ((GAMES, "", size), False)]
+    roles_present: Set[str] = set()
+    faction_won: Dict[str, bool] = {}
+    for _, _, role, faction, won, _ in players:
+        if role:
+            roles_present.add(role)
+            updates += [((ROLE, role, ALL_SIZES), bool(won)), ((ROLE, role, size), bool(won))]
+        if faction:
+            # A facção venceu a partida se qualquer um dos seus jogadores venceu
+            faction_won[faction] = faction_won.get(faction, False) or bool(won)
+    for faction, won in faction_won.items():
+        updates += [((FACTION, faction, ALL_SIZES), won), ((FACTION, faction, size), won)]
+        updates += [((FACTION_WITH_ROLE, role, faction), won) for role in roles_present]
+    return updates
+
+
+class GameAggregates:
+    """Contadores de partidas e vitórias em memória, com registro dos que mudaram desde a última gravação."""
+    def __init__(self, rows: Optional[Dict[AggregateKey, Tuple[int, int]]] = None):
+        self._counters: Dict[str, Dict[str, Dict[str, List[int]]]] = {}
+        self._dirty: Set[AggregateKey] = set()
+        for key, (games, wins) in (rows or {}).items():
+            self._counter(key)[:] = [games, wins]
+
+    def _counter(self, key: AggregateKey) -> List[int]:
+        kind, name, detail = key
+        return self._counters.setdefault(kind, {}).setdefault(name, {}).setdefault(detail, [0, 0])
+
+    def apply(self, record: Dict[str, Any]):
+        """Contabiliza uma partida."""
+        for key, won in game_aggregate_updates(record):
+            counter = self._counter(key)
+            counter[0] += 1
+            counter[1] += 1 if won else 0
+            self._dirty.add(key)
+
+    # --- Consulta ---
+
+    def get(self, kind: str, name: str, detail: str = ALL_SIZES) -> Tuple[int, int]:
+        """Retorna (partidas, vitórias) de um contador. Contadores inexistentes valem (0, 0)."""
+        counter = self._counters.get(kind, {}).get(name, {}).get(detail)
+        return (counter[0], counter[1]) if counter else (0, 0)
+
+    def names(self, kind: str) -> List[str]:
+        """Chaves já registradas de um tipo (ex: todos os papéis que já apareceram)."""
+        return list(self._counters.get(kind, {}))
+
+    def details(self, kind: str, name: str) -> Dict[str, Tuple[int, int]]:
+        """Todos os detalhes de uma chave (ex: o papel em cada quantidade de jogadores)."""
+        return {detail: (counter[0], counter[1]) for detail, counter in self._counters.get(kind, {}).get(name, {}).items()}
+
+    @property
+    def total_games(self) -> int:
+        return self.get(GAMES, "")[0]
+
+    # --- Gravação ---
+
+    @property
+    def has_dirty(self) -> bool:
+        return bool(self._dirty)
+
+    def take_dirty(self) -> Dict[AggregateKey, Tuple[int, int]]:
+        """Retira da fila os contadores alterados, como valores congelados para gravação."""
+        rows = {key: tuple(self._counter(key)) for key in self._dirty}
+        self._dirty = set()
+        return rows
+
+    def mark_dirty(self, keys: Iterable[AggregateKey]):
+        self._dirty.update(keys)
+
+    def rows(self) -> Dict[AggregateKey, Tuple[int, int]]:
+        """Todos os contadores, no formato gravado no banco."""
+        return {(kind, name, detail): (counter[0], counter[1])
+                for kind, names in self._counters.items()
+                for name, details in names.items()
+                for detail, counter in details.items()}
@@ -0,0 +1,178 @@
+# stats/backend.py
+"""
+Acesso do bot ao ranking. O RankingCog só conversa com um backend:
+
+- LocalRankingBackend: o próprio processo é dono dos bancos (RankingShards). É o padrão,
+  para quem roda um único processo do bot.
+- stats.client.RemoteRankingBackend: os bancos ficam com o serviço de ranking
+  (python -m stats.service), que atende qualquer quantidade de processos do bot por um socket Unix.
+
+As consultas devolvem só o necessário para montar cada resposta (as estatísticas dos jogadores
+envolvidos), nunca o ranking inteiro, então o mesmo formato serve dentro e fora do processo.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Any, Optional, Tuple, Mapping, Hashable, NamedTuple, Iterable, AsyncIterator
+
+import config
+from .leaderboard import LeaderboardPage, SortKey
+from .shards import RankingShards
+from .cache import RankingCache
+from .game_log import GameLog
+from .aggregates import GameAggregates
+from .kill_graph import KillRival
+from .history import HistoryEntry, HistoryCursor
+from .achievements import Achievements
+from .export import Chunk, iter_chunks
+
+logger = logging.getLogger(__name__)
+
+Medals = List[Tuple[str, str]] # (id do jogador, medalha)
+
+
+class RankingUnavailableError(Exception):
+    """O ranking não pôde ser consultado ou atualizado (ex: serviço de ranking fora do ar)."""
+
+
+class RankingPageData(NamedTuple):
+    """Uma página de um placar com as estatísticas dos jogadores exibidos."""
+    page: LeaderboardPage
+    players: Mapping[str, Mapping[str, Any]]
+    version: Hashable # Muda sempre que alguma posição do placar ou algum jogador da página muda
+    population: int # Jogadores no shard (inclusive os que não entram neste placar)
+
+
+class PlayerProfile(NamedTuple):
+    """Estatísticas de um jogador no ranking global e no servidor consultado."""
+    stats: Mapping[str, Any]
+    guild_stats: Optional[Mapping[str, Any]]
+    version: Hashable # Muda sempre que as estatísticas (globais ou do servidor) do jogador mudam
+
+
+def create_ranking_shards(achievements: Optional[Achievements] = None) -> RankingShards:
+    """
+    Monta os shards do ranking a partir do config: o global (data/ranking.db, migrado do antigo
+    ranking.json na primeira abertura) e um por servidor, com o log de partidas como fonte da verdade.
+    """
+    return RankingShards(
+        config.RANKING_DB_FILE,
+        config.RANKING_GUILDS_PATH,
+        legacy_json_path=config.RANKING_FILE,
+        min_games_for_win_rate=config.RANKING_MIN_GAMES_FOR_WIN_RATE,
+        flush_interval=config.RANKING_FLUSH_INTERVAL_SECONDS,
+        flush_threshold=config.RANKING_FLUSH_MAX_PENDING,
+        game_log=GameLog(config.GAME_LOG_FILE),
+        achievements=achievements,
+        use_snapshots=config.RANKING_USE_SNAPSHOTS,
+        history_ring_size=config.RANKING_HISTORY_RING_SIZE
+    )
+
+
+class LocalRankingBackend:
+    """Ranking no próprio processo: lê das visões imutáveis dos shards e escreve direto neles."""
+    def __init__(self, shards: RankingShards):
+        self.shards = shards
+
+    async def start(self):
+        await self.shards.start()
+
+    def flush_sync(self):
+        self.shards.flush_sync()
+
+    def close(self):
+        self.shards.close()
+
+    async def _shard(self, guild_id: Optional[int]) -> RankingCache:
+        cache = await self.shards.open_guild(guild_id) if guild_id is not None else self.shards.global_cache
+        await cache.ensure_loaded()
+        return cache
+
+    # --- Escrita ---
+
+    async def record_games(self, records: Iterable[Dict[str, Any]]) -> List[Medals]:
+        """
+        Acrescenta cada partida ao log (um append, durável) e a aplica aos shards, na ordem recebida.
+        Retorna as medalhas concedidas em cada partida.
+        """
+        awarded: List[Medals] = []
+        for record in records:
+            try:
+                log_offset = await self.shards.append_record(record)
+            except OSError as e:
+                # Sem o log a partida ainda entra no ranking em memória; só não poderá ser reaplicada.
+                logger.exception(f"Erro ao registrar a partida {record.get('id')} no log: {e}")
+                log_offset = None
+            awarded.append(await self.shards.apply_record(record, log_offset))
+        return awarded
+
+    async def record_game(self, record: Dict[str, Any]) -> Medals:
+        return (await self.record_games([record]))[0]
+
+    # --- Consultas ---
+
+    async def leaderboard_page(self, guild_id: Optional[int], sort_key: str, size: int, start: int = 0,
+                               after: Optional[SortKey] = None, before: Optional[SortKey] = None,
+                               around: Optional[str] = None) -> Optional[RankingPageData]:
+        """
+        Página de um placar: a que começa em start, a seguinte a after, a anterior a before ou a que
+        contém o jogador around (None se ele não estiver no placar).
+        """
+        cache = await self._shard(guild_id)
+        index = cache.leaderboards.index(sort_key)
+        if around is not None:
+            position = index.position(around)
+            if position is None:
+                return None
+            page = index.page_at(position // size * size, size)
+        elif after is not None:
+            page = index.page_after(after, size)
+        elif before is not None:
+            page = index.page_before(before, size)
+        else:
+            page = index.page_at(start, size)
+        view = cache.read()
+        # A página muda quando alguma posição do placar muda ou quando qualquer jogador exibido muda (ex: nome, partidas)
+        version = (cache.leaderboards.version(sort_key), tuple(cache.player_version(player_id) for player_id in page.player_ids))
+        return RankingPageData(page, {player_id: view[player_id] for player_id in page.player_ids}, version, len(view))
+
+    async def profile(self, player_id: str, guild_id: Optional[int]) -> Optional[PlayerProfile]:
+        """Estatísticas do jogador (None se ele não tiver perfil), lidas das visões imutáveis dos shards."""
+        cache = await self._shard(None)
+        guild_cache = await self._shard(guild_id) if guild_id is not None else None
+        # Lidas depois de todos os awaits: global e servidor vêm do mesmo instante.
+        stats = cache.read().get(player_id)
+        if stats is None:
+            return None
+        guild_stats = guild_cache.read().get(player_id) if guild_cache else None
+        version = (cache.player_version(player_id), guild_cache.player_version(player_id) if guild_cache else 0)
+        return PlayerProfile(stats, guild_stats, version)
+
+    async def aggregates(self) -> Optional[GameAggregates]:
+        """Contadores agregados das partidas (mantidos só pelo shard global)."""
+        return (await self._shard(None)).aggregates
+
+    async def kill_rivals(self, player_id: str) -> Tuple[Optional[KillRival], Optional[KillRival]]:
+        """(vítima preferida, nêmesis) do jogador no grafo de abates, com os nomes atuais do ranking."""
+        rivals = await self.shards.kill_rivals(player_id)
+        view = self.shards.global_cache.read()
+        return tuple(rival._replace(name=view[rival.player_id]["nome_jogador"] if rival.player_id in view else "Jogador Desconhecido")
+                     if rival else None for rival in rivals)
+
+    async def history(self, player_id: str, limit: int, before: Optional[HistoryCursor] = None) -> List[HistoryEntry]:
+        """Até limit partidas do jogador, da mais recente para a mais antiga (anteriores ao cursor, se houver)."""
+        return await self.shards.history(player_id, limit, before)
+
+    async def players_chunk(self, guild_id: Optional[int], after_id: Optional[str], size: int) -> Chunk:
+        """
+        Até size jogadores do banco do shard com id maior que after_id. No primeiro bloco (after_id None)
+        as alterações em memória são gravadas antes, para a leitura refletir o ranking atual.
+        """
+        cache = await self._shard(guild_id)
+        if after_id is None:
+            await cache.flush()
+        return await asyncio.get_running_loop().run_in_executor(self.shards.executor, cache.store.players_page, after_id, size)
+
+    def iter_players(self, guild_id: Optional[int], chunk_size: int) -> AsyncIterator[Chunk]:
+        """Todos os jogadores do shard, em blocos lidos do banco sob demanda (para exportação)."""
+        return iter_chunks(lambda after_id: self.players_chunk(guild_id, after_id, chunk_size))
@@ -0,0 +1,347 @@
+# stats/cache.py
+
+import os
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Dict, List, Any, Optional, Set, Iterable, Callable, Tuple
+
+from .store import RankingStore
+from .leaderboard import Leaderboards
+from .aggregates import GameAggregates
+from .kill_graph import KillGraph
+from .history import GameHistory, HistoryEntry
+from .read_view import RankingReadView
+from . import snapshot
+
+logger = logging.getLogger(__name__)
+
+# Reaplica o log de partidas sobre um ranking: (jogadores, offset inicial, agregados, grafo de abates e histórico, ou None)
+# -> (ids alterados, offset final)
+ReplayFunc = Callable[[Dict[str, Dict[str, Any]], int, Optional[GameAggregates], Optional[KillGraph], Optional[GameHistory]], Tuple[Set[str], int]]
+# Alterações retiradas da fila para uma gravação: (jogadores, contadores agregados, incrementos de abates, entradas do histórico, offset do log)
+PendingWrite = Tuple[Dict[str, Dict[str, Any]], Dict[Tuple[str, str, str], Tuple[int, int]], Dict[Tuple[str, str, str], int],
+                     List[Tuple[str, HistoryEntry]], int]
+LoadedState = Tuple[Dict[str, Dict[str, Any]], Optional[GameAggregates], Optional[KillGraph], Optional[GameHistory], int, Set[str], int]
+
+
+# Quantidade de camadas da visão de leitura antes de fundi-las em uma nova base
+_MAX_READ_LAYERS = 32
+
+
+def copy_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Copia as estatísticas de um jogador sem compartilhar listas/dicionários internos com o original."""
+    return {**stats, "vitorias_por_papel": dict(stats.get("vitorias_por_papel", {})), "medalhas": list(stats.get("medalhas", []))}
+
+
+class RankingCache:
+    """
+    Cópia autoritativa do ranking em memória, com gravação adiada (write-behind).
+    O ranking é lido do banco uma única vez; as alterações só marcam os jogadores
+    como "sujos" e são gravadas em lote, por tempo ou após N atualizações.
+    Várias partidas terminando ao mesmo tempo acabam na mesma transação.
+    Os placares (Leaderboards) são atualizados junto com cada alteração.
+
+    Cada gravação também registra até que ponto do log de partidas (GameLog) o banco está
+    atualizado (checkpoint "log_offset"). Assim a gravação em lote funciona como a compactação
+    do log: ao carregar, basta reaplicar as partidas registradas depois do checkpoint (replay).
+
+    Com um executor, toda a E/S (leitura, replay, serialização e gravação) roda fora do event loop.
+
+    Os registros dos jogadores são copy-on-write: quem altera um jogador chama edit() antes, que
+    troca o registro por uma cópia, e commit() publica uma nova visão imutável (RankingReadView).
+    Assim as leituras (read()) e a gravação em lote usam os registros publicados sem lock e sem
+    copiar nada, e nunca veem um jogador alterado pela metade.
+
+    Com snapshot_path, o ranking completo é salvo no formato binário (stats.snapshot) ao desligar,
+    e a próxima carga a frio lê esse arquivo em vez do banco. O snapshot só é usado se o seu token
+    for igual ao registrado no banco; toda gravação em lote apaga o token, invalidando-o.
+
+    Com with_aggregates, o cache também mantém os contadores agregados das partidas (stats.aggregates),
+    o grafo de abates (stats.kill_graph) e o histórico de partidas de cada jogador (stats.history, com
+    anéis de history_ring_size partidas), reaplicados e gravados junto com os jogadores e o checkpoint do log.
+    """
+    def __init__(self, store: RankingStore, leaderboards: Leaderboards, flush_interval: float = 30.0, flush_threshold: int = 20,
+                 replay: Optional[ReplayFunc] = None, executor: Optional[Executor] = None, snapshot_path: Optional[str] = None,
+                 with_aggregates: bool = False, history_ring_size: int = 20):
+        self.store = store
+        self.leaderboards = leaderboards
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.replay = replay
+        self.executor = executor
+        self.snapshot_path = snapshot_path
+        self.with_aggregates = with_aggregates
+        self.history_ring_size = history_ring_size
+        self.players: Dict[str, Dict[str, Any]] = {}
+        self.aggregates: Optional[GameAggregates] = None
+        self.kill_graph: Optional[KillGraph] = None
+        self.history: Optional[GameHistory] = None
+        self._read_view = RankingReadView(0, {})
+        self._compact_task: Optional[asyncio.Task] = None
+        # Versão das estatísticas de cada jogador (aumenta a cada commit; ausente = 0)
+        self._versions: Dict[str, int] = {}
+        # Offset do log de partidas já aplicado em memória / já gravado no banco
+        self.applied_offset = 0
+        # Até onde o replay da carga leu o log: as partidas até ali já estavam em memória ao carregar
+        self.loaded_offset = 0
+        self._saved_offset = 0
+        self.lock = asyncio.Lock()
+        self._dirty: Set[str] = set()
+        self._pending_updates = 0
+        self._loaded = False
+        self._load_task: Optional[asyncio.Future] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_requested: Optional[asyncio.Event] = None
+
+    async def _run_io(self, func: Callable, *args):
+        """Executa func no executor de E/S (ou diretamente, se não houver executor)."""
+        if self.executor is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    # --- Ciclo de vida ---
+
+    def _read_snapshot(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Lê o snapshot binário se ele corresponder ao estado atual do banco; caso contrário retorna None."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            token, _ = snapshot.read_file_header(self.snapshot_path)
+            if token.hex() != self.store.get_meta("snapshot_token"):
+                logger.info(f"Snapshot {self.snapshot_path} desatualizado; carregando do banco.")
+                return None
+            players, _, _ = snapshot.read_file(self.snapshot_path)
+        except (snapshot.SnapshotError, OSError) as e:
+            logger.warning(f"Snapshot {self.snapshot_path} ignorado: {e}")
+            return None
+        logger.info(f"Ranking carregado do snapshot {self.snapshot_path}.")
+        return players
+
+    def _read_state(self) -> LoadedState:
+        """Lê o snapshot (ou o banco), reaplica o log e monta os placares. Não toca no estado publicado."""
+        players = self._read_snapshot()
+        if players is None:
+            players = self.store.load_all()
+        aggregates = GameAggregates(self.store.load_aggregates()) if self.with_aggregates else None
+        # O grafo de abates fica no banco; em memória só os incrementos das partidas reaplicadas
+        kill_graph = KillGraph() if self.with_aggregates else None
+        history = GameHistory(self.history_ring_size) if self.with_aggregates else None
+        saved_offset = int(self.store.get_meta("log_offset") or 0)
+        changed, applied_offset = self.replay(players, saved_offset, aggregates, kill_graph, history) if self.replay else (set(), saved_offset)
+        self.leaderboards.rebuild(players)
+        return players, aggregates, kill_graph, history, saved_offset, changed, applied_offset
+
+    def _install_state(self, state: LoadedState):
+        self.players, self.aggregates, self.kill_graph, self.history, self._saved_offset, changed, self.applied_offset = state
+        self.loaded_offset = self.applied_offset
+        self._read_view = RankingReadView(self._read_view.version + 1, dict(self.players))
+        self._dirty.update(changed)
+        self._loaded = True
+        logger.info(f"Ranking carregado em memória: {len(self.players)} jogadores.")
+        if changed and self._flush_requested:
+            self._flush_requested.set()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self):
+        """Carrega o ranking de forma síncrona (scripts e desligamento; no bot use ensure_loaded)."""
+        if not self._loaded:
+            self._install_state(self._read_state())
+
+    async def ensure_loaded(self):
+        """Carrega o ranking fora do event loop na primeira chamada; chamadas simultâneas aguardam a mesma carga."""
+        if self._loaded:
+            return
+        if self._load_task is None or (self._load_task.done() and self._load_task.exception()):
+            self._load_task = asyncio.ensure_future(self._run_io(self._read_state))
+        state = await asyncio.shield(self._load_task)
+        if not self._loaded:
+            self._install_state(state)
+
+    async def start(self):
+        """Carrega o ranking e inicia a tarefa de gravação periódica."""
+        await self.ensure_loaded()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_requested = asyncio.Event()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def close(self):
+        """Para a tarefa periódica, grava o que estiver pendente e salva o snapshot binário."""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        self.flush_sync()
+        self.save_snapshot_sync()
+
+    def save_snapshot_sync(self):
+        """Salva o ranking completo no snapshot binário e registra seu token no banco."""
+        if not self.snapshot_path or not self._loaded or self.has_pending:
+            return
+        token = os.urandom(16)
+        try:
+            snapshot.write_file(self.snapshot_path, self.players, self._saved_offset, token)
+            self.store.set_meta("snapshot_token", token.hex())
+        except (snapshot.SnapshotError, OSError) as e:
+            logger.warning(f"Não foi possível salvar o snapshot {self.snapshot_path}: {e}")
+            return
+        logger.info(f"Snapshot do ranking salvo em {self.snapshot_path} ({len(self.players)} jogadores).")
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Erro ao gravar o ranking em lote: {e}")
+
+    # --- Leitura e escrita em memória ---
+
+    def get(self, player_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retorna o registro atual de um jogador. O ranking precisa estar carregado (ensure_loaded).
+        Para alterar o registro, chame edit() antes; para só ler, prefira read().
+        """
+        return self.players.get(player_id)
+
+    def read(self) -> RankingReadView:
+        """Visão imutável do ranking no último commit. Não bloqueia e não é afetada por alterações posteriores."""
+        return self._read_view
+
+    def edit(self, player_ids: Iterable[str]):
+        """Troca os registros dos jogadores por cópias, que podem ser alteradas sem afetar as leituras em andamento."""
+        for player_id in player_ids:
+            if (stats := self.players.get(player_id)) is not None:
+                self.players[player_id] = copy_stats(stats)
+
+    def replace(self, players: Dict[str, Dict[str, Any]]):
+        """Substitui jogadores inteiros (por cópias dos registros informados) e registra a alteração."""
+        self.players.update({player_id: copy_stats(stats) for player_id, stats in players.items()})
+        self.commit(players.keys())
+
+    def commit(self, player_ids: Iterable[str], log_offset: Optional[int] = None):
+        """
+        Registra que os jogadores informados foram alterados em memória: publica a nova visão de leitura,
+        reposiciona-os nos placares, marca-os para gravação e agenda a gravação se o limite for atingido.
+        log_offset indica até onde o log de partidas já foi aplicado com esta alteração.
+        """
+        if log_offset is not None:
+            self.applied_offset = max(self.applied_offset, log_offset)
+        player_ids = set(player_ids)
+        changes = {}
+        for player_id in player_ids:
+            self._versions[player_id] = self._versions.get(player_id, 0) + 1
+            if (stats := self.players.get(player_id)) is not None:
+                self.leaderboards.update(player_id, stats)
+                changes[player_id] = stats
+        self._read_view = self._read_view.with_changes(self._read_view.version + 1, changes)
+        if self._read_view.depth > _MAX_READ_LAYERS:
+            self._schedule_compaction()
+        self._dirty.update(player_ids)
+        self._pending_updates += 1
+        if self._pending_updates >= self.flush_threshold and self._flush_requested:
+            self._flush_requested.set()
+
+    def player_version(self, player_id: str) -> int:
+        """Versão atual das estatísticas de um jogador, para invalidar conteúdos já renderizados."""
+        return self._versions.get(player_id, 0)
+
+    def _schedule_compaction(self):
+        """Funde as camadas da visão de leitura fora do event loop (ou na hora, se não houver loop)."""
+        if self._compact_task is not None:
+            return
+        try:
+            self._compact_task = asyncio.get_running_loop().create_task(self._compact_read_view())
+        except RuntimeError:
+            folded = self._read_view
+            self._read_view = folded.rebased(folded.compacted(), folded)
+
+    async def _compact_read_view(self):
+        folded = self._read_view
+        try:
+            merged = await self._run_io(folded.compacted)
+        except Exception as e:
+            logger.warning(f"Não foi possível compactar a visão de leitura do ranking: {e}")
+            return
+        finally:
+            self._compact_task = None
+        self._read_view = self._read_view.rebased(merged, folded)
+
+    @property
+    def dirty_count(self) -> int:
+        return len(self._dirty)
+
+    @property
+    def has_pending(self) -> bool:
+        return (bool(self._dirty) or self.applied_offset != self._saved_offset
+                or (self.aggregates is not None and self.aggregates.has_dirty)
+                or (self.kill_graph is not None and self.kill_graph.has_dirty)
+                or (self.history is not None and self.history.has_dirty))
+
+    # --- Gravação ---
+
+    def _take_snapshot(self) -> PendingWrite:
+        """
+        Retira os jogadores (e contadores, abates e histórico) alterados da fila, junto com o offset que eles cobrem.
+        Os registros publicados não são mais alterados (copy-on-write), então não precisam ser copiados.
+        """
+        rows = {pid: self.players[pid] for pid in self._dirty if pid in self.players}
+        self._dirty = set()
+        self._pending_updates = 0
+        aggregate_rows = self.aggregates.take_dirty() if self.aggregates is not None else {}
+        kill_increments = self.kill_graph.take_dirty() if self.kill_graph is not None else {}
+        history_entries = self.history.take_dirty() if self.history is not None else []
+        return rows, aggregate_rows, kill_increments, history_entries, self.applied_offset
+
+    def _write_rows(self, rows: Dict[str, Dict[str, Any]], aggregate_rows: Dict[Tuple[str, str, str], Tuple[int, int]],
+                    kill_increments: Dict[Tuple[str, str, str], int], history_entries: List[Tuple[str, HistoryEntry]], offset: int):
+        meta = {"log_offset": str(offset)}
+        if self.snapshot_path:
+            meta["snapshot_token"] = "" # O banco mudou: o snapshot salvo deixa de valer
+        self.store.upsert_players(rows, meta=meta, aggregates=aggregate_rows, kills=kill_increments, history=history_entries)
+        logger.info(f"Ranking gravado: {len(rows)} jogadores atualizados em uma transação (log até o offset {offset}).")
+
+    def _requeue(self, rows: Dict[str, Dict[str, Any]], aggregate_rows: Dict[Tuple[str, str, str], Tuple[int, int]],
+                 kill_increments: Dict[Tuple[str, str, str], int], history_entries: List[Tuple[str, HistoryEntry]]):
+        """Devolve à fila o que não pôde ser gravado, para a próxima tentativa."""
+        self._dirty.update(rows)
+        if self.aggregates is not None:
+            self.aggregates.mark_dirty(aggregate_rows)
+        if self.kill_graph is not None:
+            self.kill_graph.requeue(kill_increments)
+        if self.history is not None:
+            self.history.requeue(history_entries)
+
+    async def flush(self):
+        """Grava em uma única transação, fora do event loop, todos os jogadores alterados desde a última gravação."""
+        async with self.lock:
+            if not self.has_pending:
+                return
+            pending = self._take_snapshot()
+            try:
+                await self._run_io(self._write_rows, *pending)
+            except BaseException:
+                # Se a gravação falhar, os jogadores voltam para a fila da próxima tentativa.
+                self._requeue(*pending[:-1])
+                raise
+            self._saved_offset = pending[-1]
+
+    def flush_sync(self):
+        """Versão síncrona da gravação, usada no desligamento do processo."""
+        if not self.has_pending:
+            return
+        pending = self._take_snapshot()
+        try:
+            self._write_rows(*pending)
+        except Exception:
+            self._requeue(*pending[:-1])
+            raise
+        self._saved_offset = pending[-1]
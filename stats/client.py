@@ -0,0 +1,246 @@
+# stats/client.py
+"""
+Cliente do serviço de ranking (stats.service), usado pelo bot quando RANKING_SERVICE_SOCKET está definido.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Hashable, Callable, Tuple, AsyncIterator
+
+from .backend import RankingUnavailableError, RankingPageData, PlayerProfile, Medals
+from .leaderboard import SortKey
+from .aggregates import GameAggregates
+from .export import Chunk, iter_chunks
+from .kill_graph import KillRival
+from .history import HistoryEntry, HistoryCursor
+from . import protocol
+
+logger = logging.getLogger(__name__)
+
+
+class RankingServiceError(RankingUnavailableError):
+    """O serviço de ranking recebeu o pedido, mas não conseguiu atendê-lo."""
+
+
+class RankingServiceClient:
+    """
+    Conexão com o serviço de ranking. Os pedidos são multiplexados em um único socket
+    (cada resposta volta com o id do pedido) e a conexão é refeita no pedido seguinte se cair.
+    """
+    def __init__(self, socket_path: str, timeout: float = 10.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+
+    async def _connection(self) -> asyncio.StreamWriter:
+        if self._writer is not None and not self._writer.is_closing():
+            return self._writer
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is None or self._writer.is_closing():
+                reader, self._writer = await asyncio.open_unix_connection(self.socket_path, limit=protocol.MAX_LINE)
+                self._reader_task = asyncio.create_task(self._read_responses(reader))
+                logger.info(f"Conectado ao serviço de ranking em {self.socket_path}.")
+        return self._writer
+
+    async def request(self, op: str, **args) -> Any:
+        """Envia um pedido e aguarda a resposta. Falhas de conexão e erros do serviço viram RankingUnavailableError."""
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            writer = await self._connection()
+            writer.write(protocol.encode({"id": request_id, "op": op, "args": args}))
+            await writer.drain()
+            return await asyncio.wait_for(future, self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise RankingUnavailableError(f"Serviço de ranking indisponível ({self.socket_path}): {e}") from e
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_responses(self, reader: asyncio.StreamReader):
+        error: Exception = ConnectionResetError("O serviço de ranking encerrou a conexão.")
+        try:
+            while line := await reader.readline():
+                message = protocol.decode(line)
+                future = self._pending.get(message.get("id"))
+                if future is None or future.done():
+                    continue # Pedido que já expirou
+                if message.get("ok"):
+                    future.set_result(message.get("result"))
+                else:
+                    future.set_exception(RankingServiceError(message.get("erro", "erro desconhecido")))
+        except (OSError, ValueError, asyncio.LimitOverrunError) as e:
+            error = ConnectionResetError(f"Resposta inválida do serviço de ranking: {e}")
+        finally:
+            self._drop_connection(error)
+
+    def _drop_connection(self, error: Exception):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    def close(self):
+        if self._reader_task and not self._reader_task.done():
+            self._reader_task.cancel()
+        self._reader_task = None
+        self._drop_connection(ConnectionResetError("Cliente do ranking encerrado."))
+
+
+class RemoteRankingBackend:
+    """
+    Backend do ranking (mesma interface de stats.backend.LocalRankingBackend) que delega ao serviço de ranking.
+
+    As consultas ficam em um cache local por alguns segundos, então comandos repetidos não atravessam o socket;
+    uma partida enviada por este processo descarta o cache na hora (as de outros processos aparecem quando ele expira).
+    As partidas terminadas no mesmo instante vão em um único lote; se o serviço estiver fora do ar, ficam
+    guardadas em memória e são reenviadas, na ordem, até serem aceitas.
+    """
+    def __init__(self, socket_path: str, cache_seconds: float = 5.0, timeout: float = 10.0,
+                 retry_interval: float = 5.0, max_cached: int = 1024):
+        self.client = RankingServiceClient(socket_path, timeout)
+        self.cache_seconds = cache_seconds
+        self.retry_interval = retry_interval
+        self.max_cached = max_cached
+        self._cache: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._generation = 0 # Aumenta a cada partida enviada: respostas pedidas antes disso não entram no cache
+        self._outbox: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._outbox_task: Optional[asyncio.Task] = None
+        self._unsent: List[Dict[str, Any]] = []
+        self._retry_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        try:
+            await self.client.request("ping")
+        except RankingUnavailableError as e:
+            # Não impede o bot de subir: o serviço pode ser iniciado depois.
+            logger.warning(f"{e}. As consultas ao ranking vão falhar até o serviço responder.")
+
+    def flush_sync(self):
+        pass # Quem grava os bancos é o serviço.
+
+    def close(self):
+        for task in (self._outbox_task, self._retry_task):
+            if task and not task.done():
+                task.cancel()
+        unsent = self._unsent + [record for record, _ in self._outbox]
+        if unsent:
+            # Último recurso: as partidas ficam no log do bot para serem reaplicadas manualmente.
+            logger.error(f"{len(unsent)} partidas não foram entregues ao serviço de ranking: "
+                         f"{json.dumps(unsent, ensure_ascii=False, separators=(',', ':'))}")
+        self._unsent = []
+        self._outbox = []
+        self.client.close()
+
+    async def _cached(self, key: Hashable, op: str, convert: Callable[[Any], Any], **args) -> Any:
+        """Resultado (já convertido) de uma consulta, reaproveitado por cache_seconds."""
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > now:
+            self._cache.move_to_end(key)
+            return entry[1]
+        generation = self._generation
+        value = convert(await self.client.request(op, **args))
+        if generation != self._generation:
+            return value
+        self._cache[key] = (now + self.cache_seconds, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return value
+
+    # --- Escrita ---
+
+    async def _deliver(self, records: List[Dict[str, Any]]) -> Optional[List[Medals]]:
+        """Envia as partidas pendentes e as novas em um único lote. Retorna as medalhas das novas, ou None se falhar."""
+        batch = self._unsent + records
+        self._unsent = []
+        if not batch:
+            return []
+        try:
+            awarded = await self.client.request("record_games", records=batch)
+        except RankingUnavailableError as e:
+            logger.error(f"Não foi possível enviar {len(batch)} partidas ao serviço de ranking: {e}. Nova tentativa em {self.retry_interval}s.")
+            self._unsent = batch + self._unsent
+            if self._retry_task is None or self._retry_task.done():
+                self._retry_task = asyncio.create_task(self._retry_unsent())
+            return None
+        self._generation += 1
+        self._cache.clear()
+        return [[tuple(medal) for medal in medals] for medals in awarded[len(batch) - len(records):]]
+
+    async def _retry_unsent(self):
+        while self._unsent:
+            await asyncio.sleep(self.retry_interval)
+            count = len(self._unsent)
+            if await self._deliver([]) is not None:
+                logger.info(f"{count} partidas pendentes entregues ao serviço de ranking.")
+
+    async def record_games(self, records: List[Dict[str, Any]]) -> List[Medals]:
+        """Envia as partidas ao serviço. Se ele estiver fora do ar, elas são reenviadas depois (sem anunciar medalhas)."""
+        awarded = await self._deliver(list(records))
+        return awarded if awarded is not None else [[] for _ in records]
+
+    async def record_game(self, record: Dict[str, Any]) -> Medals:
+        """Entra no próximo lote: partidas que terminam no mesmo ciclo do event loop vão juntas."""
+        future = asyncio.get_running_loop().create_future()
+        self._outbox.append((record, future))
+        if self._outbox_task is None or self._outbox_task.done():
+            self._outbox_task = asyncio.create_task(self._send_outbox())
+        return await future
+
+    async def _send_outbox(self):
+        batch, self._outbox = self._outbox, []
+        try:
+            awarded = await self.record_games([record for record, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            raise
+        for (_, future), medals in zip(batch, awarded):
+            if not future.done():
+                future.set_result(medals)
+
+    # --- Consultas ---
+
+    async def leaderboard_page(self, guild_id: Optional[int], sort_key: str, size: int, start: int = 0,
+                               after: Optional[SortKey] = None, before: Optional[SortKey] = None,
+                               around: Optional[str] = None) -> Optional[RankingPageData]:
+        args = {"guild_id": guild_id, "sort_key": sort_key, "size": size, "start": start,
+                "after": after, "before": before, "around": around}
+        return await self._cached(("leaderboard_page", *args.values()), "leaderboard_page", protocol.page_data_from_dict, **args)
+
+    async def profile(self, player_id: str, guild_id: Optional[int]) -> Optional[PlayerProfile]:
+        return await self._cached(("profile", player_id, guild_id), "profile", protocol.profile_from_dict,
+                                  player_id=player_id, guild_id=guild_id)
+
+    async def aggregates(self) -> Optional[GameAggregates]:
+        return await self._cached(("aggregates",), "aggregates", protocol.aggregates_from_list)
+
+    async def kill_rivals(self, player_id: str) -> Tuple[Optional[KillRival], Optional[KillRival]]:
+        return await self._cached(("kill_rivals", player_id), "kill_rivals", protocol.rivals_from_list, player_id=player_id)
+
+    async def history(self, player_id: str, limit: int, before: Optional[HistoryCursor] = None) -> List[HistoryEntry]:
+        return await self._cached(("history", player_id, limit, before), "history", protocol.history_from_list,
+                                  player_id=player_id, limit=limit, before=before)
+
+    async def players_chunk(self, guild_id: Optional[int], after_id: Optional[str], size: int) -> Chunk:
+        # Sem cache: cada bloco é lido uma única vez, pela exportação.
+        chunk = await self.client.request("players_chunk", guild_id=guild_id, after_id=after_id, size=size)
+        return [(player_id, stats) for player_id, stats in chunk]
+
+    def iter_players(self, guild_id: Optional[int], chunk_size: int) -> AsyncIterator[Chunk]:
+        return iter_chunks(lambda after_id: self.players_chunk(guild_id, after_id, chunk_size))
@@ -0,0 +1,108 @@
+# stats/export.py
+"""
+Exportação do ranking em CSV ou JSON Lines, compactada com gzip.
+
+Os jogadores são lidos do banco em blocos (paginação por id) e cada bloco é convertido,
+compactado e gravado antes do próximo ser lido: a memória usada não depende do tamanho do ranking.
+
+Uso (também funciona com o bot ligado, graças ao modo WAL; alterações ainda não gravadas ficam de fora):
+    python -m stats.export [--formato csv|jsonl] [--saida ranking.csv.gz] [--db data/ranking.db]
+"""
+
+import argparse
+import asyncio
+import csv
+import gzip
+import io
+import json
+import logging
+from concurrent.futures import Executor
+from typing import Dict, List, Any, Optional, Tuple, AsyncIterator, Callable, Awaitable, BinaryIO
+
+import config
+from .store import RankingStore
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl")
+CSV_COLUMNS = ["user_id", "nome_jogador", "partidas_jogadas", "vitorias_totais", "rating", "vitorias_por_papel", "medalhas"]
+
+Chunk = List[Tuple[str, Dict[str, Any]]] # [(id do jogador, estatísticas)]
+
+
+async def iter_chunks(fetch: Callable[[Optional[str]], Awaitable[Chunk]]) -> AsyncIterator[Chunk]:
+    """Percorre o ranking em blocos: fetch(após_id) retorna os jogadores seguintes, em ordem de id (vazio no fim)."""
+    after_id = None
+    while chunk := await fetch(after_id):
+        yield chunk
+        after_id = chunk[-1][0]
+
+
+def encode_chunk(chunk: Chunk, fmt: str, header: bool = False) -> bytes:
+    """Converte um bloco de jogadores em linhas de CSV ou JSON Lines."""
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.writer(buffer)
+        if header:
+            writer.writerow(CSV_COLUMNS)
+        for player_id, stats in chunk:
+            writer.writerow([
+                player_id, stats.get("nome_jogador", ""), stats.get("partidas_jogadas", 0), stats.get("vitorias_totais", 0),
+                round(stats.get("rating", 0.0), 2),
+                json.dumps(stats.get("vitorias_por_papel", {}), ensure_ascii=False, separators=(",", ":")),
+                "; ".join(stats.get("medalhas", [])),
+            ])
+    else:
+        for player_id, stats in chunk:
+            buffer.write(json.dumps({"user_id": player_id, **stats}, ensure_ascii=False, separators=(",", ":")))
+            buffer.write("\n")
+    return buffer.getvalue().encode("utf-8")
+
+
+async def write_export(chunks: AsyncIterator[Chunk], fileobj: BinaryIO, fmt: str, executor: Optional[Executor] = None) -> int:
+    """
+    Grava os blocos em fileobj, compactados com gzip. A compactação e a escrita rodam no executor
+    (fora do event loop), um bloco por vez. Retorna a quantidade de jogadores exportados.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato de exportação desconhecido: {fmt}")
+    loop = asyncio.get_running_loop()
+    exported = 0
+    with gzip.GzipFile(fileobj=fileobj, mode="wb") as compressed:
+        async for chunk in chunks:
+            await loop.run_in_executor(executor, compressed.write, encode_chunk(chunk, fmt, header=exported == 0))
+            exported += len(chunk)
+        if exported == 0 and fmt == "csv":
+            compressed.write(encode_chunk([], fmt, header=True))
+    return exported
+
+
+async def export_store(store: RankingStore, fileobj: BinaryIO, fmt: str, chunk_size: int) -> int:
+    """Exporta direto de um banco do ranking (usado pela linha de comando)."""
+    loop = asyncio.get_running_loop()
+    chunks = iter_chunks(lambda after_id: loop.run_in_executor(None, store.players_page, after_id, chunk_size))
+    return await write_export(chunks, fileobj, fmt)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta o ranking em CSV ou JSON Lines compactado (gzip).")
+    parser.add_argument("--formato", choices=FORMATS, default="csv")
+    parser.add_argument("--saida", help="Arquivo de saída (padrão: ranking.<formato>.gz).")
+    parser.add_argument("--db", default=config.RANKING_DB_FILE, help="Banco do ranking (global ou de um servidor).")
+    parser.add_argument("--bloco", type=int, default=config.RANKING_EXPORT_CHUNK_SIZE, help="Jogadores lidos por vez.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s: %(message)s')
+    output = args.saida or f"ranking.{args.formato}.gz"
+    # Sem legacy_json_path: a exportação nunca dispara a migração do ranking.json antigo.
+    store = RankingStore(args.db)
+    try:
+        with open(output, "wb") as f:
+            exported = asyncio.run(export_store(store, f, args.formato, max(1, args.bloco)))
+    finally:
+        store.close()
+    logger.info(f"{exported} jogadores exportados para {output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# stats/game_log.py
+
+import json
+import os
+import logging
+from typing import Dict, Any, Iterator, Optional, Tuple, List
+
+logger = logging.getLogger(__name__)
+
+# Versão do formato dos registros de partida
+RECORD_VERSION = 1
+
+# Ordem dos campos de cada jogador em record["p"]
+PLAYER_FIELDS = ("id", "nome", "papel", "faccao", "venceu", "vivo")
+
+
+def record_participants(record: Dict[str, Any]) -> List[Tuple[str, str, Optional[str], bool, Optional[str], bool]]:
+    """Converte os jogadores de um registro no formato aceito por apply_game_result."""
+    return [(str(player_id), name, role_name, bool(won), faction, bool(alive)) for player_id, name, role_name, faction, won, alive in record["p"]]
+
+
+def _committed_end(f, size: int) -> int:
+    """Offset logo após o último '\\n' de um arquivo aberto em modo binário (lido de trás para frente, em blocos)."""
+    end = size
+    while end > 0:
+        start = max(0, end - 65536)
+        f.seek(start)
+        newline = f.read(end - start).rfind(b"\n")
+        if newline != -1:
+            return start + newline + 1
+        end = start
+    return 0
+
+
+class GameLog:
+    """
+    Log de resultados de partidas, somente de acréscimo (uma linha JSON compacta por partida).
+    Registrar uma partida custa um append, independentemente do tamanho do ranking.
+    As posições (offsets) em bytes servem de checkpoint para saber o que já foi aplicado ao ranking.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._discard_partial_tail()
+            self._file = open(self.path, "ab")
+        return self._file
+
+    def _discard_partial_tail(self):
+        """
+        Corta uma linha incompleta no fim do log (queda no meio de um append) de volta até o último '\\n'.
+        Sem isso, o próximo registro seria colado ao fragmento e se perderia como JSON inválido na releitura.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            cut = _committed_end(f, size)
+            if cut == size:
+                return
+            logger.warning(f"Registro incompleto no fim de {self.path} (offset {cut}, {size - cut} bytes) descartado antes de acrescentar.")
+            f.truncate(cut)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Acrescenta um registro e retorna o offset logo após ele (o novo checkpoint)."""
+        f = self._open()
+        f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+    def size(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def committed_size(self) -> int:
+        """Offset logo após o último registro completo (sem uma eventual linha incompleta no fim)."""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "rb") as f:
+            return _committed_end(f, f.seek(0, os.SEEK_END))
+
+    def read_from(self, offset: int = 0, end: Optional[int] = None) -> Iterator[Tuple[Dict[str, Any], int]]:
+        """Lê os registros a partir de offset, retornando (registro, offset após o registro)."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            position = offset
+            for line in f:
+                if end is not None and position >= end:
+                    break
+                position += len(line)
+                if not line.endswith(b"\n"):
+                    # Linha incompleta (queda durante a escrita): ignoramos, ela nunca foi confirmada.
+                    logger.warning(f"Registro incompleto no fim de {self.path} (offset {position - len(line)}), ignorado.")
+                    break
+                try:
+                    yield json.loads(line), position
+                except json.JSONDecodeError as e:
+                    logger.error(f"Registro inválido em {self.path} (offset {position - len(line)}): {e}")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,98 @@
+# stats/history.py
+"""
+Histórico de partidas de cada jogador (papel, facção, resultado, noites e data), para o /historico.
+
+No banco do ranking global, a tabela historico tem chave primária (user_id, jogado_em, partida):
+as partidas de um jogador ficam juntas e em ordem de data, então as N mais recentes (ou as N
+anteriores a um cursor) saem de uma única busca no índice, O(log n + N), sem varrer o histórico geral.
+
+Em memória ficam as entradas ainda não gravadas e, para os jogadores consultados recentemente,
+um anel com as suas últimas partidas: a primeira página do /historico não precisa ir ao banco.
+"""
+
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Optional, Tuple, Iterator, NamedTuple, Deque
+
+# Jogadores com o anel de partidas recentes em memória (os menos consultados saem primeiro)
+MAX_CACHED_PLAYERS = 4096
+
+HistoryCursor = Tuple[int, str] # (jogado_em, id da partida) da entrada mais antiga já exibida
+
+
+class HistoryEntry(NamedTuple):
+    """Uma partida do histórico de um jogador."""
+    played_at: int # Timestamp do fim da partida
+    game_id: str
+    guild_id: Optional[int]
+    role: Optional[str]
+    faction: Optional[str]
+    won: bool
+    nights: int
+    players: int
+
+    @property
+    def cursor(self) -> HistoryCursor:
+        return (self.played_at, self.game_id)
+
+
+def game_history_entries(record: Dict[str, Any]) -> Iterator[Tuple[str, HistoryEntry]]:
+    """Entradas de uma partida do log, uma por jogador: (id do jogador, entrada)."""
+    players = record["p"]
+    for player_id, _, role, faction, won, _ in players:
+        yield str(player_id), HistoryEntry(record["t"], record["id"], record.get("g"), role, faction, bool(won), record.get("n", 0), len(players))
+
+
+def newest_first(entries: List[HistoryEntry]) -> List[HistoryEntry]:
+    return sorted(entries, key=lambda entry: entry.cursor, reverse=True)
+
+
+class GameHistory:
+    """Entradas do histórico ainda não gravadas e anéis com as últimas partidas dos jogadores consultados."""
+    def __init__(self, ring_size: int):
+        self.ring_size = ring_size
+        self._pending: List[Tuple[str, HistoryEntry]] = []
+        self._rings: "OrderedDict[str, Deque[HistoryEntry]]" = OrderedDict()
+        # Aumenta a cada partida aplicada: um anel lido do banco antes disso pode estar incompleto
+        self.generation = 0
+
+    def apply(self, record: Dict[str, Any]):
+        """Registra uma partida para cada participante. O(jogadores da partida)."""
+        for player_id, entry in game_history_entries(record):
+            self._pending.append((player_id, entry))
+            if (ring := self._rings.get(player_id)) is not None:
+                ring.appendleft(entry) # O anel guarda a mais nova à esquerda e descarta a mais antiga
+        self.generation += 1
+
+    # --- Consulta ---
+
+    def recent(self, player_id: str, limit: int) -> Optional[List[HistoryEntry]]:
+        """As últimas partidas do jogador a partir do anel, ou None se o anel não estiver em memória."""
+        ring = self._rings.get(player_id)
+        if ring is None or limit > self.ring_size:
+            return None
+        self._rings.move_to_end(player_id)
+        return list(ring)[:limit]
+
+    def fill_ring(self, player_id: str, newest: List[HistoryEntry]):
+        """Guarda as últimas partidas do jogador (as ring_size mais recentes, da mais nova para a mais antiga)."""
+        self._rings[player_id] = deque(newest[:self.ring_size], maxlen=self.ring_size)
+        self._rings.move_to_end(player_id)
+        while len(self._rings) > MAX_CACHED_PLAYERS:
+            self._rings.popitem(last=False)
+
+    def pending_entries(self, player_id: str, before: Optional[HistoryCursor] = None) -> List[HistoryEntry]:
+        """Entradas ainda não gravadas do jogador (anteriores ao cursor, se houver)."""
+        return [entry for pid, entry in self._pending if pid == player_id and (before is None or entry.cursor < before)]
+
+    # --- Gravação ---
+
+    @property
+    def has_dirty(self) -> bool:
+        return bool(self._pending)
+
+    def take_dirty(self) -> List[Tuple[str, HistoryEntry]]:
+        pending, self._pending = self._pending, []
+        return pending
+
+    def requeue(self, entries: List[Tuple[str, HistoryEntry]]):
+        self._pending = entries + self._pending
@@ -0,0 +1,93 @@
+# stats/kill_graph.py
+"""
+Grafo de abates: quantas vezes cada jogador eliminou cada outro, separado por motivo.
+
+O grafo fica no banco do ranking global (tabela abates), em forma de lista de adjacência:
+a chave primária (assassino, vítima, motivo) agrupa as arestas de saída de cada jogador e um
+índice por vítima agrupa as de entrada. Consultar o nêmesis ou a vítima preferida de um jogador
+custa O(grau) e acrescentar uma partida custa O(mortes): em memória ficam só os incrementos
+ainda não gravados, que vão para o banco junto com a gravação em lote do ranking.
+"""
+
+from typing import Dict, List, Any, Optional, Tuple, Iterable, NamedTuple
+
+# Motivos de morte registrados no jogo -> motivo no grafo. Mortes sem responsável direto
+# (coração partido, maldição, sacrifício do guarda-costas) ficam de fora.
+KILL_REASONS = {
+    "villain": "vilao",
+    "witch": "bruxa",
+    "shot_by_sheriff": "xerife",
+    "shot_by_sheriff_showdown": "xerife",
+    "killed_by_plague": "praga",
+    "lynched": "linchamento",
+}
+
+EdgeKey = Tuple[str, str, str] # (assassino, vítima, motivo)
+
+
+class KillRival(NamedTuple):
+    """O jogador que mais eliminou (ou foi eliminado por) alguém."""
+    player_id: str
+    total: int
+    by_reason: Dict[str, int]
+    name: str = "" # Preenchido por quem consulta, a partir do ranking
+
+
+def game_kill_edges(record: Dict[str, Any]) -> List[EdgeKey]:
+    """Arestas de uma partida, a partir das mortes registradas ([noite, vítima, motivo, assassino(s)])."""
+    edges: List[EdgeKey] = []
+    for _, victim_id, reason, killer in record.get("m", []):
+        category = KILL_REASONS.get(reason)
+        if category is None or killer is None:
+            continue
+        # Ataques em grupo (vilões, linchamento) registram todos os responsáveis
+        for killer_id in (killer if isinstance(killer, list) else [killer]):
+            if killer_id != victim_id:
+                edges.append((str(killer_id), str(victim_id), category))
+    return edges
+
+
+def top_rival(edges: Iterable[Tuple[str, str, int]]) -> Optional[KillRival]:
+    """Soma as arestas (outro jogador, motivo, quantidade) por jogador e retorna o de maior total."""
+    by_player: Dict[str, Dict[str, int]] = {}
+    for other_id, reason, count in edges:
+        reasons = by_player.setdefault(other_id, {})
+        reasons[reason] = reasons.get(reason, 0) + count
+    if not by_player:
+        return None
+    # Empate: o de menor id, para o resultado não depender da ordem de leitura
+    player_id, reasons = min(by_player.items(), key=lambda item: (-sum(item[1].values()), item[0]))
+    return KillRival(player_id, sum(reasons.values()), reasons)
+
+
+class KillGraph:
+    """Incrementos do grafo de abates ainda não gravados no banco."""
+    def __init__(self):
+        self._pending: Dict[EdgeKey, int] = {}
+
+    def apply(self, record: Dict[str, Any]):
+        """Contabiliza as mortes de uma partida. O(mortes)."""
+        for edge in game_kill_edges(record):
+            self._pending[edge] = self._pending.get(edge, 0) + 1
+
+    def pending_edges(self, player_id: str, as_victim: bool) -> List[Tuple[str, str, int]]:
+        """Incrementos pendentes de um jogador como (outro jogador, motivo, quantidade)."""
+        if as_victim:
+            return [(killer, reason, count) for (killer, victim, reason), count in self._pending.items() if victim == player_id]
+        return [(victim, reason, count) for (killer, victim, reason), count in self._pending.items() if killer == player_id]
+
+    # --- Gravação ---
+
+    @property
+    def has_dirty(self) -> bool:
+        return bool(self._pending)
+
+    def take_dirty(self) -> Dict[EdgeKey, int]:
+        """Retira os incrementos pendentes para gravação (somados ao que já está no banco)."""
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def requeue(self, increments: Dict[EdgeKey, int]):
+        """Devolve incrementos que não puderam ser gravados."""
+        for edge, count in increments.items():
+            self._pending[edge] = self._pending.get(edge, 0) + count
@@ -0,0 +1,314 @@
+# stats/leaderboard.py
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Any, Optional, Callable, Tuple, Iterator, NamedTuple
+
+from .rating import DEFAULT_RATING
+
+# Chave de ordenação de um jogador em um placar. Menor = melhor colocado.
+SortKey = Tuple
+
+
+class LeaderboardPage(NamedTuple):
+    """Uma página de um placar. As chaves do primeiro e do último jogador servem de cursor para a navegação."""
+    start: int # Posição (0 = primeiro colocado) do primeiro jogador da página
+    player_ids: List[str]
+    first_key: Optional[SortKey]
+    last_key: Optional[SortKey]
+    total: int
+
+
+class SortedKeyList:
+    """
+    Lista ordenada dividida em blocos (no estilo de uma B-tree rasa).
+    Inserir e remover custam O(log n) comparações e só movem os itens de um bloco,
+    em vez de deslocar a lista inteira como um insort em uma lista única.
+    Uma árvore de Fenwick com o tamanho dos blocos dá a posição de qualquer item
+    (e o item de qualquer posição) em O(log n), sem percorrer os blocos anteriores.
+    """
+    _LOAD = 512
+
+    def __init__(self):
+        self._blocks: List[List[SortKey]] = []
+        self._maxes: List[SortKey] = []
+        self._len = 0
+        # Árvore de Fenwick (base 1) com o tamanho de cada bloco. Vazia = precisa ser remontada.
+        self._tree: List[int] = []
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[SortKey]:
+        for block in self._blocks:
+            yield from block
+
+    def reset(self, keys: List[SortKey]):
+        """Substitui todo o conteúdo de uma vez, ordenando as chaves em O(n log n)."""
+        keys = sorted(keys)
+        self._blocks = [keys[i:i + self._LOAD] for i in range(0, len(keys), self._LOAD)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(keys)
+        self._tree = []
+
+    def add(self, key: SortKey):
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+            self._tree = []
+        else:
+            pos = bisect_left(self._maxes, key)
+            if pos == len(self._maxes):
+                pos -= 1
+                self._blocks[pos].append(key)
+                self._maxes[pos] = key
+            else:
+                insort(self._blocks[pos], key)
+            self._tree_add(pos, 1)
+            if len(self._blocks[pos]) > 2 * self._LOAD:
+                self._split(pos)
+        self._len += 1
+
+    def remove(self, key: SortKey):
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            raise ValueError(f"{key!r} não está na lista")
+        block = self._blocks[pos]
+        idx = bisect_left(block, key)
+        if idx == len(block) or block[idx] != key:
+            raise ValueError(f"{key!r} não está na lista")
+        del block[idx]
+        self._len -= 1
+        if not block:
+            del self._blocks[pos]
+            del self._maxes[pos]
+            self._tree = []
+        else:
+            self._tree_add(pos, -1)
+            if idx == len(block):
+                self._maxes[pos] = block[-1]
+
+    def _split(self, pos: int):
+        block = self._blocks[pos]
+        half = len(block) // 2
+        self._blocks[pos:pos + 1] = [block[:half], block[half:]]
+        self._maxes[pos:pos + 1] = [block[half - 1], block[-1]]
+        self._tree = []
+
+    # --- Índice posicional (árvore de Fenwick sobre o tamanho dos blocos) ---
+    # Só muda de forma quando um bloco é criado, dividido ou esvaziado; aí é remontada em O(blocos).
+
+    def _build_tree(self):
+        tree = [0] + [len(block) for block in self._blocks]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, pos: int, delta: int):
+        if not self._tree:
+            return # Será remontada com os tamanhos atuais na próxima consulta
+        i = pos + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _items_before_block(self, pos: int) -> int:
+        """Quantidade de itens nos blocos anteriores ao bloco pos."""
+        if not self._tree:
+            self._build_tree()
+        total, i = 0, pos
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """Converte uma posição global em (bloco, posição dentro do bloco). Requer 0 <= index < len."""
+        if not self._tree:
+            self._build_tree()
+        pos, step = 0, 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] <= index:
+                pos = nxt
+                index -= self._tree[nxt]
+            step >>= 1
+        return pos, index
+
+    def rank(self, key: SortKey) -> int:
+        """Quantidade de itens menores que key (a posição de key, se ela estiver na lista)."""
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._maxes):
+            return self._len
+        return self._items_before_block(pos) + bisect_left(self._blocks[pos], key)
+
+    def slice(self, start: int, count: int) -> List[SortKey]:
+        """Retorna até count itens a partir da posição start."""
+        if start < 0 or start >= self._len or count <= 0:
+            return []
+        pos, idx = self._locate(start)
+        return self._collect_forward(pos, idx, count)
+
+    def after(self, key: SortKey, count: int) -> List[SortKey]:
+        """Retorna até count itens estritamente maiores que key (key não precisa estar na lista)."""
+        pos = bisect_right(self._maxes, key)
+        if pos == len(self._maxes):
+            return []
+        return self._collect_forward(pos, bisect_right(self._blocks[pos], key), count)
+
+    def before(self, key: SortKey, count: int) -> List[SortKey]:
+        """Retorna até count itens estritamente menores que key, em ordem crescente."""
+        pos = min(bisect_left(self._maxes, key), len(self._blocks) - 1)
+        if pos < 0:
+            return []
+        result: List[SortKey] = []
+        idx = bisect_left(self._blocks[pos], key)
+        while pos >= 0 and len(result) < count:
+            block = self._blocks[pos]
+            take = min(idx, count - len(result))
+            result.extend(reversed(block[idx - take:idx]))
+            pos -= 1
+            idx = len(self._blocks[pos]) if pos >= 0 else 0
+        result.reverse()
+        return result
+
+    def _collect_forward(self, pos: int, idx: int, count: int) -> List[SortKey]:
+        result: List[SortKey] = []
+        while pos < len(self._blocks) and len(result) < count:
+            result.extend(self._blocks[pos][idx:idx + count - len(result)])
+            pos += 1
+            idx = 0
+        return result
+
+    def head(self, n: int) -> List[SortKey]:
+        """Retorna os n primeiros itens, percorrendo apenas os blocos necessários."""
+        return self._collect_forward(0, 0, n)
+
+
+class LeaderboardIndex:
+    """
+    Placar mantido incrementalmente: cada jogador alterado custa O(log n) para reposicionar.
+    A versão aumenta sempre que alguma posição muda (usada para invalidar placares já renderizados).
+    """
+    def __init__(self, key_func: Callable[[str, Dict[str, Any]], Optional[SortKey]]):
+        self._key_func = key_func
+        self._entries = SortedKeyList()
+        self._keys: Dict[str, SortKey] = {}
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def rebuild(self, players: Dict[str, Dict[str, Any]]):
+        """Monta o placar do zero a partir de todos os jogadores."""
+        self._keys = {}
+        for player_id, stats in players.items():
+            if (key := self._key_func(player_id, stats)) is not None:
+                self._keys[player_id] = key
+        self._entries.reset(list(self._keys.values()))
+        self.version += 1
+
+    def update(self, player_id: str, stats: Dict[str, Any]):
+        """Reposiciona um jogador. Jogadores sem chave (ex: poucas partidas) saem do placar."""
+        new_key = self._key_func(player_id, stats)
+        old_key = self._keys.get(player_id)
+        if old_key == new_key:
+            return
+        self.version += 1
+        if old_key is not None:
+            self._entries.remove(old_key)
+            del self._keys[player_id]
+        if new_key is not None:
+            self._entries.add(new_key)
+            self._keys[player_id] = new_key
+
+    def top(self, n: int) -> List[str]:
+        """Retorna os ids dos n primeiros colocados."""
+        return [key[-1] for key in self._entries.head(n)]
+
+    def _page(self, keys: List[SortKey]) -> LeaderboardPage:
+        start = self._entries.rank(keys[0]) if keys else 0
+        return LeaderboardPage(start, [key[-1] for key in keys], keys[0] if keys else None, keys[-1] if keys else None, len(self._entries))
+
+    def page_at(self, start: int, size: int) -> LeaderboardPage:
+        """Página que começa na posição start. O(log n + size)."""
+        return self._page(self._entries.slice(max(0, start), size))
+
+    def page_after(self, cursor: SortKey, size: int) -> LeaderboardPage:
+        """
+        Página seguinte ao cursor (a chave do último jogador exibido). Continua do ponto certo
+        mesmo que o jogador do cursor tenha mudado de posição ou saído do placar.
+        """
+        keys = self._entries.after(cursor, size)
+        return self._page(keys) if keys else self.page_at(len(self._entries) - size, size)
+
+    def page_before(self, cursor: SortKey, size: int) -> LeaderboardPage:
+        """Página anterior ao cursor (a chave do primeiro jogador exibido)."""
+        keys = self._entries.before(cursor, size)
+        return self._page(keys) if len(keys) == size else self.page_at(0, size)
+
+    def position(self, player_id: str) -> Optional[int]:
+        """Posição do jogador no placar (0 = primeiro), ou None se ele não estiver no placar. O(log n)."""
+        key = self._keys.get(player_id)
+        return self._entries.rank(key) if key is not None else None
+
+
+# --- Chaves de ordenação disponíveis ---
+# O id do jogador fica sempre por último, como desempate estável e para recuperar o jogador.
+
+def _wins_key(player_id: str, stats: Dict[str, Any]) -> SortKey:
+    return (-stats.get("vitorias_totais", 0), -stats.get("partidas_jogadas", 0), player_id)
+
+def _games_key(player_id: str, stats: Dict[str, Any]) -> SortKey:
+    return (-stats.get("partidas_jogadas", 0), -stats.get("vitorias_totais", 0), player_id)
+
+def _make_win_rate_key(min_games: int) -> Callable[[str, Dict[str, Any]], Optional[SortKey]]:
+    def _win_rate_key(player_id: str, stats: Dict[str, Any]) -> Optional[SortKey]:
+        games = stats.get("partidas_jogadas", 0)
+        if games < min_games:
+            return None
+        wins = stats.get("vitorias_totais", 0)
+        return (-(wins / games), -wins, player_id)
+    return _win_rate_key
+
+def _make_rating_key(min_games: int) -> Callable[[str, Dict[str, Any]], Optional[SortKey]]:
+    def _rating_key(player_id: str, stats: Dict[str, Any]) -> Optional[SortKey]:
+        games = stats.get("partidas_jogadas", 0)
+        if games < min_games:
+            return None
+        return (-stats.get("rating", DEFAULT_RATING), -games, player_id)
+    return _rating_key
+
+
+class Leaderboards:
+    """Conjunto dos placares do ranking, um por critério de ordenação."""
+    KEYS = ("vitorias", "taxa", "partidas", "rating")
+
+    def __init__(self, min_games_for_win_rate: int):
+        self.min_games_for_win_rate = min_games_for_win_rate
+        self._indexes: Dict[str, LeaderboardIndex] = {
+            "vitorias": LeaderboardIndex(_wins_key),
+            "taxa": LeaderboardIndex(_make_win_rate_key(min_games_for_win_rate)),
+            "partidas": LeaderboardIndex(_games_key),
+            # O rating só se estabiliza depois de algumas partidas: mesmo mínimo da taxa de vitória
+            "rating": LeaderboardIndex(_make_rating_key(min_games_for_win_rate)),
+        }
+
+    def rebuild(self, players: Dict[str, Dict[str, Any]]):
+        """Monta todos os placares do zero (usado só no carregamento)."""
+        for index in self._indexes.values():
+            index.rebuild(players)
+
+    def update(self, player_id: str, stats: Dict[str, Any]):
+        for index in self._indexes.values():
+            index.update(player_id, stats)
+
+    def top(self, sort_key: str, n: int) -> List[str]:
+        return self._indexes[sort_key].top(n)
+
+    def version(self, sort_key: str) -> int:
+        return self._indexes[sort_key].version
+
+    def index(self, sort_key: str) -> LeaderboardIndex:
+        return self._indexes[sort_key]
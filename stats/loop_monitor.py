@@ -0,0 +1,67 @@
+# stats/loop_monitor.py
+
+import asyncio
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoopStallMonitor:
+    """
+    Mede travamentos do event loop: uma tarefa dorme por `interval` segundos e mede o atraso
+    com que acorda. Atrasos acima de `threshold` contam como travamento e são registrados no log,
+    junto com um resumo periódico (quantidade, tempo total e maior travamento).
+    """
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, report_every: float = 600.0):
+        self.interval = interval
+        self.threshold = threshold
+        self.report_every = report_every
+        self._task: Optional[asyncio.Task] = None
+        self.reset()
+
+    def reset(self):
+        self.samples = 0
+        self.stalls = 0
+        self.total_stall = 0.0
+        self.max_stall = 0.0
+
+    def record(self, lag: float):
+        self.samples += 1
+        if lag < self.threshold:
+            return
+        self.stalls += 1
+        self.total_stall += lag
+        self.max_stall = max(self.max_stall, lag)
+        logger.warning(f"Event loop travado por {lag * 1000:.0f} ms.")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "amostras": self.samples,
+            "travamentos": self.stalls,
+            "tempo_travado_ms": round(self.total_stall * 1000, 1),
+            "maior_travamento_ms": round(self.max_stall * 1000, 1),
+        }
+
+    def start(self):
+        """Inicia a medição (chamadas repetidas, como em reconexões, são ignoradas)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_report = loop.time() + self.report_every
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            now = loop.time()
+            self.record(now - expected)
+            if now >= next_report:
+                logger.info(f"Event loop nos últimos {self.report_every:.0f}s: {self.snapshot()}")
+                self.reset()
+                next_report = now + self.report_every
@@ -0,0 +1,102 @@
+# stats/protocol.py
+"""
+Formato das mensagens trocadas entre o bot e o serviço de ranking (stats.service).
+
+Cada mensagem é um objeto JSON em uma linha (UTF-8, terminada em "\\n"):
+    pedido:   {"id": 7, "op": "profile", "args": {...}}
+    resposta: {"id": 7, "ok": true, "result": ...} ou {"id": 7, "ok": false, "erro": "..."}
+O id liga a resposta ao pedido, então um mesmo socket atende vários pedidos ao mesmo tempo.
+"""
+
+import json
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Tuple
+
+from .leaderboard import LeaderboardPage
+from .backend import RankingPageData, PlayerProfile
+from .aggregates import GameAggregates
+from .kill_graph import KillRival
+from .history import HistoryEntry
+
+# Tamanho máximo de uma linha (as respostas trazem só os jogadores envolvidos, mas os agregados crescem com os papéis)
+MAX_LINE = 16 * 1024 * 1024
+
+
+def _to_json(value: Any) -> Any:
+    # Registros do ranking chegam como visões somente leitura (MappingProxyType)
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def encode(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"), default=_to_json).encode("utf-8") + b"\n"
+
+
+def decode(line: bytes) -> Dict[str, Any]:
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("Mensagem do ranking precisa ser um objeto JSON.")
+    return message
+
+
+def _key(value: Optional[list]) -> Optional[tuple]:
+    # Chaves de ordenação viram listas no JSON; os placares comparam tuplas.
+    return tuple(value) if value is not None else None
+
+
+def _version(value: Any) -> Any:
+    return tuple(_version(item) for item in value) if isinstance(value, list) else value
+
+
+# --- Conversão dos resultados ---
+
+def page_data_to_dict(data: Optional[RankingPageData]) -> Optional[Dict[str, Any]]:
+    if data is None:
+        return None
+    return {"page": list(data.page), "players": data.players, "version": data.version, "population": data.population}
+
+
+def page_data_from_dict(data: Optional[Dict[str, Any]]) -> Optional[RankingPageData]:
+    if data is None:
+        return None
+    start, player_ids, first_key, last_key, total = data["page"]
+    page = LeaderboardPage(start, player_ids, _key(first_key), _key(last_key), total)
+    return RankingPageData(page, data["players"], _version(data["version"]), data["population"])
+
+
+def profile_to_dict(profile: Optional[PlayerProfile]) -> Optional[Dict[str, Any]]:
+    if profile is None:
+        return None
+    return {"stats": profile.stats, "guild_stats": profile.guild_stats, "version": profile.version}
+
+
+def profile_from_dict(data: Optional[Dict[str, Any]]) -> Optional[PlayerProfile]:
+    if data is None:
+        return None
+    return PlayerProfile(data["stats"], data["guild_stats"], _version(data["version"]))
+
+
+def aggregates_to_list(aggregates: Optional[GameAggregates]) -> Optional[list]:
+    if aggregates is None:
+        return None
+    return [[*key, *counts] for key, counts in aggregates.rows().items()]
+
+
+def aggregates_from_list(rows: Optional[list]) -> Optional[GameAggregates]:
+    if rows is None:
+        return None
+    return GameAggregates({(kind, name, detail): (games, wins) for kind, name, detail, games, wins in rows})
+
+
+def rivals_from_list(rivals: list) -> Tuple[Optional[KillRival], Optional[KillRival]]:
+    victim, nemesis = (KillRival(*rival) if rival is not None else None for rival in rivals)
+    return victim, nemesis
+
+
+def history_from_list(entries: list) -> List[HistoryEntry]:
+    return [HistoryEntry(*entry) for entry in entries]
+
+
+def cursor_from_arg(value: Optional[list]) -> Optional[tuple]:
+    return _key(value)
@@ -0,0 +1,249 @@
+# stats/rating.py
+"""
+Rating de habilidade (estilo Elo) para partidas com facções.
+
+Cada jogador joga "em equipe" com os demais da sua facção contra o campo adversário:
+    time      = média dos ratings da facção do jogador (papéis Solo formam um time de um só)
+    oponentes = média dos ratings de todos os outros participantes
+    esperado  = 1 / (1 + 10 ^ ((oponentes - time - ajuste_da_faccao) / 400))
+    novo      = rating + K * (resultado - esperado),  K = RATING_K * sqrt(LOBBY_REFERENCIA / jogadores)
+O ajuste da facção compensa facções que vencem mais (ou menos) com ratings iguais,
+e o K menor em partidas grandes reflete o peso menor de cada jogador no resultado.
+
+O rating é atualizado incrementalmente a cada partida (apply_rating) e pode ser recalculado
+do zero a partir do log de partidas (recompute_ratings; vetorizado com NumPy, se instalado):
+    python -m stats.rating [--ajustar-faccoes]
+"""
+
+import argparse
+import math
+import os
+import logging
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Iterable, Tuple, Hashable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATING = 1500.0
+RATING_K = 32.0
+REFERENCE_LOBBY = 8
+SOLO_FACTION = "Solo"
+# Vantagem (em pontos de rating) de cada facção com ratings iguais. Ausente = 0.
+# Valores sugeridos a partir do histórico: python -m stats.rating --ajustar-faccoes
+FACTION_OFFSETS: Dict[str, float] = {}
+
+# Participante já preparado para o cálculo: (id do jogador, grupo/time, ajuste da facção, venceu?)
+RatedParticipant = Tuple[str, Hashable, float, bool]
+
+
+def game_participants(record: Dict[str, Any], faction_offsets: Optional[Dict[str, float]] = None) -> List[RatedParticipant]:
+    """Converte os jogadores de um registro do log em participantes do cálculo de rating."""
+    offsets = FACTION_OFFSETS if faction_offsets is None else faction_offsets
+    participants = []
+    for player_id, _, _, faction, won, _ in record["p"]:
+        # Papéis Solo (e jogadores sem papel) não têm aliados: cada um é o seu próprio time.
+        group = faction if faction and faction != SOLO_FACTION else ("solo", player_id)
+        participants.append((str(player_id), group, offsets.get(faction, 0.0), bool(won)))
+    return participants
+
+
+def k_factor(player_count: int) -> float:
+    return RATING_K * math.sqrt(REFERENCE_LOBBY / player_count)
+
+
+def rating_deltas(ratings: List[float], participants: List[RatedParticipant]) -> List[float]:
+    """Calcula a variação de rating de cada participante de uma partida (mesma ordem de entrada)."""
+    count = len(participants)
+    if count == 0:
+        return []
+    k = k_factor(count)
+    group_sum: Dict[Hashable, float] = defaultdict(float)
+    group_count: Dict[Hashable, int] = defaultdict(int)
+    for rating, (_, group, _, _) in zip(ratings, participants):
+        group_sum[group] += rating
+        group_count[group] += 1
+    total = sum(ratings)
+
+    deltas = []
+    for rating, (_, group, offset, won) in zip(ratings, participants):
+        opponents = count - group_count[group]
+        if opponents == 0:
+            deltas.append(0.0)
+            continue
+        team = group_sum[group] / group_count[group]
+        field = (total - group_sum[group]) / opponents
+        expected = 1.0 / (1.0 + 10.0 ** ((field - team - offset) / 400.0))
+        deltas.append(k * ((1.0 if won else 0.0) - expected))
+    return deltas
+
+
+def apply_rating(ranking_data: Dict[str, Dict[str, Any]], record: Dict[str, Any]):
+    """Atualiza o rating dos participantes de uma partida. Os jogadores já devem existir em ranking_data."""
+    participants = game_participants(record)
+    ratings = [ranking_data[player_id].get("rating", DEFAULT_RATING) for player_id, _, _, _ in participants]
+    for (player_id, _, _, _), rating, delta in zip(participants, ratings, rating_deltas(ratings, participants)):
+        ranking_data[player_id]["rating"] = rating + delta
+
+
+# --- Recálculo em lote ---
+
+def _import_numpy():
+    """NumPy é opcional (e só importado aqui, para não pesar na memória do bot): sem ele o recálculo usa Python puro."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def recompute_ratings(records: Iterable[Dict[str, Any]], faction_offsets: Optional[Dict[str, float]] = None,
+                      use_numpy: Optional[bool] = None) -> Dict[str, float]:
+    """Recalcula do zero o rating de todos os jogadores a partir das partidas, em ordem cronológica."""
+    games = [game_participants(record, faction_offsets) for record in records]
+    np = _import_numpy() if use_numpy is not False else None
+    if np is not None:
+        return _recompute_numpy(games, np)
+    if use_numpy:
+        raise RuntimeError("NumPy não está instalado.")
+    return _recompute_python(games)
+
+
+def _recompute_python(games: List[List[RatedParticipant]]) -> Dict[str, float]:
+    ratings: Dict[str, float] = {}
+    for participants in games:
+        current = [ratings.get(player_id, DEFAULT_RATING) for player_id, _, _, _ in participants]
+        for (player_id, _, _, _), rating, delta in zip(participants, current, rating_deltas(current, participants)):
+            ratings[player_id] = rating + delta
+    return ratings
+
+
+def _recompute_numpy(games: List[List[RatedParticipant]], np) -> Dict[str, float]:
+    """
+    Versão vetorizada. As partidas são agrupadas em "níveis": o nível de uma partida é 1 + o maior
+    nível das partidas anteriores dos seus jogadores. Partidas de um mesmo nível não têm jogadores
+    em comum, então todas são calculadas de uma vez, e o resultado é idêntico ao do laço sequencial.
+    """
+    sizes = [len(participants) for participants in games]
+    flat = [participant for participants in games for participant in participants]
+    if not flat:
+        return {}
+    player_ids = [participant[0] for participant in flat]
+    group_names = [participant[1] for participant in flat]
+    player_index = {player_id: idx for idx, player_id in enumerate(dict.fromkeys(player_ids))}
+    player_list = list(map(player_index.__getitem__, player_ids))
+
+    # Nível de cada partida: a única parte sequencial
+    last_level = [-1] * len(player_index)
+    game_levels = []
+    position = 0
+    for size in sizes:
+        indexes = player_list[position:position + size]
+        position += size
+        level = 1 + max(map(last_level.__getitem__, indexes), default=-1)
+        for idx in indexes:
+            last_level[idx] = level
+        game_levels.append(level)
+
+    sizes_arr = np.asarray(sizes, dtype=np.int64)
+    levels_arr = np.asarray(game_levels, dtype=np.int64)
+    game_of_entry = np.repeat(np.arange(len(games)), sizes_arr)
+    group_codes = {group: code for code, group in enumerate(dict.fromkeys(group_names))}
+    group_of_entry = np.fromiter(map(group_codes.__getitem__, group_names), dtype=np.int64, count=len(flat))
+    k_by_game = RATING_K * np.sqrt(REFERENCE_LOBBY / np.maximum(sizes_arr, 1))
+
+    # Reordena partidas por nível, mantendo a ordem cronológica dentro de cada nível
+    game_order = np.argsort(levels_arr, kind="stable")
+    game_rank = np.empty_like(game_order)
+    game_rank[game_order] = np.arange(len(game_order))
+    entry_order = np.argsort(levels_arr[game_of_entry], kind="stable")
+    entry_game = game_of_entry[entry_order]
+    players = np.asarray(player_list, dtype=np.int64)[entry_order]
+    offsets = np.fromiter((participant[2] for participant in flat), dtype=float, count=len(flat))[entry_order]
+    won = np.fromiter((participant[3] for participant in flat), dtype=float, count=len(flat))[entry_order]
+    k_entry = k_by_game[entry_game]
+    games_sorted = game_rank[entry_game]
+    # Time = (posição da partida na nova ordem, grupo): crescente, então contíguo dentro de cada nível
+    _, groups_sorted = np.unique(games_sorted * len(group_codes) + group_of_entry[entry_order], return_inverse=True)
+    bounds = np.flatnonzero(np.diff(levels_arr[entry_game])) + 1
+    starts = np.concatenate(([0], bounds))
+    stops = np.concatenate((bounds, [len(players)]))
+
+    ratings = np.full(len(player_index), DEFAULT_RATING)
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        p = players[start:stop]
+        # Ids de time e de partida já são contíguos dentro do nível: basta descontar o menor
+        g = groups_sorted[start:stop]
+        g = g - g.min()
+        m = games_sorted[start:stop] - games_sorted[start]
+        r = ratings[p]
+        group_sum = np.bincount(g, weights=r)
+        group_count = np.bincount(g)
+        game_sum = np.bincount(m, weights=r)
+        game_count = np.bincount(m)
+        team = group_sum[g] / group_count[g]
+        opponents = game_count[m] - group_count[g]
+        field = (game_sum[m] - group_sum[g]) / np.maximum(opponents, 1)
+        expected = 1.0 / (1.0 + 10.0 ** ((field - team - offsets[start:stop]) / 400.0))
+        delta = np.where(opponents > 0, k_entry[start:stop] * (won[start:stop] - expected), 0.0)
+        ratings[p] = r + delta # Cada jogador aparece no máximo uma vez por nível
+
+    return {player_id: float(ratings[idx]) for player_id, idx in player_index.items()}
+
+
+def fit_faction_offsets(records: Iterable[Dict[str, Any]], prior_games: int = 20) -> Dict[str, float]:
+    """
+    Estima o ajuste de cada facção a partir da sua taxa de vitória histórica
+    (suavizada com prior_games partidas fictícias a 50%).
+    """
+    wins: Dict[str, int] = defaultdict(int)
+    appearances: Dict[str, int] = defaultdict(int)
+    for record in records:
+        for _, _, _, faction, won, _ in record["p"]:
+            if faction:
+                appearances[faction] += 1
+                wins[faction] += 1 if won else 0
+    offsets = {}
+    for faction, count in appearances.items():
+        rate = (wins[faction] + prior_games / 2) / (count + prior_games)
+        offsets[faction] = round(400.0 * math.log10(rate / (1.0 - rate)), 1)
+    return offsets
+
+
+def main():
+    import config
+    from .game_log import GameLog
+    from .store import RankingStore
+
+    parser = argparse.ArgumentParser(description="Recalcula o rating de todos os jogadores a partir do log de partidas.")
+    parser.add_argument("--log", default=config.GAME_LOG_FILE, help="Arquivo do log de partidas.")
+    parser.add_argument("--db", default=config.RANKING_DB_FILE, help="Banco do ranking global.")
+    parser.add_argument("--guilds-dir", default=config.RANKING_GUILDS_PATH, help="Pasta dos bancos por servidor.")
+    parser.add_argument("--ajustar-faccoes", action="store_true", help="Só mostra os ajustes de facção sugeridos pelo histórico.")
+    parser.add_argument("--sem-numpy", action="store_true", help="Usa o cálculo em Python puro.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s: %(message)s')
+
+    records = [record for record, _ in GameLog(args.log).read_from(0)]
+    if args.ajustar_faccoes:
+        print(f"FACTION_OFFSETS = {fit_faction_offsets(records)!r}")
+        return
+
+    use_numpy = False if args.sem_numpy else None
+    targets = [(args.db, records)]
+    by_guild: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for record in records:
+        if record.get("g") is not None:
+            by_guild[record["g"]].append(record)
+    targets += [(os.path.join(args.guilds_dir, f"{guild_id}.db"), guild_records) for guild_id, guild_records in by_guild.items()]
+
+    for db_path, target_records in targets:
+        if not os.path.exists(db_path):
+            continue
+        ratings = recompute_ratings(target_records, use_numpy=use_numpy)
+        store = RankingStore(db_path)
+        store.update_ratings(ratings)
+        store.close()
+        logger.info(f"Rating recalculado em {db_path}: {len(ratings)} jogadores, {len(target_records)} partidas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# stats/read_view.py
+
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Tuple, Iterator
+
+Record = Dict[str, Any]
+
+
+class RankingReadView(Mapping):
+    """
+    Visão imutável do ranking para leitura ({id: estatísticas}), publicada a cada commit.
+
+    Os registros dos jogadores nunca são alterados depois de publicados (quem escreve copia o
+    registro antes de alterá-lo, ver RankingCache.edit), então a visão só guarda referências:
+    uma base (cópia rasa feita na carga) e camadas com os registros alterados em cada commit,
+    da mais nova para a mais antiga. Publicar custa O(jogadores alterados); de tempos em tempos
+    as camadas são fundidas em uma nova base (compacted), fora do event loop.
+    Quem tem uma visão continua vendo sempre os mesmos dados, sem lock.
+    """
+    __slots__ = ("version", "_base", "_layers", "_size")
+
+    def __init__(self, version: int, base: Dict[str, Record], layers: Tuple[Dict[str, Record], ...] = (), size: Optional[int] = None):
+        self.version = version
+        self._base = base
+        self._layers = layers
+        self._size = len(base) if size is None else size
+
+    def _lookup(self, player_id: str) -> Optional[Record]:
+        for layer in self._layers:
+            if (stats := layer.get(player_id)) is not None:
+                return stats
+        return self._base.get(player_id)
+
+    def __getitem__(self, player_id: str) -> Mapping:
+        stats = self._lookup(player_id)
+        if stats is None:
+            raise KeyError(player_id)
+        return MappingProxyType(stats)
+
+    def __contains__(self, player_id: object) -> bool:
+        return isinstance(player_id, str) and self._lookup(player_id) is not None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        if not self._layers:
+            return iter(self._base)
+        return iter(self.compacted())
+
+    @property
+    def depth(self) -> int:
+        return len(self._layers)
+
+    def with_changes(self, version: int, changes: Dict[str, Record]) -> "RankingReadView":
+        """Nova visão com os registros alterados por cima desta. changes não pode ser alterado depois."""
+        if not changes:
+            return RankingReadView(version, self._base, self._layers, self._size)
+        added = sum(1 for player_id in changes if self._lookup(player_id) is None)
+        return RankingReadView(version, self._base, (changes, *self._layers), self._size + added)
+
+    def compacted(self) -> Dict[str, Record]:
+        """Funde a base e as camadas em um único dicionário. Só lê dados imutáveis: pode rodar em outra thread."""
+        merged = dict(self._base)
+        for layer in reversed(self._layers):
+            merged.update(layer)
+        return merged
+
+    def rebased(self, merged: Dict[str, Record], folded: "RankingReadView") -> "RankingReadView":
+        """
+        Troca a base desta visão pelo resultado de folded.compacted(). As camadas publicadas
+        depois de folded (que ainda não estão em merged) são mantidas.
+        """
+        newer = self._layers[:len(self._layers) - len(folded._layers)]
+        return RankingReadView(self.version, merged, newer, self._size)
@@ -0,0 +1,144 @@
+# stats/rebuild.py
+"""
+Reconstrói todos os bancos do ranking (global e por servidor) a partir do log de partidas.
+
+Uso (com o bot desligado):
+    python -m stats.rebuild [--workers N] [--base data/ranking.json.migrado]
+
+Os jogadores são divididos em partições (id % N) e cada processo do pool relê o log
+aplicando apenas as partidas dos seus jogadores, com as mesmas regras do bot
+(stats.rules.apply_game_result). As estatísticas de um jogador só dependem das partidas
+dele, então o resultado é idêntico ao de uma passada única. O rating depende dos adversários,
+então é recalculado à parte, em ordem cronológica (stats.rating.recompute_ratings), assim como
+as estatísticas agregadas por papel e facção (stats.aggregates) e o grafo de abates (stats.kill_graph);
+o histórico de cada jogador (stats.history) sai direto do log.
+Partidas anteriores à criação do log só existem no ranking antigo: use --base para partir dele.
+"""
+
+import argparse
+import json
+import os
+import logging
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, Tuple, Iterable
+
+import config
+from .game_log import GameLog, record_participants
+from .rules import apply_game_result
+from .achievements import Achievements, load_achievements
+from .rating import recompute_ratings
+from .aggregates import GameAggregates
+from .kill_graph import KillGraph
+from .history import HistoryEntry, game_history_entries
+from .store import RankingStore
+
+logger = logging.getLogger(__name__)
+
+Players = Dict[str, Dict[str, Any]]
+
+
+def _rebuild_partition(log_path: str, end_offset: int, base: Players, partition: int, partitions: int,
+                       achievements: Achievements) -> Tuple[Players, Dict[int, Players]]:
+    """Recalcula as estatísticas dos jogadores de uma partição. Executado em um processo do pool."""
+    global_players: Players = {pid: stats for pid, stats in base.items() if int(pid) % partitions == partition}
+    guild_players: Dict[int, Players] = defaultdict(dict)
+    for record, _ in GameLog(log_path).read_from(0, end_offset):
+        participants = [p for p in record_participants(record) if int(p[0]) % partitions == partition]
+        if not participants:
+            continue
+        apply_game_result(global_players, participants, achievements)
+        if (guild_id := record.get("g")) is not None:
+            apply_game_result(guild_players[guild_id], participants, achievements, award_medals=False)
+    return global_players, dict(guild_players)
+
+
+def rebuild_stats(log_path: str, workers: int, base: Optional[Players] = None,
+                  achievements: Optional[Achievements] = None) -> Tuple[Players, Dict[int, Players], GameAggregates, KillGraph, int]:
+    """
+    Recalcula o ranking global, o de cada servidor, as estatísticas agregadas e o grafo de abates,
+    com as conquistas informadas (padrão: as do conquistas.json). Retorna também o offset do log processado.
+    """
+    end_offset = GameLog(log_path).committed_size()
+    base = base or {}
+    achievements = achievements or load_achievements()
+    global_players: Players = {}
+    guild_players: Dict[int, Players] = defaultdict(dict)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_rebuild_partition, log_path, end_offset, base, partition, workers, achievements) for partition in range(workers)]
+        for future in futures:
+            partition_global, partition_guilds = future.result()
+            global_players.update(partition_global)
+            for guild_id, players in partition_guilds.items():
+                guild_players[guild_id].update(players)
+
+    records = [record for record, _ in GameLog(log_path).read_from(0, end_offset)]
+    _set_ratings(global_players, recompute_ratings(records))
+    for guild_id, players in guild_players.items():
+        _set_ratings(players, recompute_ratings(record for record in records if record.get("g") == guild_id))
+    aggregates = GameAggregates()
+    kill_graph = KillGraph()
+    for record in records:
+        aggregates.apply(record)
+        kill_graph.apply(record)
+    return global_players, dict(guild_players), aggregates, kill_graph, end_offset
+
+
+def _set_ratings(players: Players, ratings: Dict[str, float]):
+    for player_id, rating in ratings.items():
+        if player_id in players:
+            players[player_id]["rating"] = rating
+
+
+def write_snapshot(db_path: str, players: Players, log_offset: int, aggregates: Optional[GameAggregates] = None,
+                   kill_graph: Optional[KillGraph] = None, history: Optional[Iterable[Tuple[str, HistoryEntry]]] = None):
+    """Grava um banco novo ao lado do atual e o substitui de uma vez só."""
+    tmp_path = db_path + ".rebuild"
+    for path in (tmp_path, tmp_path + "-wal", tmp_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    store = RankingStore(tmp_path)
+    # Marca o banco como já migrado para o ranking.json antigo não ser importado por cima.
+    store.upsert_players(players, meta={"log_offset": str(log_offset), "migrado_de_json": "reconstruido"},
+                         aggregates=aggregates.rows() if aggregates else None,
+                         kills=kill_graph.take_dirty() if kill_graph else None, history=history)
+    store.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    store.close()
+    for path in (db_path + "-wal", db_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    os.replace(tmp_path, db_path)
+
+
+def _load_base(path: Optional[str]) -> Players:
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    default_base = config.RANKING_FILE + ".migrado"
+    parser = argparse.ArgumentParser(description="Reconstrói o ranking a partir do log de partidas.")
+    parser.add_argument("--log", default=config.GAME_LOG_FILE, help="Arquivo do log de partidas.")
+    parser.add_argument("--db", default=config.RANKING_DB_FILE, help="Banco do ranking global.")
+    parser.add_argument("--guilds-dir", default=config.RANKING_GUILDS_PATH, help="Pasta dos bancos por servidor.")
+    parser.add_argument("--base", default=default_base if os.path.exists(default_base) else None,
+                        help="Ranking antigo (JSON) usado como ponto de partida do ranking global.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Quantidade de processos.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s: %(message)s')
+    global_players, guild_players, aggregates, kill_graph, end_offset = rebuild_stats(args.log, max(1, args.workers), _load_base(args.base))
+
+    # O histórico é gerado direto do log durante a gravação, sem montar a lista inteira em memória.
+    history = (entry for record, _ in GameLog(args.log).read_from(0, end_offset) for entry in game_history_entries(record))
+    write_snapshot(args.db, global_players, end_offset, aggregates, kill_graph, history)
+    os.makedirs(args.guilds_dir, exist_ok=True)
+    for guild_id, players in guild_players.items():
+        write_snapshot(os.path.join(args.guilds_dir, f"{guild_id}.db"), players, end_offset)
+    logger.info(f"Ranking reconstruído: {len(global_players)} jogadores, {len(guild_players)} servidores (log até o offset {end_offset}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# stats/render_cache.py
+
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set, Hashable, Iterable, Tuple
+
+
+class RenderCache:
+    """
+    Cache LRU de conteúdos já montados (ex: o dicionário de um embed), com versão.
+    Uma entrada só é devolvida se a versão pedida for a mesma com que foi guardada,
+    então dados alterados nunca são servidos. As etiquetas (tags) permitem descartar
+    de uma vez todas as entradas ligadas a um jogador ou a um placar.
+    """
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, Any, Tuple[Hashable, ...]]]" = OrderedDict()
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, version: Hashable, payload: Any, tags: Iterable[Hashable] = ()):
+        self._discard(key)
+        tags = tuple(tags)
+        self._entries[key] = (version, payload, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[Hashable]):
+        """Descarta todas as entradas marcadas com qualquer uma das etiquetas."""
+        for tag in tags:
+            for key in self._tags.pop(tag, ()):
+                self._discard(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._tags.clear()
+
+    def _discard(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            if (keys := self._tags.get(tag)) is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
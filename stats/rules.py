@@ -0,0 +1,59 @@
+# stats/rules.py
+
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+from .rating import DEFAULT_RATING
+from .achievements import Achievements, GAMES, WINS, ROLE_WINS, WIN_STREAK
+
+# (id do jogador, nome de exibição, nome do papel ou None, venceu?, facção ou None, sobreviveu?)
+Participant = Tuple[str, str, Optional[str], bool, Optional[str], bool]
+
+
+def get_default_player_stats(player_name: str) -> Dict[str, Any]:
+    """Retorna a estrutura de dados padrão para um novo jogador."""
+    return {
+        "nome_jogador": player_name,
+        "partidas_jogadas": 0,
+        "vitorias_totais": 0,
+        "vitorias_por_papel": {},
+        "medalhas": [],
+        "rating": DEFAULT_RATING,
+        "sequencia_vitorias": 0
+    }
+
+
+def apply_game_result(ranking_data: Dict[str, Dict[str, Any]], participants: Iterable[Participant], achievements: Achievements, award_medals: bool = True) -> List[Tuple[str, str]]:
+    """
+    Aplica o resultado de uma partida em uma única passada.
+    Atualiza as estatísticas em ranking_data e retorna as medalhas novas como (id do jogador, medalha).
+    Só as conquistas dos contadores alterados (e os eventos do papel jogado) são avaliadas.
+    Com award_medals=False apenas as estatísticas são atualizadas (usado nos rankings por servidor).
+    Não faz nenhuma E/S: gravar e anunciar fica a cargo de quem chama.
+    """
+    awarded: List[Tuple[str, str]] = []
+    for player_id, player_name, role_name, won, faction, survived in participants:
+        stats = ranking_data.get(player_id)
+        if stats is None:
+            stats = ranking_data[player_id] = get_default_player_stats(player_name)
+        stats["partidas_jogadas"] += 1
+        stats["nome_jogador"] = player_name # Atualiza o nome caso tenha mudado
+
+        changes = [((GAMES, None), stats["partidas_jogadas"])]
+        if won:
+            stats["vitorias_totais"] += 1
+            stats["sequencia_vitorias"] = stats.get("sequencia_vitorias", 0) + 1
+            changes += [((WINS, None), stats["vitorias_totais"]), ((WIN_STREAK, None), stats["sequencia_vitorias"])]
+            if role_name:
+                role_wins = stats["vitorias_por_papel"].get(role_name, 0) + 1
+                stats["vitorias_por_papel"][role_name] = role_wins
+                changes.append(((ROLE_WINS, role_name), role_wins))
+        else:
+            stats["sequencia_vitorias"] = 0
+
+        if not award_medals:
+            continue
+        for medal in [*achievements.reached(changes), *achievements.events(role_name, faction, won, survived)]:
+            if medal not in stats["medalhas"]:
+                stats["medalhas"].append(medal)
+                awarded.append((player_id, medal))
+    return awarded
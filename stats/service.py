@@ -0,0 +1,196 @@
+# stats/service.py
+"""
+Serviço de ranking: um processo único dono dos bancos do ranking e do log de partidas,
+atendendo qualquer quantidade de processos do bot (tokens ou shards diferentes) por um socket Unix.
+
+Uso:
+    python -m stats.service [--socket data/ranking.sock]
+
+Nos processos do bot, defina RANKING_SERVICE_SOCKET com o mesmo caminho: o RankingCog passa a
+enviar as partidas e as consultas para cá em vez de abrir os bancos. Como só este processo escreve,
+as atualizações de bots diferentes nunca se sobrescrevem. As mensagens seguem stats.protocol.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Set
+
+import config
+from .backend import LocalRankingBackend, create_ranking_shards, Medals
+from .leaderboard import Leaderboards
+from . import protocol
+
+logger = logging.getLogger(__name__)
+
+# Ids de partidas já aplicadas lembrados para ignorar reenvios (um cliente que perdeu a resposta reenvia o lote)
+_RECENT_RECORD_IDS = 10_000
+
+
+class RankingService:
+    """Servidor do socket: cada conexão pode ter vários pedidos em andamento, respondidos fora de ordem."""
+    def __init__(self, backend: LocalRankingBackend, socket_path: str):
+        self.backend = backend
+        self.socket_path = socket_path
+        # Identifica esta execução nas versões devolvidas: caches dos clientes não confundem versões de antes de um reinício.
+        self.instance = int(time.time() * 1000)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+        self._recent_ids: "OrderedDict[str, None]" = OrderedDict()
+        self._handlers = {
+            "ping": self._ping,
+            "record_games": self._record_games,
+            "leaderboard_page": self._leaderboard_page,
+            "profile": self._profile,
+            "aggregates": self._aggregates,
+            "players_chunk": self._players_chunk,
+            "kill_rivals": self._kill_rivals,
+            "history": self._history,
+        }
+
+    async def start(self):
+        await self.backend.start()
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path) # Socket deixado por uma execução anterior
+        self._server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path, limit=protocol.MAX_LINE)
+        os.chmod(self.socket_path, 0o660)
+        logger.info(f"Serviço de ranking ouvindo em {self.socket_path}.")
+
+    async def close(self):
+        """Para de aceitar conexões, encerra as abertas e grava o ranking."""
+        if self._server:
+            self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server:
+            await self._server.wait_closed()
+        self.backend.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        logger.info("Serviço de ranking encerrado.")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = asyncio.current_task()
+        self._connections.add(connection)
+        tasks: Set[asyncio.Task] = set()
+        try:
+            while line := await reader.readline():
+                # Cada pedido roda em sua própria tarefa: uma consulta lenta não atrasa as outras da conexão.
+                task = asyncio.create_task(self._answer(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            logger.warning(f"Conexão com o serviço de ranking encerrada: {e}")
+        except asyncio.CancelledError:
+            pass # Serviço sendo encerrado (close)
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            self._connections.discard(connection)
+            writer.close()
+
+    async def _answer(self, line: bytes, writer: asyncio.StreamWriter):
+        request_id = None
+        try:
+            message = protocol.decode(line)
+            request_id = message.get("id")
+            handler = self._handlers.get(message.get("op"))
+            if handler is None:
+                raise ValueError(f"Operação desconhecida: {message.get('op')}")
+            response = {"id": request_id, "ok": True, "result": await handler(**message.get("args", {}))}
+        except Exception as e:
+            logger.exception(f"Erro ao atender o pedido {request_id} do ranking: {e}")
+            response = {"id": request_id, "ok": False, "erro": f"{type(e).__name__}: {e}"}
+        if writer.is_closing():
+            return
+        try:
+            writer.write(protocol.encode(response))
+            await writer.drain()
+        except ConnectionError:
+            pass # O cliente desconectou; ele refaz o pedido ao reconectar.
+
+    # --- Operações ---
+
+    async def _ping(self) -> Dict[str, Any]:
+        return {"instance": self.instance}
+
+    def _is_new(self, record: Dict[str, Any]) -> bool:
+        record_id = record.get("id")
+        if record_id is None:
+            return True
+        if record_id in self._recent_ids:
+            return False
+        self._recent_ids[record_id] = None
+        if len(self._recent_ids) > _RECENT_RECORD_IDS:
+            self._recent_ids.popitem(last=False)
+        return True
+
+    async def _record_games(self, records: List[Dict[str, Any]]) -> List[Medals]:
+        """Aplica um lote de partidas, na ordem recebida. Partidas reenviadas não são aplicadas de novo."""
+        is_new = [self._is_new(record) for record in records]
+        awarded = iter(await self.backend.record_games([record for record, new in zip(records, is_new) if new]))
+        if not all(is_new):
+            logger.info(f"{is_new.count(False)} partidas reenviadas ignoradas.")
+        return [next(awarded) if new else [] for new in is_new]
+
+    async def _leaderboard_page(self, guild_id: Optional[int], sort_key: str, size: int, start: int = 0,
+                                after: Optional[list] = None, before: Optional[list] = None,
+                                around: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        if sort_key not in Leaderboards.KEYS:
+            raise ValueError(f"Placar desconhecido: {sort_key}")
+        data = await self.backend.leaderboard_page(guild_id, sort_key, size, start, protocol.cursor_from_arg(after),
+                                                   protocol.cursor_from_arg(before), around)
+        if data is not None:
+            data = data._replace(version=(self.instance, data.version))
+        return protocol.page_data_to_dict(data)
+
+    async def _profile(self, player_id: str, guild_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        profile = await self.backend.profile(player_id, guild_id)
+        if profile is not None:
+            profile = profile._replace(version=(self.instance, *profile.version))
+        return protocol.profile_to_dict(profile)
+
+    async def _aggregates(self) -> Optional[list]:
+        return protocol.aggregates_to_list(await self.backend.aggregates())
+
+    async def _kill_rivals(self, player_id: str) -> list:
+        return list(await self.backend.kill_rivals(player_id))
+
+    async def _history(self, player_id: str, limit: int, before: Optional[list] = None) -> list:
+        return await self.backend.history(player_id, limit, protocol.cursor_from_arg(before))
+
+    async def _players_chunk(self, guild_id: Optional[int], after_id: Optional[str], size: int) -> list:
+        return await self.backend.players_chunk(guild_id, after_id, size)
+
+
+async def serve(socket_path: str):
+    service = RankingService(LocalRankingBackend(create_ranking_shards()), socket_path)
+    await service.start()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        await service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço de ranking compartilhado pelos processos do bot.")
+    parser.add_argument("--socket", default=config.RANKING_SERVICE_SOCKET or os.path.join(config.DATA_PATH, "ranking.sock"),
+                        help="Caminho do socket Unix (o mesmo de RANKING_SERVICE_SOCKET nos bots).")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s: %(message)s')
+    asyncio.run(serve(args.socket))
+
+
+if __name__ == "__main__":
+    main()
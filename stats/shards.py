@@ -0,0 +1,201 @@
+# stats/shards.py
+
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List, Any, Tuple, Set
+
+from .store import RankingStore
+from .cache import RankingCache
+from .leaderboard import Leaderboards
+from .game_log import GameLog, record_participants
+from .rules import apply_game_result
+from .achievements import Achievements, load_achievements
+from .rating import apply_rating
+from .aggregates import GameAggregates
+from .kill_graph import KillGraph, top_rival, KillRival
+from .history import GameHistory, HistoryEntry, HistoryCursor, newest_first
+
+logger = logging.getLogger(__name__)
+
+
+class RankingShards:
+    """
+    Organiza o ranking em shards: um ranking global (visão agregada) e um ranking
+    por servidor, cada um com seu próprio banco, cópia em memória, placares e lock.
+    Assim as gravações de servidores movimentados não disputam o mesmo lock.
+
+    Com um GameLog, cada partida é primeiro acrescentada ao log e depois aplicada aos shards;
+    ao abrir um shard, as partidas do log posteriores ao seu checkpoint são reaplicadas.
+
+    Toda a E/S dos shards (bancos e log) passa por uma única thread dedicada: as operações
+    ficam fora do event loop e, por serem serializadas, nunca disputam o mesmo arquivo.
+    """
+    def __init__(self, global_db_path: str, guilds_dir: str, legacy_json_path: Optional[str] = None,
+                 min_games_for_win_rate: int = 10, flush_interval: float = 30.0, flush_threshold: int = 20,
+                 game_log: Optional[GameLog] = None, achievements: Optional[Achievements] = None,
+                 use_snapshots: bool = False, history_ring_size: int = 20):
+        self.guilds_dir = guilds_dir
+        self.game_log = game_log
+        self.achievements = achievements if achievements is not None else load_achievements()
+        self.min_games_for_win_rate = min_games_for_win_rate
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.use_snapshots = use_snapshots
+        self.history_ring_size = history_ring_size
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ranking-io")
+        self.global_cache = self._make_cache(RankingStore(global_db_path, legacy_json_path=legacy_json_path), None)
+        self._guild_caches: Dict[int, RankingCache] = {}
+        self._started = False
+
+    def _make_cache(self, store: RankingStore, guild_id: Optional[int]) -> RankingCache:
+        replay = (lambda players, offset, aggregates, kill_graph, history: self._replay(players, offset, aggregates, kill_graph, history, guild_id)) if self.game_log else None
+        snapshot_path = os.path.splitext(store.db_path)[0] + ".snap" if self.use_snapshots else None
+        # As estatísticas agregadas por papel/facção, o grafo de abates e o histórico são globais: só o shard global os mantém.
+        return RankingCache(store, Leaderboards(self.min_games_for_win_rate), flush_interval=self.flush_interval,
+                            flush_threshold=self.flush_threshold, replay=replay, executor=self.executor, snapshot_path=snapshot_path,
+                            with_aggregates=guild_id is None, history_ring_size=self.history_ring_size)
+
+    def _replay(self, players: Dict[str, Dict[str, Any]], offset: int, aggregates: Optional[GameAggregates],
+                kill_graph: Optional[KillGraph], history: Optional[GameHistory], guild_id: Optional[int]) -> Tuple[Set[str], int]:
+        """Reaplica em players as partidas do log registradas depois de offset (o checkpoint do shard)."""
+        replayed = 0
+        changed: Set[str] = set()
+        end_offset = offset
+        for record, end_offset in self.game_log.read_from(offset):
+            if guild_id is not None and record.get("g") != guild_id:
+                continue
+            participants = record_participants(record)
+            apply_game_result(players, participants, self.achievements, award_medals=guild_id is None)
+            apply_rating(players, record)
+            if aggregates is not None:
+                aggregates.apply(record)
+            if kill_graph is not None:
+                kill_graph.apply(record)
+            if history is not None:
+                history.apply(record)
+            changed.update(participant[0] for participant in participants)
+            replayed += 1
+        if replayed:
+            logger.info(f"{replayed} partidas reaplicadas do log (shard {'global' if guild_id is None else guild_id}).")
+        return changed, end_offset
+
+    async def append_record(self, record: Dict[str, Any]) -> int:
+        """Acrescenta um registro ao log de partidas na thread de E/S e retorna o novo offset."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.game_log.append, record)
+
+    async def apply_record(self, record: Dict[str, Any], log_offset: Optional[int] = None) -> List[Tuple[str, str]]:
+        """
+        Aplica um registro de partida ao ranking global e ao shard do servidor.
+        Medalhas são conquistas globais; o shard do servidor só acompanha as estatísticas locais.
+        Retorna as medalhas concedidas como (id do jogador, medalha).
+        """
+        participants = record_participants(record)
+        participant_ids = [participant[0] for participant in participants]
+        awarded: List[Tuple[str, str]] = []
+        targets = [(self.global_cache, True)]
+        if (guild_id := record.get("g")) is not None:
+            targets.append((await self.open_guild(guild_id), False))
+        for cache, award_medals in targets:
+            await cache.ensure_loaded()
+            if log_offset is not None and log_offset <= cache.loaded_offset:
+                # O shard foi carregado depois do append e o replay já aplicou esta partida. Não vale comparar com
+                # applied_offset: outra partida, posterior no log, pode ter sido aplicada enquanto esta aguardava.
+                continue
+            cache.edit(participant_ids)
+            medals = apply_game_result(cache.players, participants, self.achievements, award_medals=award_medals)
+            apply_rating(cache.players, record)
+            if cache.aggregates is not None:
+                cache.aggregates.apply(record)
+            if cache.kill_graph is not None:
+                cache.kill_graph.apply(record)
+            if cache.history is not None:
+                cache.history.apply(record)
+            cache.commit(participant_ids, log_offset=log_offset)
+            if award_medals:
+                awarded = medals
+        return awarded
+
+    async def kill_rivals(self, player_id: str) -> Tuple[Optional[KillRival], Optional[KillRival]]:
+        """
+        Consulta o grafo de abates: (vítima preferida, nêmesis) do jogador, somando o banco aos incrementos ainda
+        não gravados. Os incrementos são lidos antes de a consulta entrar na fila da thread de E/S: uma gravação em
+        lote que já os retirou da memória está à frente na fila, então nada é contado duas vezes nem fica de fora.
+        """
+        cache = self.global_cache
+        await cache.ensure_loaded()
+        pending_kills = cache.kill_graph.pending_edges(player_id, as_victim=False) if cache.kill_graph else []
+        pending_deaths = cache.kill_graph.pending_edges(player_id, as_victim=True) if cache.kill_graph else []
+        kills, deaths = await asyncio.get_running_loop().run_in_executor(self.executor, cache.store.kill_edges, player_id)
+        return top_rival(kills + pending_kills), top_rival(deaths + pending_deaths)
+
+    async def history(self, player_id: str, limit: int, before: Optional[HistoryCursor] = None) -> List[HistoryEntry]:
+        """
+        Até limit partidas do jogador, da mais recente para a mais antiga (anteriores ao cursor, se houver).
+        As últimas partidas saem do anel em memória quando ele já foi preenchido; senão, de uma busca no
+        índice do banco somada às entradas ainda não gravadas (lidas antes da consulta, como em kill_rivals).
+        """
+        cache = self.global_cache
+        await cache.ensure_loaded()
+        history = cache.history
+        if history is None:
+            return []
+        if before is None and (recent := history.recent(player_id, limit)) is not None:
+            return recent
+        # A primeira página também preenche o anel, então busca pelo menos ring_size partidas
+        fetch = max(limit, history.ring_size) if before is None else limit
+        generation = history.generation
+        pending = history.pending_entries(player_id, before)
+        saved = await asyncio.get_running_loop().run_in_executor(self.executor, cache.store.history, player_id, fetch, before)
+        entries = newest_first(saved + pending)[:fetch]
+        # Se outra partida foi aplicada durante a consulta, o anel montado agora poderia ficar sem ela
+        if before is None and history.generation == generation:
+            history.fill_ring(player_id, entries)
+        return entries[:limit]
+
+    def guild_db_path(self, guild_id: int) -> str:
+        return os.path.join(self.guilds_dir, f"{guild_id}.db")
+
+    def guild(self, guild_id: int) -> RankingCache:
+        """Retorna o shard de um servidor, criando-o na primeira vez (sem carregar o banco)."""
+        cache = self._guild_caches.get(guild_id)
+        if cache is None:
+            cache = self._make_cache(RankingStore(self.guild_db_path(guild_id)), guild_id)
+            self._guild_caches[guild_id] = cache
+            logger.info(f"Shard do ranking aberto para o servidor {guild_id}.")
+        return cache
+
+    async def open_guild(self, guild_id: int) -> RankingCache:
+        """Retorna o shard de um servidor já carregado (fora do event loop) e, se for o caso, com a gravação periódica ativa."""
+        cache = self.guild(guild_id)
+        if self._started:
+            await cache.start()
+        else:
+            await cache.ensure_loaded()
+        return cache
+
+    def all_caches(self) -> List[RankingCache]:
+        return [self.global_cache, *self._guild_caches.values()]
+
+    async def start(self):
+        """Carrega os shards abertos e inicia a gravação periódica de todos eles."""
+        self._started = True
+        await asyncio.gather(*(cache.start() for cache in self.all_caches()))
+
+    def flush_sync(self):
+        for cache in self.all_caches():
+            try:
+                cache.flush_sync()
+            except Exception as e:
+                logger.exception(f"Erro ao gravar o shard {cache.store.db_path}: {e}")
+
+    def close(self):
+        # Espera as operações em andamento na thread de E/S antes da gravação final.
+        self.executor.shutdown(wait=True)
+        for cache in self.all_caches():
+            cache.close()
+            cache.store.close()
+        if self.game_log:
+            self.game_log.close()
+        self._started = False
@@ -0,0 +1,25 @@
+# stats/singleflight.py
+
+import asyncio
+from typing import Dict, Hashable, Callable, Awaitable, Any
+
+
+class SingleFlight:
+    """
+    Junta chamadas simultâneas com a mesma chave: a primeira executa a corrotina e as demais
+    aguardam o mesmo resultado (ou a mesma exceção). Depois de concluída, a chave é liberada.
+    """
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield: se quem pediu primeiro for cancelado, os demais continuam esperando o resultado.
+        return await asyncio.shield(future)
@@ -0,0 +1,291 @@
+# stats/store.py
+
+import sqlite3
+import json
+import os
+import logging
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+from .rating import DEFAULT_RATING
+from .history import HistoryEntry, HistoryCursor
+
+logger = logging.getLogger(__name__)
+
+# Esquema do banco. Cada jogador é uma linha; os campos que são mapas/listas
+# (vitórias por papel e medalhas) ficam serializados como JSON compacto.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jogadores (
+    user_id INTEGER PRIMARY KEY,
+    nome_jogador TEXT NOT NULL,
+    partidas_jogadas INTEGER NOT NULL DEFAULT 0,
+    vitorias_totais INTEGER NOT NULL DEFAULT 0,
+    vitorias_por_papel TEXT NOT NULL DEFAULT '{}',
+    medalhas TEXT NOT NULL DEFAULT '[]',
+    rating REAL NOT NULL DEFAULT 1500,
+    sequencia_vitorias INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_jogadores_vitorias ON jogadores (vitorias_totais DESC);
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS agregados (
+    tipo TEXT NOT NULL,
+    chave TEXT NOT NULL,
+    detalhe TEXT NOT NULL,
+    partidas INTEGER NOT NULL DEFAULT 0,
+    vitorias INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tipo, chave, detalhe)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS abates (
+    assassino INTEGER NOT NULL,
+    vitima INTEGER NOT NULL,
+    motivo TEXT NOT NULL,
+    quantidade INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (assassino, vitima, motivo)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_abates_vitima ON abates (vitima, assassino);
+CREATE TABLE IF NOT EXISTS historico (
+    user_id INTEGER NOT NULL,
+    jogado_em INTEGER NOT NULL,
+    partida TEXT NOT NULL,
+    servidor INTEGER,
+    papel TEXT,
+    faccao TEXT,
+    venceu INTEGER NOT NULL,
+    noites INTEGER NOT NULL,
+    jogadores INTEGER NOT NULL,
+    PRIMARY KEY (user_id, jogado_em, partida)
+) WITHOUT ROWID;
+"""
+
+_COLUMNS = "user_id, nome_jogador, partidas_jogadas, vitorias_totais, vitorias_por_papel, medalhas, rating, sequencia_vitorias"
+
+# Colunas adicionadas depois da criação do esquema: (nome, definição) para bancos antigos
+_ADDED_COLUMNS = [("rating", "REAL NOT NULL DEFAULT 1500"), ("sequencia_vitorias", "INTEGER NOT NULL DEFAULT 0")]
+
+_UPSERT = f"""
+INSERT INTO jogadores ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(user_id) DO UPDATE SET
+    nome_jogador = excluded.nome_jogador,
+    partidas_jogadas = excluded.partidas_jogadas,
+    vitorias_totais = excluded.vitorias_totais,
+    vitorias_por_papel = excluded.vitorias_por_papel,
+    medalhas = excluded.medalhas,
+    rating = excluded.rating,
+    sequencia_vitorias = excluded.sequencia_vitorias
+"""
+
+
+def _row_to_stats(row: tuple) -> Dict[str, Any]:
+    """Converte uma linha da tabela no mesmo dicionário usado pelo antigo ranking.json."""
+    _, nome, partidas, vitorias, por_papel, medalhas, rating, sequencia = row
+    return {
+        "nome_jogador": nome,
+        "partidas_jogadas": partidas,
+        "vitorias_totais": vitorias,
+        "vitorias_por_papel": json.loads(por_papel),
+        "medalhas": json.loads(medalhas),
+        "rating": rating,
+        "sequencia_vitorias": sequencia,
+    }
+
+
+def _stats_to_row(player_id: str, stats: Dict[str, Any]) -> tuple:
+    """Converte o dicionário de estatísticas de um jogador em uma linha da tabela."""
+    return (
+        int(player_id),
+        stats.get("nome_jogador", "Jogador Desconhecido"),
+        stats.get("partidas_jogadas", 0),
+        stats.get("vitorias_totais", 0),
+        json.dumps(stats.get("vitorias_por_papel", {}), ensure_ascii=False, separators=(",", ":")),
+        json.dumps(stats.get("medalhas", []), ensure_ascii=False, separators=(",", ":")),
+        stats.get("rating", DEFAULT_RATING),
+        stats.get("sequencia_vitorias", 0),
+    )
+
+
+class RankingStore:
+    """
+    Armazena o ranking em um banco SQLite em modo WAL.
+    Mantém a mesma forma de dados do antigo ranking.json ({id_str: stats}),
+    mas permite ler e gravar apenas os jogadores envolvidos em cada operação.
+    """
+    def __init__(self, db_path: str, legacy_json_path: Optional[str] = None):
+        self.db_path = db_path
+        self.legacy_json_path = legacy_json_path
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.open()
+        return self._conn
+
+    def open(self):
+        """Abre a conexão, cria o esquema e migra o JSON antigo se necessário."""
+        if self._conn is not None:
+            return
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        # A conexão é usada pela thread de E/S do ranking e, no desligamento, pela thread principal
+        # (nunca ao mesmo tempo).
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._add_missing_columns()
+        self._conn.commit()
+        self._migrate_legacy_json()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # --- Meta ---
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT valor FROM meta WHERE chave = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)", (key, value))
+
+    # --- Migração ---
+
+    def _add_missing_columns(self):
+        """Acrescenta aos bancos antigos as colunas criadas depois (o valor padrão vale para as linhas existentes)."""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jogadores)")}
+        for name, definition in _ADDED_COLUMNS:
+            if name not in existing:
+                self._conn.execute(f"ALTER TABLE jogadores ADD COLUMN {name} {definition}")
+                logger.info(f"Coluna '{name}' adicionada à tabela de jogadores em {self.db_path}.")
+
+    def _migrate_legacy_json(self):
+        """Importa o ranking.json antigo uma única vez, preservando o arquivo original como backup."""
+        if not self.legacy_json_path or self.get_meta("migrado_de_json"):
+            return
+        if not os.path.exists(self.legacy_json_path) or os.path.getsize(self.legacy_json_path) == 0:
+            self.set_meta("migrado_de_json", "sem_arquivo")
+            return
+        try:
+            with open(self.legacy_json_path, "r", encoding="utf-8") as f:
+                legacy_data = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            # Não apagamos nada: o arquivo fica intacto para recuperação manual.
+            logger.error(f"Não foi possível migrar {self.legacy_json_path}: {e}. O arquivo foi mantido para recuperação manual.")
+            return
+
+        with self.conn:
+            self.conn.executemany(_UPSERT, (_stats_to_row(pid, stats) for pid, stats in legacy_data.items()))
+            self.conn.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES ('migrado_de_json', 'ok')")
+        os.replace(self.legacy_json_path, self.legacy_json_path + ".migrado")
+        logger.info(f"Ranking migrado de {self.legacy_json_path} para {self.db_path} ({len(legacy_data)} jogadores).")
+
+    # --- Leitura ---
+
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        """Retorna o ranking completo no formato do antigo ranking.json."""
+        cursor = self.conn.execute(f"SELECT {_COLUMNS} FROM jogadores")
+        return {str(row[0]): _row_to_stats(row) for row in cursor}
+
+    def get_player(self, player_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(f"SELECT {_COLUMNS} FROM jogadores WHERE user_id = ?", (int(player_id),)).fetchone()
+        return _row_to_stats(row) if row else None
+
+    def get_players(self, player_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Busca vários jogadores de uma vez. Jogadores inexistentes não aparecem no resultado."""
+        ids = [int(pid) for pid in player_ids]
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        cursor = self.conn.execute(f"SELECT {_COLUMNS} FROM jogadores WHERE user_id IN ({placeholders})", ids)
+        return {str(row[0]): _row_to_stats(row) for row in cursor}
+
+    def top_players(self, limit: int) -> List[Dict[str, Any]]:
+        """Retorna os jogadores com mais vitórias usando o índice de vitórias."""
+        cursor = self.conn.execute(f"SELECT {_COLUMNS} FROM jogadores ORDER BY vitorias_totais DESC LIMIT ?", (limit,))
+        return [_row_to_stats(row) for row in cursor]
+
+    def players_page(self, after_id: Optional[str], limit: int) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Até limit jogadores com id maior que after_id, em ordem de id. Paginação por chave (sem OFFSET):
+        cada página é uma busca no índice da chave primária, então percorrer o ranking todo custa O(n).
+        """
+        cursor = self.conn.execute(f"SELECT {_COLUMNS} FROM jogadores WHERE user_id > ? ORDER BY user_id LIMIT ?",
+                                   (int(after_id) if after_id is not None else -1, limit))
+        return [(str(row[0]), _row_to_stats(row)) for row in cursor]
+
+    def player_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM jogadores").fetchone()[0]
+
+    def load_aggregates(self) -> Dict[Tuple[str, str, str], Tuple[int, int]]:
+        """Retorna os contadores agregados das partidas (stats.aggregates): (tipo, chave, detalhe) -> (partidas, vitórias)."""
+        cursor = self.conn.execute("SELECT tipo, chave, detalhe, partidas, vitorias FROM agregados")
+        return {(tipo, chave, detalhe): (partidas, vitorias) for tipo, chave, detalhe, partidas, vitorias in cursor}
+
+    def kill_edges(self, player_id: str) -> Tuple[List[Tuple[str, str, int]], List[Tuple[str, str, int]]]:
+        """
+        Arestas do grafo de abates (stats.kill_graph) de um jogador: (abatidos por ele, que o abateram),
+        cada uma como (outro jogador, motivo, quantidade). Usa a chave primária e o índice por vítima.
+        """
+        user_id = int(player_id)
+        kills = self.conn.execute("SELECT vitima, motivo, quantidade FROM abates WHERE assassino = ?", (user_id,)).fetchall()
+        deaths = self.conn.execute("SELECT assassino, motivo, quantidade FROM abates WHERE vitima = ?", (user_id,)).fetchall()
+        return ([(str(other), reason, count) for other, reason, count in kills],
+                [(str(other), reason, count) for other, reason, count in deaths])
+
+    def history(self, player_id: str, limit: int, before: Optional[HistoryCursor] = None) -> List[HistoryEntry]:
+        """
+        Até limit partidas do jogador, da mais recente para a mais antiga (anteriores ao cursor, se houver).
+        Uma busca no índice da chave primária (user_id, jogado_em, partida): O(log n + limit).
+        """
+        columns = "jogado_em, partida, servidor, papel, faccao, venceu, noites, jogadores"
+        if before is None:
+            cursor = self.conn.execute(f"SELECT {columns} FROM historico WHERE user_id = ? "
+                                       "ORDER BY jogado_em DESC, partida DESC LIMIT ?", (int(player_id), limit))
+        else:
+            cursor = self.conn.execute(f"SELECT {columns} FROM historico WHERE user_id = ? AND (jogado_em, partida) < (?, ?) "
+                                       "ORDER BY jogado_em DESC, partida DESC LIMIT ?", (int(player_id), *before, limit))
+        return [HistoryEntry(played_at, game_id, guild_id, role, faction, bool(won), nights, players)
+                for played_at, game_id, guild_id, role, faction, won, nights, players in cursor]
+
+    # --- Escrita ---
+
+    def upsert_players(self, players: Dict[str, Dict[str, Any]], meta: Optional[Dict[str, str]] = None,
+                       aggregates: Optional[Dict[Tuple[str, str, str], Tuple[int, int]]] = None,
+                       kills: Optional[Dict[Tuple[str, str, str], int]] = None,
+                       history: Optional[Iterable[Tuple[str, HistoryEntry]]] = None):
+        """
+        Grava (insere ou atualiza) os jogadores informados em uma única transação.
+        As entradas de meta (ex: checkpoint do log de partidas), os contadores agregados
+        alterados, os incrementos do grafo de abates e as novas entradas do histórico entram na mesma transação.
+        """
+        if not players and not meta and not aggregates and not kills and not history:
+            return
+        with self.conn:
+            self.conn.executemany(_UPSERT, (_stats_to_row(pid, stats) for pid, stats in players.items()))
+            if aggregates:
+                self.conn.executemany("INSERT OR REPLACE INTO agregados (tipo, chave, detalhe, partidas, vitorias) VALUES (?, ?, ?, ?, ?)",
+                                      (key + counts for key, counts in aggregates.items()))
+            if kills:
+                self.conn.executemany("INSERT INTO abates (assassino, vitima, motivo, quantidade) VALUES (?, ?, ?, ?) "
+                                      "ON CONFLICT(assassino, vitima, motivo) DO UPDATE SET quantidade = quantidade + excluded.quantidade",
+                                      ((int(killer), int(victim), reason, count) for (killer, victim, reason), count in kills.items()))
+            if history:
+                # OR IGNORE: uma partida já gravada (mesmo jogador, data e id) não é duplicada
+                self.conn.executemany("INSERT OR IGNORE INTO historico (user_id, jogado_em, partida, servidor, papel, faccao, venceu, noites, jogadores) "
+                                      "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                      ((int(player_id), *entry[:5], int(entry.won), entry.nights, entry.players) for player_id, entry in history))
+            if meta:
+                self.conn.executemany("INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)", meta.items())
+
+    def update_ratings(self, ratings: Dict[str, float]):
+        """Substitui o rating de todos os jogadores (ausentes voltam ao padrão) em uma única transação."""
+        with self.conn:
+            self.conn.execute("UPDATE jogadores SET rating = ?", (DEFAULT_RATING,))
+            self.conn.executemany("UPDATE jogadores SET rating = ? WHERE user_id = ?",
+                                  ((rating, int(player_id)) for player_id, rating in ratings.items()))
+            # O banco mudou: um snapshot binário salvo antes deixa de valer.
+            self.conn.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES ('snapshot_token', '')")
@@ -0,0 +1,16 @@
+# tests/test_balance_model.py
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from benchmarks import balance_agreement, balance_sim
+
+
+def test_model_agrees_with_the_simulator():
+    # Versão curta do benchmarks.balance_agreement: uma sala sem e outra com possessão
+    sizes = [6, 11]
+    sim_report = balance_sim.simulate(sizes, 3000, balance_agreement.POLICY, 1)
+    rows = balance_agreement.compare(sim_report, sizes, 50_000)
+    assert {row["players"] for row in rows} == set(sizes)
+    assert balance_agreement.disagreements(rows) == []
@@ -0,0 +1,42 @@
+# tests/test_game_log.py
+
+from stats.game_log import GameLog, RECORD_VERSION
+from stats.rebuild import rebuild_stats
+
+
+def _record(game_id: str) -> dict:
+    return {"v": RECORD_VERSION, "id": game_id, "t": 0, "g": None, "n": 1, "f": "Cidade",
+            "p": [[1, "Ana", "Cidadão Comum", "Cidade", 1, 1]], "m": []}
+
+
+def test_append_after_crash_discards_partial_line(tmp_path):
+    path = str(tmp_path / "game_log.jsonl")
+    log = GameLog(path)
+    checkpoint = log.append(_record("a"))
+    log.close()
+
+    # Queda no meio do append seguinte: metade da linha, sem o '\n'
+    with open(path, "ab") as f:
+        f.write(b'{"v":1,"id":"b","p":[[1,"An')
+
+    reopened = GameLog(path)
+    assert reopened.committed_size() == checkpoint
+    reopened.append(_record("c"))
+    reopened.close()
+
+    records = list(GameLog(path).read_from(0))
+    assert [record["id"] for record, _ in records] == ["a", "c"]
+    assert records[0][1] == checkpoint
+    assert records[-1][1] == GameLog(path).size()
+
+
+def test_rebuild_checkpoint_stops_before_partial_line(tmp_path):
+    path = str(tmp_path / "game_log.jsonl")
+    log = GameLog(path)
+    checkpoint = log.append(_record("a"))
+    log.close()
+    with open(path, "ab") as f:
+        f.write(b'{"v":1,"id":"b"')
+
+    *_, end_offset = rebuild_stats(path, 1, {})
+    assert end_offset == checkpoint
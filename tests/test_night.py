@@ -0,0 +1,142 @@
+# tests/test_night.py
+
+import random
+
+from engine.actions import make_night_action, action_spec, NightActionSpec
+from engine.night import NightState, NightPlayer, resolve_night, Death, Revival, PlayerChange, GameChange, DirectMessage
+from roles.cidade_roles import Anjo, GuardaCostas, CidadaoComum, Medium, Prefeito
+from roles.viloes_roles import AssassinoAlfa, AssassinoJunior, AssassinoSimples, viloes_role_classes
+from roles.solo_roles import Praga, Fofoqueiro, solo_role_classes
+
+ALFA, JUNIOR, GUARD, ANGEL, CITIZEN, OTHER, PLAGUE, GHOST, MEDIUM = range(1, 10)
+
+
+def _state(roles, dead=(), actions=(), **flags) -> NightState:
+    """Noite com um jogador por papel (id -> papel) e as ações (id, tipo, alvo[, extra_ids])."""
+    players = {player_id: NightPlayer(player_id, f"Jogador {player_id}", role, is_alive=player_id not in dead)
+               for player_id, role in roles.items()}
+    night_actions = {}
+    for player_id, kind, target_id, *extra in actions:
+        night_actions[player_id] = make_night_action(player_id, roles[player_id], kind, target_id, tuple(*extra))
+    return NightState(players, night_actions, **flags)
+
+
+def _of_type(effects, effect_type):
+    return [effect for effect in effects if isinstance(effect, effect_type)]
+
+
+def test_bodyguard_protection_blocks_villain_kill():
+    state = _state({ALFA: AssassinoAlfa(), GUARD: GuardaCostas(), CITIZEN: CidadaoComum()},
+                   actions=[(ALFA, "villain_vote", CITIZEN), (GUARD, "protect", CITIZEN)])
+    effects = resolve_night(state, random.Random(0))
+    assert _of_type(effects, Death) == []
+    assert PlayerChange(GUARD, "bodyguard_hits_survived", 1) in effects
+
+
+def test_bodyguard_dies_in_place_of_target_on_second_hit():
+    state = _state({ALFA: AssassinoAlfa(), GUARD: GuardaCostas(), CITIZEN: CidadaoComum()},
+                   actions=[(ALFA, "villain_vote", CITIZEN), (GUARD, "protect", CITIZEN)])
+    state.players[GUARD].bodyguard_hits_survived = 1
+    effects = resolve_night(state, random.Random(0))
+    assert _of_type(effects, Death) == [Death(GUARD, "bodyguard_sacrifice", CITIZEN)]
+
+
+def test_confusion_redirects_the_protection():
+    roles = {ALFA: AssassinoAlfa(), JUNIOR: AssassinoJunior(), GUARD: GuardaCostas(), CITIZEN: CidadaoComum(), OTHER: CidadaoComum()}
+    state = _state(roles, actions=[(ALFA, "villain_vote", CITIZEN), (JUNIOR, "confuse", GUARD), (GUARD, "protect", CITIZEN)])
+    effects = resolve_night(state, random.Random(0))
+    # O alvo novo nunca é o original nem o próprio confuso
+    assert state.actions[GUARD].target_id not in (CITIZEN, GUARD)
+    assert any(isinstance(effect, DirectMessage) and effect.player_id == GUARD for effect in effects)
+    assert _of_type(effects, Death) == [Death(CITIZEN, "villain", [ALFA])]
+
+
+def test_possession_replaces_the_villain_kill():
+    state = _state({ALFA: AssassinoAlfa(), JUNIOR: AssassinoJunior(), CITIZEN: CidadaoComum(), OTHER: CidadaoComum()},
+                   actions=[(ALFA, "possess", OTHER), (JUNIOR, "villain_vote", CITIZEN)])
+    state.players[OTHER].possession_points = 2
+    effects = resolve_night(state, random.Random(0))
+    assert _of_type(effects, Death) == []
+    assert state.skip_villain_kill
+    changes = [(effect.field, effect.value) for effect in _of_type(effects, PlayerChange) if effect.player_id == OTHER]
+    assert changes[0] == ("possession_points", 3)
+    assert changes[1][0] == "role" and isinstance(changes[1][1], AssassinoSimples)
+    # Os outros Vilões são avisados da conversão
+    assert any(isinstance(effect, DirectMessage) and effect.player_id == JUNIOR and "foi corrompido" in effect.text for effect in effects)
+
+
+def test_revive_only_brings_back_players_dead_before_the_night():
+    roles = {ALFA: AssassinoAlfa(), ANGEL: Anjo(), CITIZEN: CidadaoComum(), OTHER: CidadaoComum()}
+    state = _state(roles, dead=[OTHER], actions=[(ALFA, "villain_vote", CITIZEN), (ANGEL, "angel_revive", OTHER)])
+    effects = resolve_night(state, random.Random(0))
+    assert _of_type(effects, Revival) == [Revival(OTHER, ANGEL)]
+    assert state.angel_revive_used
+    # As mortes vêm no fim, depois das revivências
+    assert effects[-1] == Death(CITIZEN, "villain", [ALFA])
+    assert effects.index(Revival(OTHER, ANGEL)) < len(effects) - 1
+
+    # Quem morre nesta mesma noite não pode ser revivido
+    state = _state(roles, actions=[(ALFA, "villain_vote", CITIZEN), (ANGEL, "angel_revive", CITIZEN)])
+    effects = resolve_night(state, random.Random(0))
+    assert _of_type(effects, Revival) == []
+    assert not state.angel_revive_used
+    assert _of_type(effects, Death) == [Death(CITIZEN, "villain", [ALFA])]
+
+
+def test_reviving_a_ghost_prefeito_restores_the_medium_power():
+    roles = {ANGEL: Anjo(), CITIZEN: Prefeito(), MEDIUM: Medium()}
+    state = _state(roles, dead=[CITIZEN], actions=[(ANGEL, "angel_revive", CITIZEN)], medium_talk_used=True)
+    state.players[CITIZEN].is_ghost = True
+    state.players[CITIZEN].ghost_master_id = MEDIUM
+    effects = resolve_night(state, random.Random(0))
+    assert GameChange("medium_talk_used", False) in effects
+    assert any(isinstance(effect, DirectMessage) and effect.player_id == MEDIUM for effect in effects)
+    assert not state.players[CITIZEN].is_ghost and state.players[CITIZEN].ghost_master_id is None
+
+
+def test_plague_spreads_to_visitors_and_visited_of_patient_zero():
+    roles = {PLAGUE: Praga(), GUARD: GuardaCostas(), CITIZEN: Fofoqueiro(), OTHER: CidadaoComum(), ALFA: AssassinoAlfa()}
+    state = _state(roles, actions=[(PLAGUE, "choose_target", CITIZEN), (GUARD, "protect", CITIZEN), (CITIZEN, "choose_target", OTHER)],
+                   plague_patient_zero_id=CITIZEN, plague_player_id=PLAGUE)
+    effects = resolve_night(state, random.Random(0))
+    infected = [effect.player_id for effect in _of_type(effects, PlayerChange) if effect.field == "is_infected"]
+    # A própria Praga não se infecta; a ordem é a dos ids
+    assert infected == [GUARD, OTHER]
+    assert not state.players[ALFA].is_infected
+
+
+def test_plague_does_not_spread_from_a_dead_patient_zero():
+    # Morto em uma noite anterior (quem morre nesta noite ainda contamina, como antes do motor)
+    roles = {PLAGUE: Praga(), CITIZEN: CidadaoComum(), OTHER: Fofoqueiro()}
+    state = _state(roles, dead=[CITIZEN], actions=[(OTHER, "choose_target", CITIZEN)],
+                   plague_patient_zero_id=CITIZEN, plague_player_id=PLAGUE)
+    effects = resolve_night(state, random.Random(0))
+    assert [effect for effect in _of_type(effects, PlayerChange) if effect.field == "is_infected"] == []
+
+
+def test_haunt_reports_visits_to_ghost_and_medium():
+    roles = {GHOST: CidadaoComum(), MEDIUM: Medium(), GUARD: GuardaCostas(), CITIZEN: Fofoqueiro(), OTHER: CidadaoComum(), ALFA: AssassinoAlfa()}
+    state = _state(roles, dead=[GHOST], actions=[(GHOST, "haunt", CITIZEN), (GUARD, "protect", CITIZEN), (CITIZEN, "choose_target", OTHER)])
+    state.players[GHOST].is_ghost = True
+    state.players[GHOST].ghost_master_id = MEDIUM
+    effects = resolve_night(state, random.Random(0))
+    reports = [effect for effect in _of_type(effects, DirectMessage) if "Assombração" in effect.text]
+    assert [report.player_id for report in reports] == [GHOST, MEDIUM]
+    assert reports[0].text == reports[1].text
+    assert f"Foi visitado por: **Jogador {GUARD}**" in reports[0].text # O próprio Fantasma não aparece
+    assert f"Visitou: **Jogador {OTHER}**" in reports[0].text
+
+
+def test_haunt_without_a_medium_reports_nothing():
+    roles = {GHOST: CidadaoComum(), GUARD: GuardaCostas(), CITIZEN: CidadaoComum()}
+    state = _state(roles, dead=[GHOST], actions=[(GHOST, "haunt", CITIZEN), (GUARD, "protect", CITIZEN)])
+    effects = resolve_night(state, random.Random(0))
+    assert not any("Assombração" in effect.text for effect in _of_type(effects, DirectMessage))
+
+
+def test_every_first_night_target_choice_visits_at_the_same_priority():
+    # Quem tem /escolher_alvo declara a visita com a prioridade 70; sem declaração cairia no padrão 50
+    roles = [role_class() for role_class in (*viloes_role_classes.values(), *solo_role_classes.values())]
+    choosers = [role for role in roles if "/escolher_alvo" in role.abilities]
+    assert {role.name for role in choosers} >= {"Assassino Júnior", "Cúmplice", "A Praga", "Fofoqueiro"}
+    assert all(action_spec(role, "choose_target") == NightActionSpec(70) for role in choosers)
@@ -0,0 +1,62 @@
+# tests/test_ranking_pages.py
+
+import asyncio
+
+from stats.backend import LocalRankingBackend
+from stats.game_log import GameLog, RECORD_VERSION
+from stats.shards import RankingShards
+
+
+def _record(game_id: str, players) -> dict:
+    return {"v": RECORD_VERSION, "id": game_id, "t": 0, "g": None, "n": 2, "f": "Cidade",
+            "p": [[player_id, name, "Cidadão Comum", "Cidade", won, 1] for player_id, name, won in players], "m": []}
+
+
+def test_page_version_changes_when_a_shown_player_changes(tmp_path):
+    async def scenario():
+        shards = RankingShards(str(tmp_path / "ranking.db"), str(tmp_path / "guilds"), min_games_for_win_rate=1,
+                               game_log=GameLog(str(tmp_path / "game_log.jsonl")))
+        backend = LocalRankingBackend(shards)
+        await backend.start()
+        try:
+            await backend.record_game(_record("1", [(1, "Ana", 0), (2, "Bruno", 0)]))
+            before = await backend.leaderboard_page(None, "taxa", 10)
+
+            # Renomear um jogador não muda a ordem do placar, mas muda a página exibida
+            cache = shards.global_cache
+            cache.players["1"]["nome_jogador"] = "Ana Maria"
+            cache.commit(["1"])
+            after = await backend.leaderboard_page(None, "taxa", 10)
+            return before, after
+        finally:
+            backend.close()
+
+    before, after = asyncio.run(scenario())
+    assert before.page.player_ids == after.page.player_ids
+    assert before.version != after.version
+    assert after.players["1"]["nome_jogador"] == "Ana Maria"
+
+
+def test_concurrent_games_with_an_unopened_guild_are_both_applied(tmp_path):
+    async def scenario():
+        shards = RankingShards(str(tmp_path / "ranking.db"), str(tmp_path / "guilds"), min_games_for_win_rate=1,
+                               game_log=GameLog(str(tmp_path / "game_log.jsonl")))
+        backend = LocalRankingBackend(shards)
+        await backend.start()
+        try:
+            await shards.open_guild(20)
+            # A é a primeira partida do servidor 10 (shard ainda fechado); B termina enquanto o shard de A carrega
+            game_a = {**_record("a", [(111, "Ana", 1)]), "g": 10}
+            game_b = {**_record("b", [(222, "Bruno", 1)]), "g": 20}
+            await asyncio.gather(backend.record_game(game_a), backend.record_game(game_b))
+            games = {shard: {player_id: stats["partidas_jogadas"] for player_id, stats in cache.players.items()}
+                     for shard, cache in (("global", shards.global_cache), (10, shards.guild(10)), (20, shards.guild(20)))}
+            return games["global"], games[10], games[20]
+        finally:
+            backend.close()
+
+    global_games, guild_a_games, guild_b_games = asyncio.run(scenario())
+    assert global_games == {"111": 1, "222": 1}
+    # O replay da abertura do shard já aplicou A: não pode contar de novo
+    assert guild_a_games == {"111": 1}
+    assert guild_b_games == {"222": 1}
@@ -0,0 +1,31 @@
+# tests/test_snapshot.py
+
+import struct
+
+import pytest
+
+from stats import snapshot
+
+
+def _players():
+    return {
+        "101": {"nome_jogador": "Ana", "partidas_jogadas": 5, "vitorias_totais": 3,
+                "vitorias_por_papel": {"Xerife": 2, "Anjo": 1}, "medalhas": ["Primeira Vitória"],
+                "rating": 1532.5, "sequencia_vitorias": 2},
+        "202": {"nome_jogador": "Bruno", "partidas_jogadas": 1, "vitorias_totais": 0,
+                "vitorias_por_papel": {}, "medalhas": [], "rating": 1488.0, "sequencia_vitorias": 0},
+    }
+
+
+def test_round_trip():
+    token = bytes(range(16))
+    players, log_offset, read_token = snapshot.decode(snapshot.encode(_players(), 1234, token))
+    assert players == _players()
+    assert (log_offset, read_token) == (1234, token)
+
+
+def test_rejects_other_versions():
+    data = bytearray(snapshot.encode(_players()))
+    struct.pack_into("<H", data, 4, snapshot.VERSION + 1)
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.decode(bytes(data))